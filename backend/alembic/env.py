@@ -6,7 +6,7 @@ from app.core.config import settings
 from app.db.base import Base
 
 # IMPORTANT: import models so they register on Base.metadata
-from app.models import User, CoverLetter  # noqa: F401
+from app.models import User, CoverLetter, ResumeBlob, Resume, GenerationJob, CoverLetterRevision  # noqa: F401
 
 config = context.config
 
@@ -18,6 +18,12 @@ target_metadata = Base.metadata
 def get_url():
     return settings.DATABASE_URL
 
+def include_name(name, type_, parent_names):
+    # the SQLite FTS5 table (and its shadow tables) is created by migration, not from the models
+    if type_ == "table":
+        return not name.startswith("cover_letters_fts")
+    return True
+
 def run_migrations_offline() -> None:
     url = get_url()
     context.configure(
@@ -26,6 +32,7 @@ def run_migrations_offline() -> None:
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -46,6 +53,7 @@ def run_migrations_online() -> None:
             connection=connection,
             target_metadata=target_metadata,
             compare_type=True,  # detects column type changes
+            include_name=include_name,
         )
 
         with context.begin_transaction():
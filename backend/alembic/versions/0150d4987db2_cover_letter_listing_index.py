@@ -0,0 +1,31 @@
+"""cover letter listing index
+
+Revision ID: 0150d4987db2
+Revises: ea7a36ace629
+Create Date: 2026-10-18 10:00:00.000000
+
+Keyset pagination of a user's letters, newest first.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0150d4987db2'
+down_revision: Union[str, Sequence[str], None] = 'ea7a36ace629'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_cover_letters_user_created_id", "cover_letters", ["user_id", "created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_cover_letters_user_created_id", table_name="cover_letters")
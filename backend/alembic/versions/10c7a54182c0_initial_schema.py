@@ -0,0 +1,64 @@
+"""initial schema
+
+Revision ID: 10c7a54182c0
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+users and cover_letters as they were before any of the later revisions.
+Migrations are the only way the app's schema is created or changed. A
+database made by create_all() from the original models already has these
+tables: run `alembic stamp 10c7a54182c0` once, then `alembic upgrade head`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '10c7a54182c0'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(length=320), nullable=False),
+        sa.Column("full_name", sa.String(length=200), nullable=False),
+        sa.Column("password_hash", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "cover_letters",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("input_full_name", sa.String(length=200), nullable=False),
+        sa.Column("job_title", sa.String(length=200), nullable=False),
+        sa.Column("company_name", sa.String(length=200), nullable=False),
+        sa.Column("tone", sa.String(length=50), nullable=False),
+        sa.Column("job_description", sa.Text(), nullable=False),
+        sa.Column("extra_notes", sa.Text(), nullable=True),
+        sa.Column("resume_text", sa.Text(), nullable=False),
+        sa.Column("ai_draft", sa.Text(), nullable=False),
+        sa.Column("edited_final", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_cover_letters_id", "cover_letters", ["id"])
+    op.create_index("ix_cover_letters_user_id", "cover_letters", ["user_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("cover_letters")
+    op.drop_table("users")
@@ -0,0 +1,32 @@
+"""cover_letters.status
+
+Revision ID: 47a01aa43a72
+Revises: 10c7a54182c0
+Create Date: 2026-10-18 09:10:00.000000
+
+"generating" while a streamed draft is still arriving; existing rows are complete.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '47a01aa43a72'
+down_revision: Union[str, Sequence[str], None] = '10c7a54182c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "cover_letters",
+        sa.Column("status", sa.String(length=20), server_default="complete", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("cover_letters", "status")
@@ -0,0 +1,48 @@
+"""cover letter revisions
+
+Revision ID: 608d71ce0308
+Revises: f07fc5bb1e0b
+Create Date: 2026-10-18 10:30:00.000000
+
+cover_letters.edit_version for optimistic concurrency on saves, and the
+cover_letter_revisions history (snapshots plus patch deltas).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '608d71ce0308'
+down_revision: Union[str, Sequence[str], None] = 'f07fc5bb1e0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "cover_letters",
+        sa.Column("edit_version", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.create_table(
+        "cover_letter_revisions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("cover_letter_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(length=10), nullable=False),
+        sa.Column("text", sa.Text(), nullable=True),
+        sa.Column("ops", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["cover_letter_id"], ["cover_letters.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("cover_letter_id", "version", name="uq_cover_letter_revisions_version"),
+    )
+    op.create_index("ix_cover_letter_revisions_id", "cover_letter_revisions", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("cover_letter_revisions")
+    op.drop_column("cover_letters", "edit_version")
@@ -0,0 +1,32 @@
+"""users.token_version
+
+Revision ID: 6ce7894f2487
+Revises: 0150d4987db2
+Create Date: 2026-10-18 10:10:00.000000
+
+Carried in access tokens; bumping it revokes every token issued before.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6ce7894f2487'
+down_revision: Union[str, Sequence[str], None] = '0150d4987db2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "users",
+        sa.Column("token_version", sa.Integer(), server_default="0", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("users", "token_version")
@@ -0,0 +1,35 @@
+"""cover_letters.resume_text nullable
+
+Revision ID: 6e6b15bd50da
+Revises: 7e3742439861
+Create Date: 2026-10-18 09:30:00.000000
+
+Letters now keep their resume in resume_blobs (resume_blob_id). The old
+resume_text column is only read for rows created before that, so new rows
+leave it NULL. Downgrading fills NULLs with '' rather than copying resume
+text back out of the blobs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e6b15bd50da'
+down_revision: Union[str, Sequence[str], None] = '7e3742439861'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("cover_letters") as batch:
+        batch.alter_column("resume_text", existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("UPDATE cover_letters SET resume_text = '' WHERE resume_text IS NULL")
+    with op.batch_alter_table("cover_letters") as batch:
+        batch.alter_column("resume_text", existing_type=sa.Text(), nullable=False)
@@ -0,0 +1,49 @@
+"""resume_blobs
+
+Revision ID: 7e3742439861
+Revises: 47a01aa43a72
+Create Date: 2026-10-18 09:20:00.000000
+
+Extracted resume text stored once per distinct upload, referenced from
+cover_letters.resume_blob_id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e3742439861'
+down_revision: Union[str, Sequence[str], None] = '47a01aa43a72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "resume_blobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(length=64), nullable=False),
+        sa.Column("text", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_resume_blobs_id", "resume_blobs", ["id"])
+    op.create_index("ix_resume_blobs_sha256", "resume_blobs", ["sha256"], unique=True)
+
+    # batch mode so SQLite gets the foreign key too (it rebuilds the table)
+    with op.batch_alter_table("cover_letters") as batch:
+        batch.add_column(sa.Column("resume_blob_id", sa.Integer(), nullable=True))
+        batch.create_foreign_key("fk_cover_letters_resume_blob_id", "resume_blobs", ["resume_blob_id"], ["id"])
+    op.create_index("ix_cover_letters_resume_blob_id", "cover_letters", ["resume_blob_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_cover_letters_resume_blob_id", table_name="cover_letters")
+    with op.batch_alter_table("cover_letters") as batch:
+        batch.drop_constraint("fk_cover_letters_resume_blob_id", type_="foreignkey")
+        batch.drop_column("resume_blob_id")
+    op.drop_table("resume_blobs")
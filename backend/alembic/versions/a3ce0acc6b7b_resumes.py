@@ -0,0 +1,41 @@
+"""resumes
+
+Revision ID: a3ce0acc6b7b
+Revises: 6e6b15bd50da
+Create Date: 2026-10-18 09:40:00.000000
+
+A user's saved resumes, each pointing at a shared resume_blobs row.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3ce0acc6b7b'
+down_revision: Union[str, Sequence[str], None] = '6e6b15bd50da'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "resumes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("resume_blob_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["resume_blob_id"], ["resume_blobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_resumes_id", "resumes", ["id"])
+    op.create_index("ix_resumes_user_id", "resumes", ["user_id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("resumes")
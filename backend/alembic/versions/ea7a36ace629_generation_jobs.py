@@ -0,0 +1,50 @@
+"""generation_jobs
+
+Revision ID: ea7a36ace629
+Revises: a3ce0acc6b7b
+Create Date: 2026-10-18 09:50:00.000000
+
+Queued cover letter generations, claimed by app.services.jobs workers.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ea7a36ace629'
+down_revision: Union[str, Sequence[str], None] = 'a3ce0acc6b7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("resume_blob_id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("run_after", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("locked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("cover_letter_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["resume_blob_id"], ["resume_blobs.id"]),
+        sa.ForeignKeyConstraint(["cover_letter_id"], ["cover_letters.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_generation_jobs_id", "generation_jobs", ["id"])
+    op.create_index("ix_generation_jobs_user_id", "generation_jobs", ["user_id"])
+    op.create_index("ix_generation_jobs_status_run_after", "generation_jobs", ["status", "run_after"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("generation_jobs")
@@ -0,0 +1,82 @@
+"""cover letter full-text search
+
+Revision ID: f07fc5bb1e0b
+Revises: 6ce7894f2487
+Create Date: 2026-10-18 10:20:00.000000
+
+Postgres: GIN expression index matching app.models.coverletter.search_vector().
+SQLite: cover_letters_fts FTS5 table plus triggers, backfilled from existing rows.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f07fc5bb1e0b'
+down_revision: Union[str, Sequence[str], None] = '6ce7894f2487'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# kept verbatim from the model; Postgres only uses the index for this exact expression
+PG_SEARCH_VECTOR = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(company_name, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(job_title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(coalesce(edited_final, ai_draft), '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(job_description, '')), 'C')"
+)
+
+SQLITE_FTS_ROW = (
+    "company_name, job_title, coalesce(edited_final, ai_draft), job_description, 'u' || user_id"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        # CONCURRENTLY cannot run inside the migration transaction
+        with op.get_context().autocommit_block():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_cover_letters_search "
+                f"ON cover_letters USING gin (({PG_SEARCH_VECTOR}))"
+            )
+    elif dialect == "sqlite":
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS cover_letters_fts USING fts5("
+            "company_name, job_title, body, job_description, user_id, tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS cover_letters_fts_ai AFTER INSERT ON cover_letters BEGIN "
+            "INSERT INTO cover_letters_fts(rowid, company_name, job_title, body, job_description, user_id) "
+            "VALUES (new.id, new.company_name, new.job_title, coalesce(new.edited_final, new.ai_draft), "
+            "new.job_description, 'u' || new.user_id); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS cover_letters_fts_au "
+            "AFTER UPDATE OF company_name, job_title, job_description, ai_draft, edited_final ON cover_letters BEGIN "
+            "DELETE FROM cover_letters_fts WHERE rowid = old.id; "
+            "INSERT INTO cover_letters_fts(rowid, company_name, job_title, body, job_description, user_id) "
+            "VALUES (new.id, new.company_name, new.job_title, coalesce(new.edited_final, new.ai_draft), "
+            "new.job_description, 'u' || new.user_id); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS cover_letters_fts_ad AFTER DELETE ON cover_letters BEGIN "
+            "DELETE FROM cover_letters_fts WHERE rowid = old.id; END"
+        )
+        op.execute(
+            "INSERT INTO cover_letters_fts(rowid, company_name, job_title, body, job_description, user_id) "
+            f"SELECT id, {SQLITE_FTS_ROW} FROM cover_letters"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_cover_letters_search", table_name="cover_letters")
+    elif dialect == "sqlite":
+        for trigger in ("cover_letters_fts_ai", "cover_letters_fts_au", "cover_letters_fts_ad"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS cover_letters_fts")
@@ -0,0 +1,141 @@
+"""Small async key/value cache with pluggable backends.
+
+"memory" is a per-process LRU with TTL; "redis" talks to any Redis-compatible
+server at REDIS_URL. REDIS_URL="fake://" swaps in FakeRedis, an in-process
+stand-in for tests and local runs.
+"""
+import time
+from collections import OrderedDict
+from typing import Protocol
+
+from app.core.config import settings
+
+
+class CacheBackend(Protocol):
+    async def get(self, key: str) -> bytes | None: ...
+    async def set(self, key: str, value: bytes, ttl: int) -> None: ...
+    async def delete(self, key: str) -> None: ...
+
+
+class MemoryCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class NullCache:
+    async def get(self, key: str) -> bytes | None:
+        return None
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        pass
+
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class RedisCache:
+    """Namespaced cache on a Redis-compatible client; eviction is left to Redis (maxmemory policy)."""
+
+    def __init__(self, client, namespace: str):
+        self.client = client
+        self.namespace = namespace
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self._key(key), value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self._key(key))
+
+
+class FakeRedis:
+    """In-process subset of the redis.asyncio client API (strings + counters)."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[float | None, bytes]] = {}
+
+    def _live(self, key: str):
+        item = self._data.get(key)
+        if item and item[0] is not None and item[0] < time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    async def get(self, key: str) -> bytes | None:
+        item = self._live(key)
+        return item[1] if item else None
+
+    async def set(self, key: str, value, ex: int | None = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode()
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (expires_at, value)
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        return sum(self._data.pop(k, None) is not None for k in keys)
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        item = self._live(key)
+        value = int(item[1]) + amount if item else amount
+        self._data[key] = (item[0] if item else None, str(value).encode())
+        return value
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        item = self._live(key)
+        if not item:
+            return False
+        self._data[key] = (time.monotonic() + seconds, item[1])
+        return True
+
+
+_redis = None
+
+def get_redis():
+    global _redis
+    if _redis is None:
+        if not settings.REDIS_URL:
+            raise RuntimeError("REDIS_URL is not configured")
+        if settings.REDIS_URL == "fake://":
+            _redis = FakeRedis()
+        else:
+            import redis.asyncio as redis  # only needed when a real server is configured
+
+            _redis = redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+def make_cache(backend: str, namespace: str, max_entries: int) -> CacheBackend:
+    if backend == "memory":
+        return MemoryCache(max_entries)
+    if backend == "redis":
+        return RedisCache(get_redis(), namespace)
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
 from typing import List
@@ -6,12 +7,94 @@ from typing import List
 class Settings(BaseSettings):
     ENV: str = "dev"
     DATABASE_URL: str
+    # applied to both the sync and the async engine (each has its own pool)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_POOL_TIMEOUT_S: float = 10.0
 
     JWT_SECRET: str
     JWT_ACCESS_EXPIRES_MIN: int = 15
     JWT_REFRESH_EXPIRES_DAYS: int = 14
+    AUTH_CACHE_TTL_S: float = 30.0  # how long a worker trusts a cached user existence/version (revocation lag on other workers)
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_CALIBRATE_TARGET_MS: float | None = None  # if set, pick rounds at startup to hit this latency
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16  # hash/verify calls in flight before auth returns 503
 
     OPENAI_API_KEY: str
+    OPENAI_BASE_URL: str | None = None  # override to point at a local stub server
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_TIMEOUT_S: float = 60.0
+
+    # JSON list of {"name", "base_url", "api_key", "model"}; empty uses the single OPENAI_* backend
+    LLM_BACKENDS: list[dict] = []
+    LLM_CALL_TIMEOUT_S: float = 30.0  # per attempt (time to first chunk when streaming)
+    LLM_MAX_ATTEMPTS: int = 3  # per call, counting hedges and retries
+    LLM_HEDGE: bool = True
+    LLM_HEDGE_MIN_DELAY_S: float = 1.0  # never hedge sooner than this
+    LLM_HEDGE_DEFAULT_DELAY_S: float = 8.0  # until a backend has enough samples for a p95
+    LLM_RETRY_BUDGET_RATIO: float = 0.2  # extra attempts allowed per call, averaged over the window
+    LLM_WINDOW_S: float = 300.0  # moving window for latency/error tracking
+
+    # LLM scheduler budget, per process (divide the account quota by the worker count)
+    LLM_MAX_CONCURRENCY: int = 16  # generations in flight, streams included
+    LLM_TOKENS_PER_MINUTE: int = 0  # 0 = no token limit; otherwise your TPM quota / workers
+    LLM_QUEUE_MAX: int = 100  # waiting generations per lane before new ones get a 503
+    LLM_QUEUE_MAX_WAIT_S: float = 30.0  # refuse generations whose estimated wait is longer
+
+    PROMPT_TOKEN_BUDGET: int = 3500  # job description + resume tokens per prompt; 0 disables compaction
+    PROMPT_JD_SHARE: float = 0.4  # part of the budget reserved for the job description
+
+    MAX_REQUEST_BYTES: int = 6 * 1024 * 1024  # whole request body: a 5MB resume plus form fields
+    EXTRACT_MAX_WORKERS: int = 4  # threads reserved for resume parsing
+    EXTRACT_TIME_BUDGET_S: float = 10.0  # per document, from when it gets a worker; past it the upload is refused
+    EXTRACT_PROCESSES: int = 2  # processes that parse PDFs under the time budget; 0 reads them in the thread
+    EXTRACT_QUEUE_MAX: int = 8  # PDFs waiting for a free process before uploads get 503
+    EXTRACT_PARALLEL_MIN_PAGES: int = 12  # smaller PDFs are read by a single task
+    EXTRACT_PAGES_PER_TASK: int = 4
+
+    REDIS_URL: str | None = None  # "fake://" uses an in-process stand-in
+
+    GEN_CACHE_BACKEND: str = "memory"  # "memory" | "redis" | "none"
+    GEN_CACHE_TTL_S: int = 24 * 3600
+    GEN_CACHE_MAX_ENTRIES: int = 1000  # memory backend only
+
+    PDF_CACHE_BACKEND: str = "memory"  # "memory" | "redis" | "none"
+    PDF_CACHE_TTL_S: int = 7 * 24 * 3600
+    PDF_CACHE_MAX_ENTRIES: int = 200  # memory backend only
+    PDF_PRERENDER: bool = False  # render in the background right after generate/edit
+    PDF_POOL_WORKERS: int = 2  # warm render processes; 0 renders in the API process
+    PDF_POOL_MAX_QUEUE: int = 32  # renders in flight before downloads get a 503
+    PDF_RENDER_TIMEOUT_S: float = 20.0
+    PDF_WORKER_MAX_RSS_MB: int = 512
+    PDF_WORKER_MAX_TASKS: int = 500
+
+    EXPORT_MAX_LETTERS: int = 100  # per zip export
+    EXPORT_RENDER_CONCURRENCY: int = 4  # letters rendered at once per export; bounds its memory
+
+    BATCH_CONCURRENCY: int = 5  # parallel OpenAI calls per /generate/batch request
+
+    # queue workers inside each API process; by default jobs wait for `python -m app.worker`,
+    # since every uvicorn worker would otherwise add its own pollers
+    JOB_WORKERS: int = 0
+    JOB_POLL_INTERVAL_S: float = 1.0
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_BACKOFF_BASE_S: float = 2.0
+    JOB_BACKOFF_MAX_S: float = 120.0
+    JOB_LEASE_S: int = 300  # a running job older than this is assumed orphaned and re-queued
+
+    RATE_LIMIT_ENABLED: bool = True  # disable only for local load testing
+    RATE_LIMIT_STORAGE_URI: str = "memory://"  # "redis://host:6379/1" shares limits across workers and restarts
+    LLM_DAILY_TOKEN_BUDGET: int = 200_000  # OpenAI tokens per user per UTC day, per process unless REDIS_URL is set; 0 disables
+
+    METRICS_TOKEN: str | None = None  # bearer token for /metrics and /stats/*; unset hides them (404)
+    PROFILE_TOKEN: str | None = None  # enables cProfile for "X-Profile: <token>" (event-loop thread only)
+    PROFILE_DIR: str = "/tmp/coverletter-profiles"
+
+    STARTUP_WARMUP: bool = True  # after startup, load PDF/DOCX/OpenAI libraries and render workers in the background
 
     CORS_ORIGINS: str = "http://localhost:5173"
     COOKIE_SECURE: bool = False  # set true in prod (https only)
@@ -23,4 +106,26 @@ class Settings(BaseSettings):
         env_file = ".env"
 
 
-settings = Settings()
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
+
+class _LazySettings:
+    """Reads and validates the environment on first attribute access, not at import.
+
+    Module-level singletons that depend on settings are built by get_*()
+    functions on first use, and app.main configures its middleware when
+    the stack is built at startup, so importing models, schemas and
+    services needs no env vars. The rate limiter is the exception: slowapi
+    opens its storage in the constructor and the route decorators need the
+    instance, so importing a route module (or app.main) reads RATE_LIMIT_*
+    and with it the whole environment.
+    """
+
+    def __getattr__(self, name):
+        return getattr(get_settings(), name)
+
+    def __setattr__(self, name, value):
+        setattr(get_settings(), name, value)
+
+settings: Settings = _LazySettings()  # type: ignore[assignment]
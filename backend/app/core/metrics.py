@@ -0,0 +1,192 @@
+"""Prometheus metrics and per-request profiling.
+
+- `observe_request` (HTTP middleware) records latency per route template;
+  streamed responses are timed to their first byte.
+- `timed(stage)` wraps one stage of a request (resume extraction, the
+  OpenAI call, a commit, a PDF render) in a histogram span; it works in
+  sync and async code alike.
+- Existing in-process stats (generation cache, DB pool waits) are exported
+  at scrape time by `StatsCollector`, so they are not counted twice.
+- With PROFILE_TOKEN set, a request carrying `X-Profile: <token>` runs
+  under cProfile; the stats are written to PROFILE_DIR and the file id is
+  returned in `X-Profile-Id`. cProfile only sees the event-loop thread:
+  sync (`def`) handlers and anything sent to the threadpool do not show
+  up, while coroutines of other requests running meanwhile do. Use it on
+  async handlers, ideally with no other traffic.
+- /metrics and /stats/* expose backend names, models and load, so they
+  need `Authorization: Bearer <METRICS_TOKEN>` (`require_operator`). They
+  answer 404 while METRICS_TOKEN is unset.
+
+With several uvicorn workers set PROMETHEUS_MULTIPROC_DIR so /metrics
+aggregates all of them. In that mode /metrics carries only the histograms
+and counters above: the StatsCollector figures are per-process state that
+a scrape of one random worker cannot aggregate, so read them per worker
+from /stats/* instead.
+"""
+import cProfile
+import logging
+import os
+import secrets
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+STAGE_LATENCY = Histogram(
+    "stage_duration_seconds", "Latency of one stage of a request",
+    ["stage"], buckets=LATENCY_BUCKETS,
+)
+# prompt | completion, or estimated for hedged attempts cancelled before they reported usage
+LLM_TOKENS = Counter("llm_tokens_total", "Tokens billed by the LLM API", ["kind"])
+LLM_ATTEMPTS = Counter("llm_attempts_total", "LLM backend attempts by outcome", ["backend", "outcome"])
+JOBS_FINISHED = Counter("generation_jobs_finished_total", "Queued generations by outcome", ["outcome"])
+LLM_QUEUE_WAIT = Histogram(
+    "llm_queue_wait_seconds", "Time a generation waited for the LLM scheduler", ["lane"], buckets=LATENCY_BUCKETS,
+)
+LLM_QUEUE_REJECTED = Counter("llm_queue_rejected_total", "Generations refused by admission control", ["lane"])
+
+
+@contextmanager
+def timed(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - started)
+
+
+def record_usage(usage) -> None:
+    """Count tokens from an OpenAI `usage` object (missing on some stream ends)."""
+    if usage is None:
+        return
+    LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels("completion").inc(usage.completion_tokens or 0)
+
+
+class StatsCollector:
+    """Exports the counters the app already keeps, read at scrape time."""
+
+    @staticmethod
+    def _families() -> dict:
+        return {
+            "cache": CounterMetricFamily("generation_cache_requests", "Generation cache lookups", labels=["result"]),
+            "tokens_saved": CounterMetricFamily("generation_cache_tokens_saved",
+                                                "Tokens not spent thanks to cache hits", labels=[]),
+            "checkouts": CounterMetricFamily("db_pool_checkouts", "Connection checkouts", labels=["pool"]),
+            "wait": CounterMetricFamily("db_pool_wait_seconds", "Time spent waiting for a connection",
+                                        labels=["pool"]),
+            "timeouts": CounterMetricFamily("db_pool_timeouts", "Checkouts that timed out", labels=["pool"]),
+            "wait_max": GaugeMetricFamily("db_pool_wait_max_seconds", "Longest checkout wait", labels=["pool"]),
+            "depth": GaugeMetricFamily("llm_queue_depth", "Generations waiting for the LLM scheduler",
+                                       labels=["lane"]),
+            "running": GaugeMetricFamily("llm_calls_in_flight", "Generations holding a scheduler slot", labels=[]),
+            "bucket": GaugeMetricFamily("llm_token_bucket_level", "Tokens left in the per-minute budget", labels=[]),
+        }
+
+    def describe(self):
+        # the families without samples: register() checks their names against the rest of the
+        # registry, and calling collect() for that would import the services it reads
+        return list(self._families().values())
+
+    def collect(self):
+        from app.db.session import pool_stats
+        from app.services.generation_cache import generation_cache
+        from app.services.llm_scheduler import get_llm_scheduler
+
+        families = self._families()
+        stats = generation_cache.stats
+        families["cache"].add_metric(["hit"], stats.hits)
+        families["cache"].add_metric(["miss"], stats.misses)
+        families["tokens_saved"].add_metric([], stats.tokens_saved)
+
+        for name, pool in pool_stats.items():
+            families["checkouts"].add_metric([name], pool.checkouts)
+            families["wait"].add_metric([name], pool.wait_seconds_total)
+            families["timeouts"].add_metric([name], pool.timeouts)
+            families["wait_max"].add_metric([name], pool.wait_seconds_max)
+
+        snapshot = get_llm_scheduler().snapshot()
+        for lane, waiting in snapshot["queued"].items():
+            families["depth"].add_metric([lane], waiting)
+        families["running"].add_metric([], snapshot["running"])
+        if snapshot["bucket_tokens"] is not None:
+            families["bucket"].add_metric([], snapshot["bucket_tokens"])
+        else:
+            del families["bucket"]
+        yield from families.values()
+
+
+REGISTRY.register(StatsCollector())
+
+
+def require_operator(request: Request):
+    """Dependency for the observability endpoints; a 404 keeps them invisible to everyone else."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    expected = settings.METRICS_TOKEN
+    if not expected or scheme.lower() != "bearer" or not secrets.compare_digest(token, expected):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+def metrics_response() -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        # no StatsCollector here: its per-process figures do not aggregate (see module docstring)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+# cProfile hooks the whole interpreter thread; one profiled request at a time
+_profile_lock = threading.Lock()
+
+
+def _wants_profile(request: Request) -> bool:
+    return bool(settings.PROFILE_TOKEN) and request.headers.get("x-profile") == settings.PROFILE_TOKEN
+
+
+async def observe_request(request: Request, call_next):
+    profiler = None
+    if _wants_profile(request) and _profile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        route = request.scope.get("route")
+        # the template, not the raw path, so /coverletters/{cover_id} is one series
+        label = route.path if route is not None else "unmatched"
+        HTTP_LATENCY.labels(request.method, label, str(status)).observe(time.perf_counter() - started)
+        if profiler is not None:
+            profiler.disable()
+            _profile_lock.release()
+
+    if profiler is not None:
+        # other requests interleaved on the event loop show up in the profile too
+        profile_id = uuid.uuid4().hex
+        os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+        profiler.dump_stats(os.path.join(settings.PROFILE_DIR, f"{profile_id}.prof"))
+        log.info("profiled %s %s -> %s.prof", request.method, request.url.path, profile_id)
+        response.headers["X-Profile-Id"] = profile_id
+    return response
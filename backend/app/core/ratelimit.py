@@ -0,0 +1,29 @@
+from fastapi import Request
+from jose import JWTError
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.core.config import settings
+from app.core.security import decode_token, safe_token_type
+
+def rate_limit_key(request: Request) -> str:
+    """Signed-in requests are limited per user (on any worker or IP); the rest per client IP."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            payload = decode_token(token)
+        except JWTError:
+            payload = None
+        if payload and safe_token_type(payload, "access"):
+            return f"user:{payload['sub']}"
+    return f"ip:{get_remote_address(request)}"
+
+# Lives outside app.main so route modules can import it without a circular import.
+# Built at import, unlike the other singletons: @limiter.limit needs the instance
+# and slowapi opens its storage in the constructor, so this reads settings.
+limiter = Limiter(
+    key_func=rate_limit_key,
+    enabled=settings.RATE_LIMIT_ENABLED,
+    storage_uri=settings.RATE_LIMIT_STORAGE_URI,
+    key_prefix="rl",
+    in_memory_fallback_enabled=True,  # keep limiting (per worker) if the shared store is down
+)
@@ -1,21 +1,103 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 from jose import jwt, JWTError
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+log = logging.getLogger(__name__)
+
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+class PasswordHasherBusy(Exception):
+    """Too many hash/verify calls queued; shed the request instead of piling up."""
+
+def make_pwd_context(rounds: int) -> CryptContext:
+    # min_rounds makes needs_update() flag weaker hashes, so logins upgrade them.
+    # Hashes above the current cost are left alone, so workers that calibrate to
+    # slightly different costs don't rehash the same account back and forth.
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+_pwd_context: CryptContext | None = None
+_hash_executor: ThreadPoolExecutor | None = None
+_hash_pending = 0
+
+def get_pwd_context() -> CryptContext:
+    global _pwd_context
+    if _pwd_context is None:
+        _pwd_context = make_pwd_context(settings.BCRYPT_ROUNDS)
+    return _pwd_context
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    # bcrypt releases the GIL, so a small dedicated thread pool spreads it over cores
+    # without taking threads from the shared request threadpool.
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="bcrypt",
+        )
+    return _hash_executor
 
 ALGORITHM = "HS256"
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return pwd_context.verify(password, password_hash)
+    return get_pwd_context().verify(password, password_hash)
+
+def verify_and_update(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """Returns (valid, replacement_hash); the replacement is set when the cost setting changed."""
+    return get_pwd_context().verify_and_update(password, password_hash)
+
+async def _run_hasher(fn, *args):
+    global _hash_pending
+    if _hash_pending >= settings.PASSWORD_HASH_MAX_QUEUE:
+        raise PasswordHasherBusy()
+    _hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(get_hash_executor(), fn, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hasher(hash_password, password)
+
+async def verify_and_update_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    return await _run_hasher(verify_and_update, password, password_hash)
+
+def calibrate_bcrypt_rounds(target_ms: float) -> int:
+    """Pick the highest bcrypt cost whose hash time on this machine stays under target_ms."""
+    handler = get_pwd_context().handler("bcrypt")
+    probe_rounds = MIN_BCRYPT_ROUNDS
+    t0 = time.perf_counter()
+    handler.using(rounds=probe_rounds).hash("calibration-password")
+    probe_ms = (time.perf_counter() - t0) * 1000
+
+    rounds = probe_rounds
+    # each extra round doubles the work
+    while rounds < MAX_BCRYPT_ROUNDS and probe_ms * 2 ** (rounds + 1 - probe_rounds) <= target_ms:
+        rounds += 1
+    log.info("bcrypt calibration: %.1f ms at %d rounds -> using %d rounds", probe_ms, probe_rounds, rounds)
+    return rounds
+
+def configure_password_hashing(rounds: int):
+    global _pwd_context
+    _pwd_context = make_pwd_context(rounds)
 
-def create_token(sub: str, token_type: str, expires_delta: timedelta) -> str:
+def create_token(sub: str, token_type: str, expires_delta: timedelta, claims: dict | None = None) -> str:
     now = datetime.now(timezone.utc)
     payload = {
+        **(claims or {}),
         "sub": sub,
         "type": token_type,  # "access" or "refresh"
         "iat": int(now.timestamp()),
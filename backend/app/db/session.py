@@ -1,9 +1,121 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from dataclasses import dataclass
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@dataclass
+class PoolStats:
+    """How long requests waited to check a connection out of the pool.
+
+    The wait covers Pool.connect(): queueing for a free connection, opening
+    a new one when the pool may grow, and the pre-ping.
+    """
+    checkouts: int = 0
+    connects: int = 0  # new DBAPI connections opened (pool growth or recycling)
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    timeouts: int = 0  # gave up after the pool's timeout() (DB_POOL_TIMEOUT_S)
+    timeout_s: float | None = None
+
+    def observe(self, waited: float, timed_out: bool):
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        if timed_out:
+            self.timeouts += 1
+
+pool_stats = {"sync": PoolStats(), "async": PoolStats()}
+
+def _timed(pool_cls, stats: PoolStats):
+    class TimedPool(pool_cls):
+        def connect(self):
+            t0 = time.perf_counter()
+            timed_out = False
+            try:
+                return super().connect()
+            except exc.TimeoutError:  # errors opening a connection are not pool waits
+                timed_out = True
+                raise
+            finally:
+                stats.observe(time.perf_counter() - t0, timed_out)
+
+    return TimedPool
+
+def track_pool(pool, stats: PoolStats):
+    stats.timeout_s = pool.timeout()
+
+    @event.listens_for(pool, "checkout")
+    def _checkout(dbapi_conn, record, proxy):
+        stats.checkouts += 1
+
+    @event.listens_for(pool, "connect")
+    def _connect(dbapi_conn, record):
+        stats.connects += 1
+
+def async_database_url(url: str) -> str:
+    """Map the configured (sync) URL onto its asyncio driver."""
+    scheme, rest = url.split("://", 1)
+    dialect = scheme.split("+", 1)[0]
+    driver = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}.get(dialect)
+    if driver is None:
+        raise ValueError(f"No async driver configured for {dialect}")
+    return f"{dialect}+{driver}://{rest}"
+
+def pool_options(url: str, pool_cls, stats: PoolStats) -> dict:
+    if ":memory:" in url:
+        return {}  # in-memory SQLite keeps its single-connection pool
+    return {
+        "poolclass": _timed(pool_cls, stats),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE_S,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_S,
+    }
+
+_engine = None
+_async_sessionmaker = None
+
+def get_engine():
+    # built on first use, so importing the app needs neither DATABASE_URL nor the DB driver
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            settings.DATABASE_URL,
+            pool_pre_ping=True,
+            **pool_options(settings.DATABASE_URL, QueuePool, pool_stats["sync"]),
+        )
+        if ":memory:" not in settings.DATABASE_URL:
+            track_pool(_engine.pool, pool_stats["sync"])
+    return _engine
+
+def __getattr__(name):
+    if name == "engine":  # `from app.db.session import engine` keeps working
+        return get_engine()
+    raise AttributeError(name)
+
+class _LazyBindSession(Session):
+    def __init__(self, bind=None, **kw):
+        super().__init__(bind=bind if bind is not None else get_engine(), **kw)
+
+SessionLocal = sessionmaker(class_=_LazyBindSession, autocommit=False, autoflush=False)
+
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # built on first use so the asyncpg/aiosqlite driver is only needed by processes that use it
+    global _async_sessionmaker
+    if _async_sessionmaker is None:
+        url = async_database_url(settings.DATABASE_URL)
+        async_engine = create_async_engine(
+            url,
+            pool_pre_ping=True,
+            **pool_options(url, AsyncAdaptedQueuePool, pool_stats["async"]),
+        )
+        if ":memory:" not in url:
+            track_pool(async_engine.sync_engine.pool, pool_stats["async"])
+        # expire_on_commit=False: objects stay readable after commit without lazy I/O
+        _async_sessionmaker = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    return _async_sessionmaker
 
 def get_db():
     db = SessionLocal()
@@ -11,3 +123,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -1,32 +1,118 @@
-from fastapi import FastAPI, Request
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.body_limit import BodySizeLimitMiddleware
 from app.core.config import settings
+from app.core.metrics import metrics_response, observe_request, require_operator
+from app.core.ratelimit import limiter
+from app.core.security import PasswordHasherBusy, calibrate_bcrypt_rounds, configure_password_hashing
+from app.services.llm_scheduler import SchedulerSaturated
+from app.services.token_budget import TokenBudgetExceeded, warn_if_unshared
 from app.routes.auth import router as auth_router
 from app.routes.coverletters import router as coverletters_router
+from app.routes.resumes import router as resumes_router
 
+log = logging.getLogger(__name__)
 
 
-limiter = Limiter(key_func=get_remote_address)
+def import_heavy_modules(in_process_pdf: bool):
+    # each of these costs hundreds of ms on first import; pay it before a user does
+    import docx  # noqa: F401
+    import openai  # noqa: F401
+    import pypdf  # noqa: F401
+    if in_process_pdf:
+        import weasyprint  # noqa: F401
+    from app.services.prompt_compact import get_encoder
 
-app = FastAPI(title="CoverLetter AI API")
+    get_encoder()  # tiktoken may download the encoding on first use
+
+async def warm_up(app: FastAPI):
+    """Runs once the server is accepting requests, so it never delays readiness."""
+    from app.db.session import get_engine
+    from app.services.llm_gateway import get_gateway
+    from app.services.pdf_cache import get_render_pool
+
+    render_pool = get_render_pool()
+    started = time.perf_counter()
+    try:
+        await run_in_threadpool(import_heavy_modules, render_pool is None)
+        await run_in_threadpool(get_engine)
+        get_gateway()
+        if render_pool is not None:
+            await render_pool.warm()
+    except Exception:
+        log.warning("Startup warm-up failed; dependencies will load on first use", exc_info=True)
+        return
+    app.state.warm = True
+    log.info("Warm-up finished in %.2fs", time.perf_counter() - started)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.services.jobs import JobWorkers
+    from app.services.pdf_cache import shutdown_render_pool
+    from app.services.resume_extract import shutdown_page_pool
+
+    if settings.BCRYPT_CALIBRATE_TARGET_MS:
+        configure_password_hashing(calibrate_bcrypt_rounds(settings.BCRYPT_CALIBRATE_TARGET_MS))
+    warn_if_unshared()
+
+    workers = JobWorkers(settings.JOB_WORKERS)
+    workers.start()
+    app.state.warm = False
+    warmup = asyncio.create_task(warm_up(app)) if settings.STARTUP_WARMUP else None
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    await workers.stop()
+    shutdown_render_pool()
+    shutdown_page_pool()
+
+app = FastAPI(title="CoverLetter AI API", lifespan=lifespan)
 app.state.limiter = limiter
 
 @app.exception_handler(RateLimitExceeded)
 def rate_limit_handler(request: Request, exc: RateLimitExceeded):
     return JSONResponse(status_code=429, content={"detail": "Too many requests. Slow down."})
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_list(),
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    expose_headers=["X-Access-Token"],  # frontend reads new access token here
-)
+@app.exception_handler(PasswordHasherBusy)
+def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(status_code=503, content={"detail": "Server busy. Try again shortly."},
+                        headers={"Retry-After": "2"})
+
+@app.exception_handler(TokenBudgetExceeded)
+def token_budget_handler(request: Request, exc: TokenBudgetExceeded):
+    return JSONResponse(status_code=429, content={"detail": "Daily generation limit reached. Try again tomorrow."},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(SchedulerSaturated)
+def scheduler_saturated_handler(request: Request, exc: SchedulerSaturated):
+    return JSONResponse(status_code=503, content={"detail": "Generation is at capacity. Try again shortly."},
+                        headers={"Retry-After": str(exc.retry_after)})
+
+# Starlette builds the middleware stack on the first ASGI call (lifespan startup),
+# so these factories read settings then rather than when app.main is imported.
+def body_size_limit(app):
+    return BodySizeLimitMiddleware(app, max_bytes=settings.MAX_REQUEST_BYTES)
+
+def cors(app):
+    return CORSMiddleware(
+        app,
+        allow_origins=settings.cors_list(),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Access-Token"],  # frontend reads new access token here
+    )
+
+# inside CORS so browsers can read the 413
+app.add_middleware(body_size_limit)
+app.add_middleware(cors)
 
 # Rate limit the most sensitive routes globally
 @app.middleware("http")
@@ -36,5 +122,36 @@ async def add_basic_security_headers(request: Request, call_next):
     response.headers["X-Frame-Options"] = "DENY"
     return response
 
+# outermost, so the histogram covers every other middleware too
+app.middleware("http")(observe_request)
+
 app.include_router(auth_router)
 app.include_router(coverletters_router)
+app.include_router(resumes_router)
+
+@app.get("/healthz", include_in_schema=False)
+def healthz(request: Request):
+    # answers as soon as the app can serve; "warm" turns true once the background warm-up is done
+    return {"status": "ok", "warm": getattr(request.app.state, "warm", False)}
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_operator)])
+def metrics():
+    return metrics_response()
+
+@app.get("/stats/cache", dependencies=[Depends(require_operator)])
+def cache_stats():
+    from app.services.generation_cache import generation_cache
+
+    return {"generation": vars(generation_cache.stats)}
+
+@app.get("/stats/llm", dependencies=[Depends(require_operator)])
+def llm_backend_stats():
+    from app.services.llm_gateway import get_gateway
+
+    return {b.name: {"model": b.model, **b.tracker.snapshot()} for b in get_gateway().backends}
+
+@app.get("/stats/db", dependencies=[Depends(require_operator)])
+def db_pool_stats():
+    from app.db.session import pool_stats
+
+    return {name: vars(stats) for name, stats in pool_stats.items()}
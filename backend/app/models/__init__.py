@@ -1,2 +1,6 @@
 from app.models.user import User
 from app.models.coverletter import CoverLetter
+from app.models.resume_blob import ResumeBlob
+from app.models.resume import Resume
+from app.models.generation_job import GenerationJob
+from app.models.coverletter_revision import CoverLetterRevision
@@ -1,9 +1,13 @@
-from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Text
+from sqlalchemy import DDL, Column, Integer, String, DateTime, event, func, ForeignKey, Text, Index, literal_column
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
 class CoverLetter(Base):
     __tablename__ = "cover_letters"
+    __table_args__ = (
+        # keyset pagination of a user's letters, newest first
+        Index("ix_cover_letters_user_created_id", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
@@ -15,11 +19,71 @@ class CoverLetter(Base):
     job_description = Column(Text, nullable=False)
     extra_notes = Column(Text, nullable=True)
 
-    resume_text = Column(Text, nullable=False)   # extracted text only
+    resume_blob_id = Column(Integer, ForeignKey("resume_blobs.id"), index=True, nullable=True)
+    legacy_resume_text = Column("resume_text", Text, nullable=True)  # rows created before resume_blobs
     ai_draft = Column(Text, nullable=False)
     edited_final = Column(Text, nullable=True)
+    edit_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped on every save
+    # "generating" while a streamed draft is still arriving, then "complete" | "failed" | "cancelled"
+    status = Column(String(20), nullable=False, default="complete", server_default="complete")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
 
     user = relationship("User")
+    resume_blob = relationship("ResumeBlob", lazy="joined")
+
+    @property
+    def resume_text(self) -> str:
+        if self.resume_blob is not None:
+            return self.resume_blob.text
+        return self.legacy_resume_text or ""
+
+
+# --- Full-text search (see app/services/search.py) ---
+
+SEARCH_CONFIG = "english"
+
+def search_vector():
+    """Weighted tsvector over company, title, letter text and job description.
+
+    Postgres only uses the GIN index when a query repeats this exact
+    expression, so the constants are inlined rather than bound parameters.
+    """
+    def doc(col, weight):
+        config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        return func.setweight(func.to_tsvector(config, func.coalesce(col, literal_column("''"))),
+                              literal_column(f"'{weight}'"))
+
+    return (
+        doc(CoverLetter.company_name, "A")
+        .op("||")(doc(CoverLetter.job_title, "A"))
+        .op("||")(doc(func.coalesce(CoverLetter.edited_final, CoverLetter.ai_draft), "B"))
+        .op("||")(doc(CoverLetter.job_description, "C"))
+    )
+
+Index("ix_cover_letters_search", search_vector(), postgresql_using="gin").ddl_if(dialect="postgresql")
+
+# SQLite has no tsvector; an FTS5 table kept in sync by triggers stands in (rowid = cover letter id)
+SQLITE_FTS_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS cover_letters_fts USING fts5(
+        company_name, job_title, body, job_description, user_id, tokenize='porter unicode61')""",
+    """CREATE TRIGGER IF NOT EXISTS cover_letters_fts_ai AFTER INSERT ON cover_letters BEGIN
+        INSERT INTO cover_letters_fts(rowid, company_name, job_title, body, job_description, user_id)
+        VALUES (new.id, new.company_name, new.job_title, coalesce(new.edited_final, new.ai_draft),
+                new.job_description, 'u' || new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cover_letters_fts_au
+    AFTER UPDATE OF company_name, job_title, job_description, ai_draft, edited_final ON cover_letters BEGIN
+        DELETE FROM cover_letters_fts WHERE rowid = old.id;
+        INSERT INTO cover_letters_fts(rowid, company_name, job_title, body, job_description, user_id)
+        VALUES (new.id, new.company_name, new.job_title, coalesce(new.edited_final, new.ai_draft),
+                new.job_description, 'u' || new.user_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS cover_letters_fts_ad AFTER DELETE ON cover_letters BEGIN
+        DELETE FROM cover_letters_fts WHERE rowid = old.id;
+    END""",
+]
+
+for _statement in SQLITE_FTS_DDL:
+    event.listen(CoverLetter.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
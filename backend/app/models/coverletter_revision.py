@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Text, JSON, UniqueConstraint
+from app.db.base import Base
+
+class CoverLetterRevision(Base):
+    """One saved version of a letter's edited text (see app.services.revisions).
+
+    Most rows hold only the patch ops that produced the version from the
+    previous one; every SNAPSHOT_EVERY versions (and for full-text saves)
+    the whole text is stored so rebuilding an old version stays cheap.
+    """
+    __tablename__ = "cover_letter_revisions"
+    __table_args__ = (
+        UniqueConstraint("cover_letter_id", "version", name="uq_cover_letter_revisions_version"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    cover_letter_id = Column(Integer, ForeignKey("cover_letters.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)
+
+    kind = Column(String(10), nullable=False)  # "snapshot" | "delta"
+    text = Column(Text, nullable=True)  # snapshots
+    ops = Column(JSON, nullable=True)  # deltas: [{"pos", "delete", "insert"}, ...]
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
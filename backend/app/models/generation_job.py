@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Text, JSON, Index
+from app.db.base import Base
+
+class GenerationJob(Base):
+    """A queued cover letter generation, processed by app.services.jobs workers."""
+    __tablename__ = "generation_jobs"
+    __table_args__ = (
+        Index("ix_generation_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    resume_blob_id = Column(Integer, ForeignKey("resume_blobs.id"), nullable=False)
+
+    status = Column(String(20), nullable=False, default="queued")  # queued | running | succeeded | failed
+    payload = Column(JSON, nullable=False)  # GenerateCoverLetterRequest fields (minus the resume)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    error = Column(Text, nullable=True)
+
+    cover_letter_id = Column(Integer, ForeignKey("cover_letters.id", ondelete="SET NULL"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
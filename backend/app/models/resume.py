@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+class Resume(Base):
+    """A user's saved resume; the extracted text lives in the shared ResumeBlob."""
+    __tablename__ = "resumes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    resume_blob_id = Column(Integer, ForeignKey("resume_blobs.id"), nullable=False)
+
+    name = Column(String(255), nullable=False)  # defaults to the uploaded filename
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    user = relationship("User")
+    resume_blob = relationship("ResumeBlob")
+
+    @property
+    def text(self) -> str:
+        return self.resume_blob.text
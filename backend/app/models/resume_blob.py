@@ -0,0 +1,12 @@
+from sqlalchemy import Column, Integer, String, DateTime, func, Text
+from app.db.base import Base
+
+class ResumeBlob(Base):
+    """Extracted resume text, stored once per distinct uploaded file."""
+    __tablename__ = "resume_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), unique=True, index=True, nullable=False)  # hash of the raw upload
+    text = Column(Text, nullable=False)  # normalized + truncated extraction result
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
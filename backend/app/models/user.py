@@ -8,4 +8,5 @@ class User(Base):
     email = Column(String(320), unique=True, index=True, nullable=False)
     full_name = Column(String(200), nullable=False)
     password_hash = Column(String(255), nullable=False)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke issued tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,16 +1,25 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
 from fastapi import APIRouter, Depends, HTTPException, Response, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.orm import Session
 from jose import JWTError
-from app.db.session import get_db
+from app.db.session import get_db, SessionLocal
 from app.models.user import User
+from app.services.resume_store import delete_orphan_blobs, user_blob_ids
+from starlette.concurrency import run_in_threadpool
 from app.core.security import (
-    hash_password, verify_password,
+    hash_password_async, verify_and_update_async,
     create_token, decode_token,
     access_expires, refresh_expires, safe_token_type
 )
-from app.schemas.auth import RegisterRequest, LoginRequest, UserOut
+from app.schemas.auth import RegisterRequest, LoginRequest, ChangePasswordRequest, UserOut
 from app.core.config import settings
-from app.main import limiter
+from app.core.metrics import timed
+from app.core.ratelimit import limiter
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -30,63 +39,144 @@ def set_refresh_cookie(resp: Response, token: str):
 def clear_refresh_cookie(resp: Response):
     resp.delete_cookie(key=REFRESH_COOKIE_NAME, path="/")
 
-def get_current_user(db: Session, authorization: str | None) -> User:
-    if not authorization or not authorization.startswith("Bearer "):
+@dataclass(frozen=True)
+class CurrentUser:
+    """The authenticated caller, built from access-token claims (no ORM row)."""
+    id: int
+    email: str
+    full_name: str
+
+class UserVersionCache:
+    """user_id -> token_version (None if the user no longer exists), with a short TTL.
+
+    Lets authentication skip the users table on almost every request.
+    revoke_tokens() and account deletion invalidate only this worker's entry:
+    other workers keep accepting the old tokens for up to AUTH_CACHE_TTL_S,
+    so keep that well below the access token lifetime.
+    """
+
+    def __init__(self, ttl_s: float, max_entries: int):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._data: OrderedDict[int, tuple[float, int | None]] = OrderedDict()
+        self._lock = threading.Lock()  # sync dependencies run on threadpool threads
+
+    def get(self, user_id: int) -> int | None:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(user_id)
+            if item and item[0] > now:
+                return item[1]
+        with SessionLocal() as db:
+            version = db.query(User.token_version).filter(User.id == user_id).scalar()
+        with self._lock:
+            self._data[user_id] = (now + self.ttl_s, version)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return version
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+@lru_cache
+def get_user_versions() -> UserVersionCache:
+    return UserVersionCache(settings.AUTH_CACHE_TTL_S, settings.AUTH_CACHE_MAX_ENTRIES)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def user_claims(user: User) -> dict:
+    return {"ver": user.token_version, "email": user.email, "name": user.full_name}
+
+def issue_tokens(resp: Response, user: User):
+    claims = user_claims(user)
+    access = create_token(str(user.id), "access", access_expires(), claims)
+    refresh = create_token(str(user.id), "refresh", refresh_expires(), {"ver": user.token_version})
+    set_refresh_cookie(resp, refresh)
+    # Access token returned in header; refresh token in httpOnly cookie
+    resp.headers["X-Access-Token"] = access
+
+def authenticate(credentials: HTTPAuthorizationCredentials | None) -> CurrentUser:
+    if credentials is None:
         raise HTTPException(status_code=401, detail="Missing access token")
-    token = authorization.split(" ", 1)[1].strip()
     try:
-        payload = decode_token(token)
+        payload = decode_token(credentials.credentials)
         if not safe_token_type(payload, "access"):
             raise HTTPException(status_code=401, detail="Invalid token type")
-        user_id = int(payload["sub"])
-    except (JWTError, ValueError):
+        user = CurrentUser(id=int(payload["sub"]), email=payload["email"], full_name=payload["name"])
+        token_version = int(payload["ver"])
+    except (JWTError, ValueError, KeyError):
         raise HTTPException(status_code=401, detail="Invalid access token")
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
+
+    current_version = get_user_versions().get(user.id)
+    if current_version is None:
         raise HTTPException(status_code=401, detail="User not found")
+    if current_version != token_version:
+        raise HTTPException(status_code=401, detail="Token revoked")
     return user
 
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+) -> CurrentUser:
+    with timed("auth"):
+        return authenticate(credentials)
+
+def find_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email.lower()).first()
+
+def save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+def revoke_tokens(db: Session, user_id: int):
+    """Bump the user's token_version so every access and refresh token issued so far stops working."""
+    db.query(User).filter(User.id == user_id).update(
+        {User.token_version: User.token_version + 1}, synchronize_session="fetch"
+    )
+    db.commit()
+    get_user_versions().invalidate(user_id)
+
 @router.post("/register", response_model=UserOut)
 @limiter.limit("5/minute")   # strict: avoid spam registrations
-def register(data: RegisterRequest, resp: Response, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email.lower()).first()
+async def register(data: RegisterRequest, request: Request, resp: Response, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(find_user_by_email, db, data.email)
     if existing:
         raise HTTPException(status_code=409, detail="Email already in use")
 
     user = User(
         email=data.email.lower(),
         full_name=data.full_name.strip(),
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password_async(data.password),
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-
-    access = create_token(str(user.id), "access", access_expires())
-    refresh = create_token(str(user.id), "refresh", refresh_expires())
-    set_refresh_cookie(resp, refresh)
+    user = await run_in_threadpool(save_user, db, user)
 
-    # Access token returned in body; refresh token in httpOnly cookie
-    resp.headers["X-Access-Token"] = access
+    issue_tokens(resp, user)
     return user
 
 @router.post("/login", response_model=UserOut)
 @limiter.limit("10/minute")  # strict: brute force protection
-def login(data: LoginRequest, resp: Response, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email.lower()).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: LoginRequest, request: Request, resp: Response, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(find_user_by_email, db, data.email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, new_hash = await verify_and_update_async(data.password, user.password_hash)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    if new_hash:
+        # cost setting changed since this hash was made; upgrade it transparently
+        user.password_hash = new_hash
+        user = await run_in_threadpool(save_user, db, user)
 
-    access = create_token(str(user.id), "access", access_expires())
-    refresh = create_token(str(user.id), "refresh", refresh_expires())
-    set_refresh_cookie(resp, refresh)
-    resp.headers["X-Access-Token"] = access
+    issue_tokens(resp, user)
     return user
 
 @router.post("/refresh")
 @limiter.limit("30/minute")  # moderate
-def refresh(req: Request, resp: Response):
-    token = req.cookies.get(REFRESH_COOKIE_NAME)
+def refresh(request: Request, resp: Response, db: Session = Depends(get_db)):
+    token = request.cookies.get(REFRESH_COOKIE_NAME)
     if not token:
         raise HTTPException(status_code=401, detail="Missing refresh token")
 
@@ -94,32 +184,76 @@ def refresh(req: Request, resp: Response):
         payload = decode_token(token)
         if not safe_token_type(payload, "refresh"):
             raise HTTPException(status_code=401, detail="Invalid token type")
-        user_id = payload["sub"]
-    except JWTError:
+        user_id = int(payload["sub"])
+    except (JWTError, ValueError):
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+
+    # refresh is rare, so it reads the row to pick up fresh claims for the access token
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user or payload.get("ver", 0) != user.token_version:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
-    new_access = create_token(str(user_id), "access", access_expires())
+    new_access = create_token(str(user.id), "access", access_expires(), user_claims(user))
     resp.headers["X-Access-Token"] = new_access
     return {"ok": True}
 
 @router.post("/logout")
 @limiter.limit("30/minute")
-def logout(resp: Response):
+def logout(request: Request, resp: Response, db: Session = Depends(get_db)):
+    token = request.cookies.get(REFRESH_COOKIE_NAME)
+    if token:
+        try:
+            payload = decode_token(token)
+            user_id = int(payload["sub"]) if safe_token_type(payload, "refresh") else None
+        except (JWTError, ValueError, KeyError):
+            user_id = None
+        if user_id is not None:
+            # signs out every session of the user, not just this browser
+            revoke_tokens(db, user_id)
     clear_refresh_cookie(resp)
     return {"ok": True}
 
+@router.post("/password")
+@limiter.limit("5/minute")
+async def change_password(
+    data: ChangePasswordRequest,
+    request: Request,
+    resp: Response,
+    current: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    user = await run_in_threadpool(db.get, User, current.id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    valid, _ = await verify_and_update_async(data.current_password, user.password_hash)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    user.password_hash = await hash_password_async(data.new_password)
+    user = await run_in_threadpool(save_user, db, user)
+    await run_in_threadpool(revoke_tokens, db, user.id)
+    await run_in_threadpool(db.refresh, user)
+
+    issue_tokens(resp, user)  # this session carries on with the new version
+    return {"ok": True}
+
 @router.get("/me", response_model=UserOut)
 @limiter.limit("60/minute")
-def me(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
+def me(request: Request, user: CurrentUser = Depends(get_current_user)):
     return user
 
 @router.delete("/account")
 @limiter.limit("5/minute")  # deleting accounts should be limited
-def delete_account(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
-    # hard delete user (cascade deletes cover letters)
+def delete_account(request: Request, current: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    user = db.query(User).filter(User.id == current.id).first()
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    blob_ids = user_blob_ids(db, user.id)
+    # hard delete user (cascade deletes cover letters, saved resumes and jobs)
     db.delete(user)
     db.commit()
+    delete_orphan_blobs(db, blob_ids)  # then the resume texts nobody else uses
+    # other workers answer "User not found" once their cached version expires (AUTH_CACHE_TTL_S)
+    get_user_versions().invalidate(current.id)
     return {"ok": True}
 
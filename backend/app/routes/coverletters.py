@@ -1,77 +1,209 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, status
-from fastapi.responses import Response
+import asyncio
+import json
+import logging
+import math
+import anyio
+from contextlib import aclosing
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, UploadFile, File, Form, status
+from fastapi.responses import Response, StreamingResponse
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.db.session import get_db
+from starlette.concurrency import run_in_threadpool
+from app.db.session import get_db, get_async_db, get_async_sessionmaker
 from app.models.coverletter import CoverLetter
-from app.routes.auth import get_current_user
+from app.models.generation_job import GenerationJob
+from app.models.resume_blob import ResumeBlob
+from app.routes.auth import CurrentUser, get_current_user
 from app.schemas.coverletter import (
-    GenerateCoverLetterRequest, CoverLetterOut, UpdateEditedFinalRequest
+    GenerateCoverLetterRequest, CoverLetterOut, UpdateEditedFinalRequest,
+    CoverLetterJob, BatchGenerateRequest, BatchGenerateOut, BatchItemResult,
+    CoverLetterPage, CoverLetterSummary, CoverLetterSearchOut,
+    PatchEditedRequest, EditAck, RevisionOut,
 )
-from app.services.resume_extract import extract_text_from_pdf, extract_text_from_docx
-from app.services.openai_client import generate_cover_letter
-from app.services.pdf_export import render_pdf_bytes
-from app.main import limiter
+from app.schemas.job import JobOut
+from app.services.bulk_export import EXPORT_FORMATS, stream_export
+from app.services.jobs import enqueue_job
+from app.services.llm_scheduler import SchedulerSaturated, get_llm_scheduler
+from app.services.listing import list_summaries
+from app.services.revisions import PatchError, VersionConflict, save_edit, text_at_version
+from app.services.search import search_coverletters
+from app.services.resume_extract import ExtractionBusy, ExtractionTimeout, UnreadableResume, extract_resume_text
+from app.services.upload import file_digest, sniff_kind, upload_size
+from app.services.resume_store import delete_orphan_blobs, lookup_resume_text, store_resume_text, saved_resume_text
+from app.services.openai_client import generate_cover_letter, stream_cover_letter
+from app.services.pdf_export import cover_letter_title
+from app.services.pdf_renderer import RenderQueueFull, RenderTimeout, RenderUnavailable
+from app.services.token_budget import TokenBudgetExceeded, get_token_budget
+from app.services.pdf_cache import get_or_render_pdf, invalidate_pdf, pdf_cache_key, prerender_pdf
+from app.core.config import settings
+from app.core.metrics import timed
+from app.core.ratelimit import limiter
 
-router = APIRouter(prefix="/coverletters", tags=["coverletters"])
+log = logging.getLogger(__name__)
 
-ALLOWED_TYPES = {
-    "application/pdf": "pdf",
-    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
-}
+router = APIRouter(prefix="/coverletters", tags=["coverletters"])
 
 MAX_UPLOAD_BYTES = 5 * 1024 * 1024  # 5MB
 
+STREAM_PERSIST_EVERY_CHARS = 400  # how much streamed text may be lost if the worker dies
+
 def require_owner(db: Session, user_id: int, cover_id: int) -> CoverLetter:
     cl = db.query(CoverLetter).filter(CoverLetter.id == cover_id, CoverLetter.user_id == user_id).first()
     if not cl:
         raise HTTPException(status_code=404, detail="Not found")
     return cl
 
-@router.get("", response_model=list[CoverLetterOut])
+def save(db: Session, obj):
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+async def asave(db: AsyncSession, obj):
+    db.add(obj)
+    await db.commit()
+    await db.refresh(obj)  # also loads lazy="joined" relationships such as resume_blob
+    return obj
+
+@router.get("", response_model=CoverLetterPage)
 @limiter.limit("60/minute")
-def list_coverletters(request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
-    items = (
-        db.query(CoverLetter)
-        .filter(CoverLetter.user_id == user.id)
-        .order_by(CoverLetter.created_at.desc())
-        .all()
+def list_coverletters(
+    request: Request,
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = None,
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        rows, next_cursor = list_summaries(db, user.id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return CoverLetterPage(
+        items=[CoverLetterSummary.model_validate(r) for r in rows],
+        next_cursor=next_cursor,
     )
-    return items
 
-@router.get("/{cover_id}", response_model=CoverLetterOut)
+# declared before /{cover_id} so "search" and "export" are not parsed as ids
+@router.get("/search", response_model=CoverLetterSearchOut)
 @limiter.limit("60/minute")
-def get_coverletter(cover_id: int, request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
-    return require_owner(db, user.id, cover_id)
-
-@router.post("/generate", response_model=CoverLetterOut)
-@limiter.limit("3/minute")   # VERY important: cost control + abuse prevention
-async def generate(
+def find_coverletters(
     request: Request,
-    data: GenerateCoverLetterRequest,
-    resume: UploadFile = File(...),
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=50),
+    user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
-    user = get_current_user(db, request.headers.get("Authorization"))
+    with timed("search"):
+        rows = search_coverletters(db, user.id, q, limit)
+    return CoverLetterSearchOut(items=[CoverLetterSummary.model_validate(r) for r in rows])
 
-    if resume.content_type not in ALLOWED_TYPES:
-        raise HTTPException(status_code=400, detail="Resume must be a PDF or DOCX")
+def parse_ids(ids: str) -> list[int]:
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be comma-separated integers")
+    parsed = list(dict.fromkeys(parsed))  # drop repeats, keep order
+    if not parsed:
+        raise HTTPException(status_code=422, detail="No ids given")
+    if len(parsed) > settings.EXPORT_MAX_LETTERS:
+        raise HTTPException(status_code=422, detail=f"At most {settings.EXPORT_MAX_LETTERS} letters per export")
+    return parsed
+
+@router.get("/export")
+@limiter.limit("5/minute")  # each export can be up to EXPORT_MAX_LETTERS renders
+async def export_coverletters(
+    request: Request,
+    ids: str = Query(min_length=1, max_length=2000),
+    fmt: str = Query(default="pdf", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    wanted = parse_ids(ids)
+    with timed("export_query"):
+        rows = (await db.execute(
+            select(CoverLetter.id, CoverLetter.input_full_name, CoverLetter.company_name, CoverLetter.job_title,
+                   CoverLetter.edited_final, CoverLetter.ai_draft, CoverLetter.created_at)
+            .where(CoverLetter.id.in_(wanted), CoverLetter.user_id == user.id)
+        )).all()
+    await db.close()  # release before rendering
+    if len(rows) != len(wanted):
+        raise HTTPException(status_code=404, detail="Not found")
+
+    by_id = {row.id: row for row in rows}
+    return StreamingResponse(
+        stream_export([by_id[i] for i in wanted], fmt, settings.EXPORT_RENDER_CONCURRENCY),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="cover_letters.zip"'},
+    )
 
-    raw = await resume.read()
-    if len(raw) > MAX_UPLOAD_BYTES:
+@router.get("/{cover_id}", response_model=CoverLetterOut)
+@limiter.limit("60/minute")
+def get_coverletter(cover_id: int, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    return require_owner(db, user.id, cover_id)
+
+async def read_resume(resume: UploadFile, db: AsyncSession) -> tuple[int, str]:
+    """Return (resume_blob_id, text), parsing only files we have never seen.
+
+    Works on the spooled upload in place; the body size middleware has
+    already capped how much of it was accepted.
+    """
+    f = resume.file
+    size = resume.size if resume.size is not None else upload_size(f)
+    if size > MAX_UPLOAD_BYTES:
         raise HTTPException(status_code=400, detail="Resume file too large (max 5MB)")
 
-    kind = ALLOWED_TYPES[resume.content_type]
-    if kind == "pdf":
-        resume_text = extract_text_from_pdf(raw)
-    else:
-        resume_text = extract_text_from_docx(raw)
+    # the declared content type is client-controlled; trust the bytes instead
+    kind = await run_in_threadpool(sniff_kind, f)
+    if kind is None:
+        raise HTTPException(status_code=400, detail="Resume must be a PDF or DOCX")
+
+    # content address for the upload; identical files share one extraction
+    with timed("resume_digest"):
+        digest = await run_in_threadpool(file_digest, f)
+    with timed("resume_lookup"):
+        cached = await lookup_resume_text(db, digest)
+    # end the read transaction so no connection is held while parsing / calling OpenAI
+    await db.close()
+    if cached:
+        return cached
+
+    try:
+        with timed(f"extract_{kind}"):
+            resume_text = await extract_resume_text(f, kind)  # the spool itself, read in place
+    except UnreadableResume:
+        raise HTTPException(status_code=400, detail="Resume file is damaged or not a valid PDF/DOCX")
+    except ExtractionTimeout:
+        # nothing is stored, so a retry (or another upload of the same file) starts over
+        raise HTTPException(status_code=400, detail="Resume took too long to read; try a smaller file")
+    except ExtractionBusy:
+        raise HTTPException(status_code=503, detail="Too many resumes are being read. Try again shortly.",
+                            headers={"Retry-After": str(math.ceil(settings.EXTRACT_TIME_BUDGET_S))})
 
     if not resume_text or len(resume_text) < 50:
         raise HTTPException(status_code=400, detail="Could not extract usable text from resume")
 
-    payload = {
+    with timed("resume_store"):
+        blob_id = await store_resume_text(db, digest, resume_text)
+    await db.close()
+    return blob_id, resume_text
+
+async def resolve_resume(db: AsyncSession, user_id: int, resume: UploadFile | None, resume_id: int | None) -> tuple[int, str]:
+    if (resume is None) == (resume_id is None):
+        raise HTTPException(status_code=400, detail="Provide either a resume file or resume_id")
+    if resume is not None:
+        return await read_resume(resume, db)
+
+    saved = await saved_resume_text(db, user_id, resume_id)
+    await db.close()
+    if not saved:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return saved
+
+def build_payload(data: CoverLetterJob, resume_text: str) -> dict:
+    return {
         "input_full_name": data.input_full_name,
         "job_title": data.job_title,
         "company_name": data.company_name,
@@ -81,58 +213,328 @@ async def generate(
         "extra_notes": data.extra_notes,
     }
 
-    ai_draft = generate_cover_letter(payload)
-
-    cl = CoverLetter(
-        user_id=user.id,
+def new_coverletter(user_id: int, data: CoverLetterJob, resume_blob_id: int, **fields) -> CoverLetter:
+    return CoverLetter(
+        user_id=user_id,
         input_full_name=data.input_full_name,
         job_title=data.job_title,
         company_name=data.company_name,
         tone=data.tone,
         job_description=data.job_description,
         extra_notes=data.extra_notes,
-        resume_text=resume_text,
-        ai_draft=ai_draft,
+        resume_blob_id=resume_blob_id,
         edited_final=None,
+        **fields,
     )
+
+def generate_form(
+    input_full_name: str | None = Form(default=None),
+    job_title: str | None = Form(default=None),
+    company_name: str | None = Form(default=None),
+    tone: str | None = Form(default=None),
+    job_description: str | None = Form(default=None),
+    extra_notes: str | None = Form(default=None),
+    force_regenerate: bool = Form(default=False),
+    resume_id: int | None = Form(default=None),
+) -> GenerateCoverLetterRequest:
+    """GenerateCoverLetterRequest from multipart fields, sent next to the resume file.
+
+    A model declared as one Form(...) parameter beside a File is treated
+    as a single embedded field, so the fields are declared one by one and
+    validated by the model here.
+    """
+    fields = {k: v for k, v in locals().items() if v is not None}
+    try:
+        return GenerateCoverLetterRequest.model_validate(fields)
+    except ValidationError as exc:
+        raise RequestValidationError([{**e, "loc": ("body", *e["loc"])} for e in exc.errors()])
+
+@router.post("/generate", response_model=CoverLetterOut)
+@limiter.limit("3/minute")   # VERY important: cost control + abuse prevention
+async def generate(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    data: GenerateCoverLetterRequest = Depends(generate_form),
+    resume: UploadFile | None = File(default=None),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await get_token_budget().check(user.id)
+    blob_id, resume_text = await resolve_resume(db, user.id, resume, data.resume_id)
+
+    ai_draft = await generate_cover_letter(build_payload(data, resume_text), data.force_regenerate, user.id)
+
+    cl = new_coverletter(user.id, data, blob_id, ai_draft=ai_draft)
+    if settings.PDF_PRERENDER:
+        background_tasks.add_task(prerender_pdf, cover_letter_title(data.input_full_name), ai_draft)
+    with timed("db_commit"):
+        return await asave(db, cl)
+
+async def save_batch(db: AsyncSession, user_id: int, blob_id: int, items: list[CoverLetterJob], drafts: list) -> list[BatchItemResult]:
+    blob = await db.get(ResumeBlob, blob_id)  # shared by every row; avoids a lazy load per letter
+    rows = {
+        i: new_coverletter(user_id, item, blob_id, ai_draft=draft, resume_blob=blob)
+        for i, (item, draft) in enumerate(zip(items, drafts))
+        if isinstance(draft, str)
+    }
+    db.add_all(rows.values())
+    await db.flush()  # assigns ids; everything lands in one transaction
+    results = [
+        BatchItemResult(index=i, cover_letter=CoverLetterOut.model_validate(rows[i]))
+        if i in rows else BatchItemResult(index=i, error="Generation failed")
+        for i in range(len(items))
+    ]
+    await db.commit()
+    return results
+
+@router.post("/generate/batch", response_model=BatchGenerateOut)
+@limiter.limit("3/minute")   # each call carries up to 25 letters
+async def generate_batch(
+    request: Request,
+    batch: str = Form(..., description="BatchGenerateRequest as JSON"),
+    resume: UploadFile | None = File(default=None),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    try:
+        body = BatchGenerateRequest.model_validate_json(batch)
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors())
+
+    await get_token_budget().check(user.id)
+    get_llm_scheduler().check("batch")  # refuse the whole batch now rather than fail items one by one
+    # one upload, one extraction, shared by every item
+    blob_id, resume_text = await resolve_resume(db, user.id, resume, body.resume_id)
+
+    sem = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(item: CoverLetterJob) -> str:
+        async with sem:
+            return await generate_cover_letter(build_payload(item, resume_text), item.force_regenerate, user.id,
+                                               lane="batch")
+
+    drafts = await asyncio.gather(*(run(item) for item in body.items), return_exceptions=True)
+    for i, draft in enumerate(drafts):
+        if isinstance(draft, BaseException):
+            log.error("batch item %s failed", i, exc_info=draft)
+
+    results = await save_batch(db, user.id, blob_id, body.items, drafts)
+    return BatchGenerateOut(results=results)
+
+def sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_error_detail(exc: Exception) -> str:
+    if isinstance(exc, TokenBudgetExceeded):
+        return "Daily generation limit reached. Try again tomorrow."
+    if isinstance(exc, SchedulerSaturated):
+        return "Generation is at capacity. Try again shortly."
+    return "Generation failed"
+
+async def persist_draft(cover_id: int, ai_draft: str, status: str):
+    # short-lived session per write; nothing is held open while tokens stream
+    async with get_async_sessionmaker()() as db:
+        await db.execute(
+            update(CoverLetter).where(CoverLetter.id == cover_id).values(ai_draft=ai_draft, status=status)
+        )
+        await db.commit()
+
+@router.post("/generate/stream")
+@limiter.limit("3/minute")   # same cost-control budget as /generate
+async def generate_stream(
+    request: Request,
+    data: GenerateCoverLetterRequest = Depends(generate_form),
+    resume: UploadFile | None = File(default=None),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await get_token_budget().check(user.id)
+    get_llm_scheduler().check("interactive")  # once the stream has started, a 503 can no longer be sent
+    blob_id, resume_text = await resolve_resume(db, user.id, resume, data.resume_id)
+    payload = build_payload(data, resume_text)
+
+    # Row exists up front so the client has an id even if the stream is cut
+    cl = new_coverletter(user.id, data, blob_id, ai_draft="", status="generating")
     db.add(cl)
-    db.commit()
-    db.refresh(cl)
-    return cl
+    await db.commit()
+    cover_id = cl.id
+    await db.close()
+
+    async def events():
+        parts: list[str] = []
+        received = persisted = 0
+        status = "failed"
+        try:
+            yield sse("start", {"id": cover_id})
+            async with aclosing(stream_cover_letter(payload, data.force_regenerate, user.id)) as deltas:
+                async for delta in deltas:
+                    if await request.is_disconnected():
+                        status = "cancelled"
+                        break  # leaving the block closes the upstream request
+                    parts.append(delta)
+                    received += len(delta)
+                    yield sse("delta", {"text": delta})
+                    if received - persisted >= STREAM_PERSIST_EVERY_CHARS:
+                        await persist_draft(cover_id, "".join(parts), "generating")
+                        persisted = received
+                else:
+                    status = "complete"
+            yield sse("done", {"id": cover_id, "status": status})
+        except (asyncio.CancelledError, GeneratorExit):
+            status = "cancelled"  # the client went away and the response was torn down mid-stream
+            raise
+        except Exception as exc:
+            # headers are long gone, so the failure is reported in-band; the partial text stays "failed"
+            log.error("stream for cover letter %s failed", cover_id, exc_info=exc)
+            yield sse("error", {"id": cover_id, "status": status, "detail": stream_error_detail(exc)})
+        finally:
+            # shielded: after a disconnect this runs inside an already-cancelled scope
+            with anyio.CancelScope(shield=True):
+                await persist_draft(cover_id, "".join(parts).strip(), status)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/jobs", response_model=JobOut, status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("10/minute")  # queued work is paced by the workers, not this limit
+async def enqueue_generation(
+    request: Request,
+    data: GenerateCoverLetterRequest = Depends(generate_form),
+    resume: UploadFile | None = File(default=None),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    await get_token_budget().check(user.id)
+    blob_id, _ = await resolve_resume(db, user.id, resume, data.resume_id)
+    return await enqueue_job(db, user.id, blob_id, data.model_dump())
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+@limiter.limit("120/minute")  # clients poll this
+def get_generation_job(job_id: int, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    job = db.query(GenerationJob).filter(GenerationJob.id == job_id, GenerationJob.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Not found")
+    return job
+
+def schedule_pdf_refresh(background_tasks: BackgroundTasks, full_name: str, previous: str, current: str):
+    if previous == current:
+        return
+    title = cover_letter_title(full_name)
+    background_tasks.add_task(invalidate_pdf, title, previous)
+    if settings.PDF_PRERENDER:
+        background_tasks.add_task(prerender_pdf, title, current)
+
+def conflict(exc: VersionConflict) -> HTTPException:
+    return HTTPException(status_code=409, detail={"message": "Edited by someone else",
+                                                  "current_version": exc.current_version})
 
 @router.put("/{cover_id}/edited", response_model=CoverLetterOut)
 @limiter.limit("60/minute")
-def update_edited_final(cover_id: int, body: UpdateEditedFinalRequest, request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
-    cl = require_owner(db, user.id, cover_id)
-    cl.edited_final = body.edited_final
-    db.add(cl)
-    db.commit()
-    db.refresh(cl)
-    return cl
+def update_edited_final(
+    cover_id: int,
+    body: UpdateEditedFinalRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Replace the whole text; stored as a snapshot revision. Autosave should use PATCH."""
+    try:
+        saved = save_edit(db, user.id, cover_id, None, text=body.edited_final)
+    except VersionConflict as exc:
+        raise conflict(exc)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    _, previous, current, full_name = saved
+    schedule_pdf_refresh(background_tasks, full_name, previous, current)
+    return require_owner(db, user.id, cover_id)
+
+@router.patch("/{cover_id}/edited", response_model=EditAck)
+@limiter.limit("240/minute")  # autosave; each call carries only the changed spans
+def patch_edited_final(
+    cover_id: int,
+    body: PatchEditedRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    user: CurrentUser = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    ops = [op.model_dump() for op in body.ops]
+    try:
+        saved = save_edit(db, user.id, cover_id, body.base_version, ops=ops)
+    except VersionConflict as exc:
+        raise conflict(exc)
+    except PatchError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    version, previous, current, full_name = saved
+    schedule_pdf_refresh(background_tasks, full_name, previous, current)
+    return EditAck(id=cover_id, version=version)
+
+@router.get("/{cover_id}/revisions/{version}", response_model=RevisionOut)
+@limiter.limit("60/minute")
+def get_revision(cover_id: int, version: int, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    text = text_at_version(db, user.id, cover_id, version)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return RevisionOut(version=version, text=text)
 
 @router.delete("/{cover_id}")
 @limiter.limit("30/minute")
-def delete_coverletter(cover_id: int, request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
+def delete_coverletter(cover_id: int, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
     cl = require_owner(db, user.id, cover_id)
+    blob_id = cl.resume_blob_id
     db.delete(cl)
     db.commit()
+    delete_orphan_blobs(db, [blob_id])
     return {"ok": True}
 
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
 @router.get("/{cover_id}/pdf")
 @limiter.limit("20/minute")  # prevents hammering PDF renderer
-def download_pdf(cover_id: int, request: Request, db: Session = Depends(get_db)):
-    user = get_current_user(db, request.headers.get("Authorization"))
-    cl = require_owner(db, user.id, cover_id)
+async def download_pdf(cover_id: int, request: Request, user: CurrentUser = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    with timed("pdf_query"):
+        cl = (await db.execute(
+            select(CoverLetter.input_full_name, CoverLetter.company_name, CoverLetter.job_title,
+                   CoverLetter.edited_final, CoverLetter.ai_draft)
+            .where(CoverLetter.id == cover_id, CoverLetter.user_id == user.id)
+        )).first()
+    await db.close()  # release before rendering
+    if not cl:
+        raise HTTPException(status_code=404, detail="Not found")
 
     content = cl.edited_final or cl.ai_draft
-    title = f"{cl.input_full_name} — Cover Letter"
-    pdf_bytes = render_pdf_bytes(title, content)
-
+    title = cover_letter_title(cl.input_full_name)
     filename = f"Cover_Letter_{cl.company_name}_{cl.job_title}.pdf".replace(" ", "_")
+
+    # the cache key doubles as the ETag: it changes exactly when the PDF would
+    etag = f'"{pdf_cache_key(title, content)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        with timed("pdf_render"):  # includes PDF cache hits
+            pdf_bytes = await get_or_render_pdf(title, content)
+    except RenderQueueFull:
+        raise HTTPException(status_code=503, detail="PDF renderer is busy, try again shortly",
+                            headers={"Retry-After": "5"})
+    except RenderUnavailable:
+        raise HTTPException(status_code=503, detail="PDF renderer is restarting, try again shortly",
+                            headers={"Retry-After": "5"})
+    except RenderTimeout:
+        raise HTTPException(status_code=504, detail="PDF rendering timed out")
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        headers={**headers, "Content-Disposition": f'attachment; filename="{filename}"'},
     )
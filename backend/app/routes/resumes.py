@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File, Form
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_db, get_async_db
+from app.models.resume import Resume
+from app.routes.auth import CurrentUser, get_current_user
+from app.routes.coverletters import asave, read_resume, save
+from app.services.resume_store import delete_orphan_blobs
+from app.schemas.resume import ResumeOut, ResumeDetailOut, RenameResumeRequest
+from app.core.ratelimit import limiter
+
+router = APIRouter(prefix="/resumes", tags=["resumes"])
+
+def require_owner(db: Session, user_id: int, resume_id: int) -> Resume:
+    r = db.query(Resume).filter(Resume.id == resume_id, Resume.user_id == user_id).first()
+    if not r:
+        raise HTTPException(status_code=404, detail="Not found")
+    return r
+
+@router.get("", response_model=list[ResumeOut])
+@limiter.limit("60/minute")
+def list_resumes(request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    return (
+        db.query(Resume)
+        .filter(Resume.user_id == user.id)
+        .order_by(Resume.created_at.desc())
+        .all()
+    )
+
+@router.post("", response_model=ResumeOut)
+@limiter.limit("10/minute")  # uploads are parsed; keep them rare
+async def upload_resume(
+    request: Request,
+    resume: UploadFile = File(...),
+    name: str | None = Form(default=None, max_length=255),
+    user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    blob_id, _ = await read_resume(resume, db)
+    r = Resume(
+        user_id=user.id,
+        resume_blob_id=blob_id,
+        name=(name or resume.filename or "Resume").strip()[:255],
+    )
+    return await asave(db, r)
+
+@router.get("/{resume_id}", response_model=ResumeDetailOut)
+@limiter.limit("60/minute")
+def get_resume(resume_id: int, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    return require_owner(db, user.id, resume_id)
+
+@router.patch("/{resume_id}", response_model=ResumeOut)
+@limiter.limit("30/minute")
+def rename_resume(resume_id: int, body: RenameResumeRequest, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    r = require_owner(db, user.id, resume_id)
+    r.name = body.name.strip()
+    return save(db, r)
+
+@router.delete("/{resume_id}")
+@limiter.limit("30/minute")
+def delete_resume(resume_id: int, request: Request, user: CurrentUser = Depends(get_current_user), db: Session = Depends(get_db)):
+    r = require_owner(db, user.id, resume_id)
+    blob_id = r.resume_blob_id
+    db.delete(r)
+    db.commit()
+    # the blob goes too unless a letter (or another user's identical upload) still uses it
+    delete_orphan_blobs(db, [blob_id])
+    return {"ok": True}
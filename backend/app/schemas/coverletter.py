@@ -1,15 +1,24 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 from typing import Optional, Literal
 
 Tone = Literal["professional", "friendly"]
 
-class GenerateCoverLetterRequest(BaseModel):
+class CoverLetterJob(BaseModel):
     input_full_name: str = Field(min_length=1, max_length=200)
     job_title: str = Field(min_length=1, max_length=200)
     company_name: str = Field(min_length=1, max_length=200)
     tone: Tone
     job_description: str = Field(min_length=20, max_length=20000)
     extra_notes: Optional[str] = Field(default=None, max_length=5000)
+    force_regenerate: bool = False  # bypass the generation cache
+
+class GenerateCoverLetterRequest(CoverLetterJob):
+    resume_id: Optional[int] = None  # use a saved resume instead of uploading a file
+
+class BatchGenerateRequest(BaseModel):
+    resume_id: Optional[int] = None
+    items: list[CoverLetterJob] = Field(min_length=1, max_length=25)
 
 class CoverLetterOut(BaseModel):
     id: int
@@ -22,9 +31,55 @@ class CoverLetterOut(BaseModel):
     resume_text: str
     ai_draft: str
     edited_final: Optional[str]
+    edit_version: int
+    status: str
+
+    class Config:
+        from_attributes = True
+
+class CoverLetterSummary(BaseModel):
+    id: int
+    company_name: str
+    job_title: str
+    tone: str
+    status: str
+    created_at: datetime
+    snippet: str
 
     class Config:
         from_attributes = True
 
+class CoverLetterPage(BaseModel):
+    items: list[CoverLetterSummary]
+    next_cursor: Optional[str]  # pass back as ?cursor= for the next page; null on the last page
+
+class CoverLetterSearchOut(BaseModel):
+    items: list[CoverLetterSummary]  # best match first; snippet is HTML-escaped with matches in <mark>
+
 class UpdateEditedFinalRequest(BaseModel):
     edited_final: str = Field(min_length=1, max_length=30000)
+
+class EditOp(BaseModel):
+    pos: int = Field(ge=0)  # UTF-16 code units (JS string index) into the text as left by the previous op
+    delete: int = Field(default=0, ge=0)  # UTF-16 code units
+    insert: str = Field(default="", max_length=30000)
+
+class PatchEditedRequest(BaseModel):
+    base_version: int = Field(ge=0)  # the edit_version the ops were computed against
+    ops: list[EditOp] = Field(min_length=1, max_length=500)
+
+class EditAck(BaseModel):
+    id: int
+    version: int
+
+class RevisionOut(BaseModel):
+    version: int
+    text: str
+
+class BatchItemResult(BaseModel):
+    index: int
+    cover_letter: Optional[CoverLetterOut] = None
+    error: Optional[str] = None
+
+class BatchGenerateOut(BaseModel):
+    results: list[BatchItemResult]
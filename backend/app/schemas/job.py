@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+
+class JobOut(BaseModel):
+    id: int
+    status: str
+    attempts: int
+    error: Optional[str]
+    cover_letter_id: Optional[int]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,16 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class ResumeOut(BaseModel):
+    id: int
+    name: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ResumeDetailOut(ResumeOut):
+    text: str
+
+class RenameResumeRequest(BaseModel):
+    name: str = Field(min_length=1, max_length=255)
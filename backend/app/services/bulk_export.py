@@ -0,0 +1,118 @@
+"""Zip archives of many cover letters, rendered concurrently and streamed.
+
+Letters are rendered a window at a time (PDFs through the render pool,
+so they spread over its worker processes) and written to the archive in
+request order as soon as each is ready. The zip is written to a sink
+that is drained after every member, so the server holds at most the
+window of rendered files, never the whole archive.
+
+A letter that fails to render cannot turn into an error status once the
+response has started; it is listed in ERRORS.txt inside the archive.
+"""
+import asyncio
+import logging
+import re
+import zipfile
+from collections import deque
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.docx_export import render_docx_bytes
+from app.services.pdf_cache import get_or_render_pdf
+from app.services.pdf_export import cover_letter_title
+from app.services.pdf_renderer import RenderQueueFull
+
+log = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("pdf", "docx", "txt")
+QUEUE_FULL_RETRIES = 5
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+class _ZipSink:
+    """Write-only file for ZipFile; zipfile adds data descriptors since it cannot seek."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archive_name(row, fmt: str, taken: set[str]) -> str:
+    stem = _UNSAFE_NAME.sub("_", f"Cover_Letter_{row.company_name}_{row.job_title}").strip("_")
+    name = f"{stem}.{fmt}"
+    if name in taken:
+        name = f"{stem}_{row.id}.{fmt}"
+    taken.add(name)
+    return name
+
+
+async def render_letter(fmt: str, title: str, body_text: str) -> bytes:
+    if fmt == "txt":
+        return f"{title}\n\n{body_text}\n".encode("utf-8")
+    if fmt == "docx":
+        return await run_in_threadpool(render_docx_bytes, title, body_text)
+    for attempt in range(QUEUE_FULL_RETRIES):
+        try:
+            return await get_or_render_pdf(title, body_text)
+        except RenderQueueFull:
+            # single downloads are filling the pool; an export can wait its turn
+            await asyncio.sleep(0.5 * (attempt + 1))
+    return await get_or_render_pdf(title, body_text)
+
+
+async def stream_export(rows, fmt: str, concurrency: int):
+    """Yield zip bytes for rows (id, input_full_name, company_name, job_title,
+    edited_final, ai_draft, created_at), in the order given."""
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, "w")
+    compression = zipfile.ZIP_DEFLATED if fmt == "txt" else zipfile.ZIP_STORED  # pdf/docx are compressed already
+    rows = iter(rows)
+    pending: deque = deque()
+    taken: set[str] = set()
+    failed: list[str] = []
+
+    def submit():
+        row = next(rows, None)
+        if row is not None:
+            title = cover_letter_title(row.input_full_name)
+            task = asyncio.ensure_future(render_letter(fmt, title, row.edited_final or row.ai_draft))
+            pending.append((row, task))
+
+    for _ in range(concurrency):
+        submit()
+    try:
+        while pending:
+            row, task = pending.popleft()
+            name = archive_name(row, fmt, taken)
+            try:
+                data = await task
+            except Exception:
+                log.warning("Export render failed for cover letter %s", row.id, exc_info=True)
+                failed.append(name)
+                data = None
+            submit()
+            if data is not None:
+                info = zipfile.ZipInfo(name, date_time=row.created_at.timetuple()[:6])
+                info.compress_type = compression
+                archive.writestr(info, data)
+                yield sink.drain()
+        if failed:
+            archive.writestr("ERRORS.txt", "These letters could not be rendered:\n" + "\n".join(failed) + "\n")
+        archive.close()
+        yield sink.drain()
+    finally:
+        # client went away mid-download: stop rendering what nobody will read
+        for _, task in pending:
+            task.cancel()
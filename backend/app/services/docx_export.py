@@ -0,0 +1,28 @@
+import io
+
+def render_docx_bytes(title: str, body_text: str) -> bytes:
+    """Same layout as the PDF (bold title, then the letter), without a browser engine."""
+    import docx
+    from docx.shared import Pt
+
+    document = docx.Document()
+    style = document.styles["Normal"]
+    style.font.name = "Arial"
+    style.font.size = Pt(12)
+
+    heading = document.add_paragraph()
+    run = heading.add_run(title)
+    run.bold = True
+    run.font.size = Pt(14)
+
+    # blank lines separate paragraphs; single newlines stay line breaks within one
+    for block in body_text.split("\n\n"):
+        paragraph = document.add_paragraph()
+        for i, line in enumerate(block.split("\n")):
+            if i:
+                paragraph.add_run().add_break()
+            paragraph.add_run(line)
+
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
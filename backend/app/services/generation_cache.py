@@ -0,0 +1,65 @@
+"""Cache of generated drafts keyed by the exact prompt, model and temperature."""
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+
+from app.core.cache import make_cache
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+def generation_key(messages: list[dict], model: str, temperature: float) -> str:
+    # whitespace-only differences (trailing spaces, CRLF, re-pasted postings) hit the same entry
+    normalized = [
+        {"role": m["role"], "content": " ".join(m["content"].split())}
+        for m in messages
+    ]
+    blob = json.dumps(
+        {"model": model, "temperature": temperature, "messages": normalized},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    tokens_saved: int = 0
+    seconds_saved: float = 0.0
+
+class GenerationCache:
+    def __init__(self):
+        self._backend = None
+        self.stats = CacheStats()
+
+    @property
+    def backend(self):
+        # opened on first lookup so the module-level instance reads no settings at import
+        if self._backend is None:
+            self._backend = make_cache(settings.GEN_CACHE_BACKEND, "gen", settings.GEN_CACHE_MAX_ENTRIES)
+        return self._backend
+
+    async def get(self, key: str) -> str | None:
+        try:
+            raw = await self.backend.get(key)
+        except Exception:
+            log.warning("generation cache read failed", exc_info=True)
+            raw = None
+        if raw is None:
+            self.stats.misses += 1
+            return None
+        entry = json.loads(raw)
+        self.stats.hits += 1
+        self.stats.tokens_saved += entry.get("tokens", 0)
+        self.stats.seconds_saved += entry.get("seconds", 0.0)
+        return entry["text"]
+
+    async def set(self, key: str, text: str, tokens: int = 0, seconds: float = 0.0):
+        entry = json.dumps({"text": text, "tokens": tokens, "seconds": round(seconds, 3)})
+        try:
+            await self.backend.set(key, entry.encode("utf-8"), settings.GEN_CACHE_TTL_S)
+        except Exception:
+            log.warning("generation cache write failed", exc_info=True)
+
+generation_cache = GenerationCache()
@@ -0,0 +1,203 @@
+"""Database-backed generation queue.
+
+Jobs live in the generation_jobs table. Workers claim them with
+SELECT ... FOR UPDATE SKIP LOCKED on Postgres; SQLite has no row locks, so
+the claim is always confirmed with a conditional UPDATE on the status.
+
+A claim is a lease of JOB_LEASE_S, and its locked_at timestamp identifies
+the claimant. Finishing or failing a job only succeeds while that lease
+still holds: a worker that overran it (and may have been replaced by
+another that re-claimed the job) drops its result instead of overwriting
+the newer attempt.
+"""
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import JOBS_FINISHED
+from app.db.session import SessionLocal
+from app.models.coverletter import CoverLetter
+from app.models.generation_job import GenerationJob
+from app.models.resume_blob import ResumeBlob
+from app.services.llm_gateway import retryable_errors
+from app.services.llm_scheduler import SchedulerSaturated
+from app.services.openai_client import generate_cover_letter
+
+log = logging.getLogger(__name__)
+
+# Request fields copied into the job payload and, on success, onto the CoverLetter
+JOB_FIELDS = ("input_full_name", "job_title", "company_name", "tone", "job_description", "extra_notes")
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def backoff_delay(attempts: int) -> float:
+    delay = min(settings.JOB_BACKOFF_MAX_S, settings.JOB_BACKOFF_BASE_S * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)  # jitter so retries don't stampede
+
+async def enqueue_job(db: AsyncSession, user_id: int, resume_blob_id: int, fields: dict) -> GenerationJob:
+    payload = {k: fields.get(k) for k in JOB_FIELDS}
+    payload["force_regenerate"] = bool(fields.get("force_regenerate"))
+    job = GenerationJob(
+        user_id=user_id,
+        resume_blob_id=resume_blob_id,
+        payload=payload,
+        status="queued",
+        attempts=0,
+        run_after=utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+def lease_expiry() -> datetime:
+    return utcnow() - timedelta(seconds=settings.JOB_LEASE_S)
+
+def claim_next_job() -> dict | None:
+    now = utcnow()
+    claimable = or_(
+        and_(GenerationJob.status == "queued", GenerationJob.run_after <= now),
+        and_(GenerationJob.status == "running",
+             GenerationJob.locked_at < lease_expiry()),
+    )
+    with SessionLocal() as db:
+        q = select(GenerationJob.id).where(claimable).order_by(GenerationJob.run_after, GenerationJob.id).limit(1)
+        if db.bind.dialect.name == "postgresql":
+            q = q.with_for_update(skip_locked=True)
+        job_id = db.execute(q).scalar_one_or_none()
+        if job_id is None:
+            return None
+
+        claimed = (
+            db.query(GenerationJob)
+            .filter(GenerationJob.id == job_id, claimable)
+            .update({
+                "status": "running",
+                "locked_at": now,
+                "attempts": GenerationJob.attempts + 1,
+            }, synchronize_session=False)
+        )
+        db.commit()
+        if not claimed:
+            return None  # another worker got there first
+
+        job = db.get(GenerationJob, job_id)
+        resume_text = db.query(ResumeBlob.text).filter(ResumeBlob.id == job.resume_blob_id).scalar()
+        return {
+            "id": job.id,
+            "locked_at": now,  # our claim; see still_ours()
+            "user_id": job.user_id,
+            "resume_blob_id": job.resume_blob_id,
+            "attempts": job.attempts,
+            "fields": {k: job.payload.get(k) for k in JOB_FIELDS},
+            "force_regenerate": bool(job.payload.get("force_regenerate")),
+            "resume_text": resume_text,
+        }
+
+def still_ours(job: dict):
+    return and_(
+        GenerationJob.id == job["id"],
+        GenerationJob.status == "running",
+        GenerationJob.locked_at == job["locked_at"],
+        GenerationJob.locked_at > lease_expiry(),
+    )
+
+def finish_job(job: dict, ai_draft: str) -> bool:
+    """Store the letter and close the job; False (nothing stored) if the lease was lost."""
+    with SessionLocal() as db:
+        cl = CoverLetter(
+            user_id=job["user_id"],
+            resume_blob_id=job["resume_blob_id"],
+            ai_draft=ai_draft,
+            edited_final=None,
+            **job["fields"],
+        )
+        db.add(cl)
+        db.flush()
+        updated = db.query(GenerationJob).filter(still_ours(job)).update(
+            {"status": "succeeded", "cover_letter_id": cl.id, "error": None, "locked_at": None},
+            synchronize_session=False,
+        )
+        if not updated:
+            db.rollback()
+            return False
+        db.commit()
+        return True
+
+def fail_job(job: dict, error: str, retry_in: float | None = None) -> bool:
+    """Record a failure (re-queued if retry_in is set); False if the lease was lost."""
+    values = {"error": error[:2000], "locked_at": None}
+    if retry_in is None:
+        values["status"] = "failed"
+    else:
+        values["status"] = "queued"
+        values["run_after"] = utcnow() + timedelta(seconds=retry_in)
+    with SessionLocal() as db:
+        updated = db.query(GenerationJob).filter(still_ours(job)).update(values, synchronize_session=False)
+        db.commit()
+        return bool(updated)
+
+async def process_job(job: dict):
+    outcome = await _run_job(job)
+    if outcome is None:
+        JOBS_FINISHED.labels("lease_lost").inc()
+        log.warning("job %s ran past its lease; result dropped", job["id"])
+    else:
+        JOBS_FINISHED.labels(outcome).inc()
+
+async def _run_job(job: dict) -> str | None:
+    """Outcome label, or None if the job's lease was lost before the outcome could be recorded."""
+    payload = dict(job["fields"], resume_text=job["resume_text"])
+    try:
+        ai_draft = await generate_cover_letter(payload, job["force_regenerate"], job["user_id"], lane="background")
+    except (SchedulerSaturated, *retryable_errors()) as exc:
+        if job["attempts"] >= settings.JOB_MAX_ATTEMPTS:
+            stored = await run_in_threadpool(fail_job, job, f"Gave up after {job['attempts']} attempts: {exc}")
+            return "failed" if stored else None
+        delay = backoff_delay(job["attempts"])
+        log.warning("job %s attempt %s failed (%s); retrying in %.1fs", job["id"], job["attempts"], exc, delay)
+        stored = await run_in_threadpool(fail_job, job, str(exc), delay)
+        return "retried" if stored else None
+    except Exception as exc:
+        log.exception("job %s failed", job["id"])
+        stored = await run_in_threadpool(fail_job, job, str(exc) or exc.__class__.__name__)
+        return "failed" if stored else None
+    stored = await run_in_threadpool(finish_job, job, ai_draft)
+    return "succeeded" if stored else None
+
+async def worker_loop(stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            job = await run_in_threadpool(claim_next_job)
+        except Exception:
+            log.exception("failed to claim a generation job")
+            job = None
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=settings.JOB_POLL_INTERVAL_S)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await process_job(job)
+
+class JobWorkers:
+    """A fixed number of worker tasks in the current event loop."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._stop = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self):
+        self._tasks = [asyncio.create_task(worker_loop(self._stop)) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        self._stop.set()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,61 @@
+"""Keyset-paginated cover letter summaries (newest first)."""
+import base64
+from datetime import datetime
+
+from sqlalchemy import String, func, literal, tuple_
+from sqlalchemy.orm import Session
+
+from app.models.coverletter import CoverLetter
+
+SNIPPET_CHARS = 160
+
+def encode_cursor(created_at: datetime, cover_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{cover_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Raises ValueError on anything that is not a cursor we produced."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, cover_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+    return datetime.fromisoformat(created_at), int(cover_id)
+
+def cursor_timestamp(db: Session, created_at: datetime):
+    """created_at as a bound value that compares equal to the stored one.
+
+    SQLite keeps CURRENT_TIMESTAMP as 'YYYY-MM-DD HH:MM:SS' text and compares
+    it as text, so a datetime bound as '... HH:MM:SS.000000' would sort after
+    every row from the same second and return them again.
+    """
+    if db.bind.dialect.name == "sqlite":
+        return literal(created_at.strftime("%Y-%m-%d %H:%M:%S"), String)
+    return created_at
+
+def summary_columns():
+    body = func.coalesce(CoverLetter.edited_final, CoverLetter.ai_draft)
+    return (
+        CoverLetter.id,
+        CoverLetter.company_name,
+        CoverLetter.job_title,
+        CoverLetter.tone,
+        CoverLetter.status,
+        CoverLetter.created_at,
+        func.substr(body, 1, SNIPPET_CHARS).label("snippet"),
+    )
+
+def list_summaries(db: Session, user_id: int, limit: int, cursor: str | None = None):
+    """Return (rows, next_cursor); only summary columns are loaded."""
+    q = (
+        db.query(*summary_columns())
+        .filter(CoverLetter.user_id == user_id)
+        .order_by(CoverLetter.created_at.desc(), CoverLetter.id.desc())
+    )
+    if cursor:
+        created_at, cover_id = decode_cursor(cursor)
+        q = q.filter(tuple_(CoverLetter.created_at, CoverLetter.id) < tuple_(cursor_timestamp(db, created_at), cover_id))
+
+    rows = q.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
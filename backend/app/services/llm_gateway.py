@@ -0,0 +1,348 @@
+"""Chat completions routed over one or more OpenAI-compatible backends.
+
+- Backends come from LLM_BACKENDS (JSON list of name/base_url/api_key/model);
+  when it is empty the single OPENAI_* backend is used.
+- Each backend has a LatencyTracker: latencies and errors over the last
+  LLM_WINDOW_S seconds. Calls go to the backend with the best score
+  (median latency, penalised by error rate); backends with too few samples
+  are tried first so they get measured, unless they have been failing.
+- Every attempt has its own timeout (LLM_CALL_TIMEOUT_S). Failed attempts
+  are retried on the next backend, up to LLM_MAX_ATTEMPTS per call.
+- Non-streaming calls are hedged: if the first attempt has not answered by
+  the primary backend's p95, a second attempt starts on the next backend
+  and whichever finishes first wins. The loser is still billed upstream,
+  so its tokens are returned to the caller to charge: its reported usage
+  if it finished too, otherwise the caller's per-attempt estimate.
+- Retries and hedges draw on a shared RetryBudget (a fraction of recent
+  calls), so an outage cannot multiply upstream load.
+
+Streams are routed and retried until their first chunk arrives, but not
+hedged: two live streams would bill twice for every token.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import cache
+from typing import TYPE_CHECKING, AsyncIterator
+
+from app.core.config import settings
+from app.core.metrics import LLM_ATTEMPTS, LLM_TOKENS, record_usage, timed
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+log = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4.1-mini"  # strong + cost-effective (you can change later)
+
+@cache
+def retryable_errors() -> tuple[type[BaseException], ...]:
+    """Worth another attempt (here or on another backend): 429s, 5xx, transport errors, our own timeout.
+
+    A function so the OpenAI SDK is only imported once a call is made.
+    """
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.APIConnectionError,  # includes APITimeoutError
+        asyncio.TimeoutError,
+    )
+
+MIN_SAMPLES = 20  # below this a backend's percentiles are not trusted
+
+
+@dataclass
+class Backend:
+    name: str
+    model: str
+    client: "AsyncOpenAI"
+    tracker: "LatencyTracker"
+
+
+class LatencyTracker:
+    """Latency and error samples over a moving time window.
+
+    failure_cost_s is what a failed attempt is taken to cost the caller
+    (about one call timeout before the retry starts).
+    """
+
+    def __init__(self, window_s: float, failure_cost_s: float):
+        self.window_s = window_s
+        self.failure_cost_s = failure_cost_s
+        self._samples: deque[tuple[float, float, bool]] = deque()  # (at, seconds, ok)
+
+    def _prune(self, now: float):
+        while self._samples and self._samples[0][0] < now - self.window_s:
+            self._samples.popleft()
+
+    def observe(self, seconds: float, ok: bool):
+        now = time.monotonic()
+        self._samples.append((now, seconds, ok))
+        self._prune(now)
+
+    def count(self) -> int:
+        self._prune(time.monotonic())
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> float | None:
+        self._prune(time.monotonic())
+        latencies = sorted(s for _, s, ok in self._samples if ok)
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(pct / 100 * len(latencies)))]
+
+    def error_rate(self) -> float:
+        self._prune(time.monotonic())
+        if not self._samples:
+            return 0.0
+        return sum(not ok for _, _, ok in self._samples) / len(self._samples)
+
+    def score(self) -> float:
+        """Lower is better.
+
+        Until MIN_SAMPLES successes the median latency counts as 0, so a new
+        backend gets traffic, but errors are charged either way: a backend
+        that only fails ranks behind any healthy one until its errors age out.
+        """
+        p50 = self.percentile(50) or 0.0
+        errors = self.error_rate()
+        return p50 * (1 + 10 * errors) + errors * self.failure_cost_s
+
+    def snapshot(self) -> dict:
+        return {
+            "samples": self.count(),
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "error_rate": round(self.error_rate(), 4),
+        }
+
+
+class RetryBudget:
+    """Allow extra attempts (retries + hedges) up to `ratio` of recent calls."""
+
+    def __init__(self, ratio: float, window_s: float, min_per_window: int = 10):
+        self.ratio = ratio
+        self.window_s = window_s
+        self.min_per_window = min_per_window
+        self._calls: deque[float] = deque()
+        self._extra: deque[float] = deque()
+
+    def _prune(self, now: float):
+        for q in (self._calls, self._extra):
+            while q and q[0] < now - self.window_s:
+                q.popleft()
+
+    def record_call(self):
+        self._calls.append(time.monotonic())
+
+    def try_spend(self) -> bool:
+        now = time.monotonic()
+        self._prune(now)
+        if len(self._extra) >= self.min_per_window + self.ratio * len(self._calls):
+            return False
+        self._extra.append(now)
+        return True
+
+
+class LLMGateway:
+    def __init__(self, backends: list[Backend], timeout_s: float, max_attempts: int,
+                 hedge: bool, hedge_min_delay_s: float, hedge_default_delay_s: float, budget: RetryBudget):
+        self.backends = backends
+        self.timeout_s = timeout_s
+        self.max_attempts = max_attempts
+        self.hedge = hedge
+        self.hedge_min_delay_s = hedge_min_delay_s
+        self.hedge_default_delay_s = hedge_default_delay_s
+        self.budget = budget
+
+    @property
+    def cache_model(self) -> str:
+        # part of the generation cache key: a different backend set is a different config
+        return "|".join(b.model for b in self.backends)
+
+    def ranked(self) -> list[Backend]:
+        return sorted(self.backends, key=lambda b: b.tracker.score())
+
+    def hedge_delay(self, backend: Backend) -> float:
+        p95 = backend.tracker.percentile(95)
+        return max(self.hedge_min_delay_s, p95 if p95 is not None else self.hedge_default_delay_s)
+
+    async def _attempt(self, backend: Backend, messages: list[dict], temperature: float):
+        started = time.perf_counter()
+        try:
+            resp = await asyncio.wait_for(
+                backend.client.chat.completions.create(
+                    model=backend.model, messages=messages, temperature=temperature,
+                ),
+                self.timeout_s,
+            )
+        except asyncio.CancelledError:
+            LLM_ATTEMPTS.labels(backend.name, "cancelled").inc()  # lost a hedge race; not the backend's fault
+            raise
+        except Exception:
+            backend.tracker.observe(time.perf_counter() - started, ok=False)
+            LLM_ATTEMPTS.labels(backend.name, "error").inc()
+            raise
+        backend.tracker.observe(time.perf_counter() - started, ok=True)
+        LLM_ATTEMPTS.labels(backend.name, "ok").inc()
+        return resp
+
+    async def complete(self, messages: list[dict], temperature: float, attempt_estimate: int = 0):
+        """Return (first successful ChatCompletion, tokens billed by the hedges that lost), hedging slow attempts."""
+        self.budget.record_call()
+        order = self.ranked()
+        attempts = 0
+        pending: set[asyncio.Task] = set()
+        last_error: BaseException | None = None
+
+        def launch():
+            nonlocal attempts
+            backend = order[attempts % len(order)]
+            attempts += 1
+            pending.add(asyncio.create_task(self._attempt(backend, messages, temperature)))
+            return backend
+
+        try:
+            primary = launch()
+            hedge_at = time.monotonic() + self.hedge_delay(primary) if self.hedge else None
+            while pending:
+                timeout = None if hedge_at is None else max(0.0, hedge_at - time.monotonic())
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # still nothing by the primary's p95: race a second attempt
+                    hedge_at = None
+                    if attempts < self.max_attempts and self.budget.try_spend():
+                        backend = launch()
+                        LLM_ATTEMPTS.labels(backend.name, "hedge").inc()
+                    continue
+                winner = None
+                lost_tokens = 0
+                for task in done:
+                    pending.discard(task)
+                    if task.exception() is None:
+                        if winner is None:
+                            winner = task.result()
+                        else:  # both finished in the same tick
+                            lost_tokens += self._billed(task.result(), attempt_estimate)
+                        continue
+                    last_error = task.exception()
+                    if winner is None and not isinstance(last_error, retryable_errors()):
+                        raise last_error
+                if winner is not None:
+                    if pending:  # cancelled below; the backend bills what it had read and written by then
+                        lost_tokens += len(pending) * attempt_estimate
+                        LLM_TOKENS.labels("estimated").inc(len(pending) * attempt_estimate)
+                    return winner, lost_tokens
+                if not pending and attempts < self.max_attempts and self.budget.try_spend():
+                    backend = launch()
+                    log.warning("LLM attempt failed (%s); retrying on %s", last_error, backend.name)
+                    hedge_at = time.monotonic() + self.hedge_delay(backend) if self.hedge else None
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    @staticmethod
+    def _billed(resp, estimate: int) -> int:
+        record_usage(resp.usage)
+        return resp.usage.total_tokens if resp.usage else estimate
+
+    async def stream(self, messages: list[dict], temperature: float) -> AsyncIterator:
+        """Yield ChatCompletionChunks; fails over only until the first chunk arrives."""
+        self.budget.record_call()
+        order = self.ranked()
+        last_error: BaseException | None = None
+        for attempt in range(self.max_attempts):
+            if attempt and not self.budget.try_spend():
+                break
+            backend = order[attempt % len(order)]
+            started = time.perf_counter()
+            stream = None
+            try:
+                with timed("openai_stream_open"):
+                    stream = await asyncio.wait_for(
+                        backend.client.chat.completions.create(
+                            model=backend.model, messages=messages, temperature=temperature,
+                            stream=True,
+                            stream_options={"include_usage": True},  # usage arrives in a final chunk with no choices
+                        ),
+                        self.timeout_s,
+                    )
+                    iterator = stream.__aiter__()
+                    first = await asyncio.wait_for(iterator.__anext__(), self.timeout_s)
+            except retryable_errors() as exc:
+                if stream is not None:
+                    await stream.close()
+                backend.tracker.observe(time.perf_counter() - started, ok=False)
+                LLM_ATTEMPTS.labels(backend.name, "error").inc()
+                last_error = exc
+                log.warning("LLM stream on %s failed before the first chunk (%s)", backend.name, exc)
+                continue
+            # time to first chunk is what a streaming caller waits on
+            backend.tracker.observe(time.perf_counter() - started, ok=True)
+            LLM_ATTEMPTS.labels(backend.name, "ok").inc()
+            try:
+                yield first
+                async for chunk in iterator:
+                    yield chunk
+            finally:
+                await stream.close()
+            return
+        raise last_error or RuntimeError("No LLM backend attempt was allowed")
+
+
+def build_backends() -> list[Backend]:
+    import httpx
+    from openai import AsyncOpenAI
+
+    # one pooled HTTP client per worker so concurrent generations reuse connections
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS,
+        ),
+        timeout=settings.OPENAI_TIMEOUT_S,
+    )
+    configs = settings.LLM_BACKENDS or [{
+        "name": "openai",
+        "base_url": settings.OPENAI_BASE_URL,
+        "api_key": settings.OPENAI_API_KEY,
+        "model": DEFAULT_MODEL,
+    }]
+    return [
+        Backend(
+            name=cfg.get("name") or f"backend{i}",
+            model=cfg.get("model") or DEFAULT_MODEL,
+            client=AsyncOpenAI(
+                api_key=cfg.get("api_key") or settings.OPENAI_API_KEY,
+                base_url=cfg.get("base_url"),
+                http_client=http_client,
+                max_retries=0,  # retries are the gateway's job
+            ),
+            tracker=LatencyTracker(settings.LLM_WINDOW_S, settings.LLM_CALL_TIMEOUT_S),
+        )
+        for i, cfg in enumerate(configs)
+    ]
+
+
+_gateway: LLMGateway | None = None
+
+
+def get_gateway() -> LLMGateway:
+    # built on first use (or by the startup warm-up) rather than at import
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway(
+            backends=build_backends(),
+            timeout_s=settings.LLM_CALL_TIMEOUT_S,
+            max_attempts=settings.LLM_MAX_ATTEMPTS,
+            hedge=settings.LLM_HEDGE,
+            hedge_min_delay_s=settings.LLM_HEDGE_MIN_DELAY_S,
+            hedge_default_delay_s=settings.LLM_HEDGE_DEFAULT_DELAY_S,
+            budget=RetryBudget(settings.LLM_RETRY_BUDGET_RATIO, settings.LLM_WINDOW_S),
+        )
+    return _gateway
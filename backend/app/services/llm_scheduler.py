@@ -0,0 +1,248 @@
+"""Fair scheduling of LLM calls across users, with priority lanes.
+
+Every generation in this process goes through one LLMScheduler, which
+keeps them inside a budget matching the OpenAI quota:
+
+- at most LLM_MAX_CONCURRENCY calls in flight (streams included)
+- at most LLM_TOKENS_PER_MINUTE tokens, as a continuously refilled bucket
+
+Both limits are per process, so divide the account quota by the number
+of workers.
+
+Waiting calls queue by lane, and lanes are served in strict priority:
+interactive, then batch, then background jobs. Within a lane, calls are
+ordered by weighted fair queuing. Each user's virtual finish time
+advances by the tokens of their calls, so a user with fifty letters
+queued gets the same share of the lane as a user with one, not fifty
+times more.
+
+A call is charged its estimated tokens when it starts. The estimate is
+corrected with the reported usage when it ends (including any hedged
+attempt that lost the race, see app.services.llm_gateway); a call that
+fails before reporting any is refunded in full.
+
+Admission control: a call is refused with SchedulerSaturated (503 +
+Retry-After) when its lane already has LLM_QUEUE_MAX waiting calls, or
+when its estimated wait is longer than LLM_QUEUE_MAX_WAIT_S.
+"""
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.metrics import LLM_QUEUE_REJECTED, LLM_QUEUE_WAIT
+
+LANES = ("interactive", "batch", "background")  # highest priority first
+
+
+class SchedulerSaturated(Exception):
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"LLM queue for {lane} requests is full")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self.level = float(tokens_per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_to(self, tokens: float) -> float:
+        self._refill()
+        return max(0.0, (tokens - self.level) / self.rate)
+
+    def wait_for(self, tokens: int) -> float:
+        """Seconds until a call of `tokens` may start (one bigger than the bucket waits for a full one)."""
+        return self.time_to(min(tokens, self.capacity))
+
+    def spend(self, tokens: int):
+        self._refill()
+        self.level -= tokens  # may go negative when actual usage beats the estimate
+
+    def refund(self, tokens: int):
+        self._refill()
+        self.level = min(self.capacity, self.level + tokens)
+
+
+@dataclass(order=True)
+class _Waiter:
+    finish: float
+    seq: int
+    start: float = field(compare=False)
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class _Lane:
+    def __init__(self, name: str):
+        self.name = name
+        self.heap: list[_Waiter] = []
+        self.vtime = 0.0  # start tag of the last call that left the queue
+        self.last_finish: dict[int, float] = {}  # user -> finish tag of their last queued call
+        self.waiting = 0
+        self.waiting_tokens = 0
+
+    def push(self, user_id: int, tokens: int, seq: int, future: asyncio.Future) -> _Waiter:
+        start = max(self.vtime, self.last_finish.get(user_id, 0.0))
+        waiter = _Waiter(start + tokens, seq, start, tokens, future, time.monotonic())
+        self.last_finish[user_id] = waiter.finish
+        heapq.heappush(self.heap, waiter)
+        self.waiting += 1
+        self.waiting_tokens += tokens
+        return waiter
+
+    def head(self) -> _Waiter | None:
+        while self.heap and self.heap[0].future.done():
+            heapq.heappop(self.heap)  # cancelled while waiting; already uncounted
+        return self.heap[0] if self.heap else None
+
+    def pop(self) -> _Waiter:
+        waiter = heapq.heappop(self.heap)
+        self.vtime = max(self.vtime, waiter.start)
+        self.uncount(waiter)
+        if not self.waiting:
+            self.last_finish.clear()  # nobody is behind; old tags would only penalise returning users
+        return waiter
+
+    def uncount(self, waiter: _Waiter):
+        self.waiting -= 1
+        self.waiting_tokens -= waiter.tokens
+
+
+class Grant:
+    """Handed to the caller while its call runs; report real usage with charge()."""
+
+    def __init__(self, tokens: int):
+        self.estimate = tokens
+        self.used: int | None = None
+
+    def charge(self, tokens: int):
+        self.used = tokens
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int, tokens_per_minute: int, max_queue: int, max_wait_s: float):
+        self.max_concurrency = max_concurrency
+        self.bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.max_queue = max_queue
+        self.max_wait_s = max_wait_s
+        self.lanes = {name: _Lane(name) for name in LANES}
+        self.running = 0
+        self.avg_call_s = 5.0  # moving average, used to estimate waits
+        self._seq = itertools.count()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def estimated_wait(self, lane: str, tokens: int = 0) -> float:
+        ahead = [self.lanes[name] for name in LANES[:LANES.index(lane) + 1]]
+        calls = sum(l.waiting for l in ahead) + 1
+        wait = 0.0
+        if self.running + calls > self.max_concurrency:
+            wait = math.ceil((self.running + calls - self.max_concurrency) / self.max_concurrency) * self.avg_call_s
+        if self.bucket is not None:
+            queued_tokens = sum(l.waiting_tokens for l in ahead) + tokens
+            wait = max(wait, self.bucket.time_to(queued_tokens))
+        return wait
+
+    def check(self, lane: str, tokens: int = 0):
+        """Raise SchedulerSaturated if a call in this lane would be refused right now."""
+        wait = self.estimated_wait(lane, tokens)
+        if self.lanes[lane].waiting >= self.max_queue or wait > self.max_wait_s:
+            LLM_QUEUE_REJECTED.labels(lane).inc()
+            raise SchedulerSaturated(lane, max(1, math.ceil(min(wait, self.max_wait_s))))
+
+    @asynccontextmanager
+    async def acquire(self, user_id: int, lane: str, tokens: int):
+        self.check(lane, tokens)
+        queue = self.lanes[lane]
+        future = asyncio.get_running_loop().create_future()
+        waiter = queue.push(user_id, tokens, next(self._seq), future)
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                queue.uncount(waiter)  # left the queue before starting
+            else:
+                self._release(Grant(tokens), 0.0)  # started just as the caller gave up
+            self._dispatch()
+            raise
+        LLM_QUEUE_WAIT.labels(lane).observe(time.monotonic() - waiter.enqueued_at)
+
+        grant = Grant(tokens)
+        started = time.monotonic()
+        try:
+            yield grant
+        finally:
+            self._release(grant, time.monotonic() - started)
+            self._dispatch()
+
+    def _release(self, grant: Grant, elapsed_s: float):
+        self.running -= 1
+        if elapsed_s:
+            self.avg_call_s += 0.1 * (elapsed_s - self.avg_call_s)
+        if self.bucket is not None:
+            used = grant.used if grant.used is not None else 0  # raised before charge(); API errors are not billed
+            self.bucket.refund(grant.estimate - used)
+
+    def _next(self) -> tuple[_Lane, _Waiter] | None:
+        for lane in self.lanes.values():
+            waiter = lane.head()
+            if waiter is not None:
+                return lane, waiter
+        return None
+
+    def _dispatch(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self.running < self.max_concurrency:
+            nxt = self._next()
+            if nxt is None:
+                return
+            lane, waiter = nxt
+            if self.bucket is not None:
+                delay = self.bucket.wait_for(waiter.tokens)
+                if delay > 0:
+                    # strict priority: lower lanes do not jump ahead while the head waits for tokens
+                    self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                    return
+                self.bucket.spend(waiter.tokens)
+            lane.pop()
+            self.running += 1
+            waiter.future.set_result(None)
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": {name: lane.waiting for name, lane in self.lanes.items()},
+            "bucket_tokens": round(self.bucket.level) if self.bucket is not None else None,
+            "avg_call_s": round(self.avg_call_s, 2),
+        }
+
+
+_scheduler: LLMScheduler | None = None
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    # built on first use, like the gateway, so importing this module reads no settings
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_queue=settings.LLM_QUEUE_MAX,
+            max_wait_s=settings.LLM_QUEUE_MAX_WAIT_S,
+        )
+    return _scheduler
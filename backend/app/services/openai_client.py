@@ -1,7 +1,12 @@
-from openai import OpenAI
-from app.core.config import settings
-
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+import time
+from typing import AsyncIterator
+from starlette.concurrency import run_in_threadpool
+from app.core.metrics import record_usage, timed
+from app.services.llm_gateway import get_gateway
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.prompt_compact import compact_payload, count_tokens
+from app.services.generation_cache import generation_cache, generation_key
+from app.services.token_budget import get_token_budget
 
 SYSTEM_PROMPT = """You are an assistant that writes tailored cover letters.
 Rules:
@@ -39,13 +44,93 @@ Constraints:
 - Make 2–3 specific connections between resume and job description
 """
 
-def generate_cover_letter(payload: dict) -> str:
-    resp = client.chat.completions.create(
-        model="gpt-4.1-mini",  # strong + cost-effective (you can change later)
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": build_user_prompt(**payload)},
-        ],
-        temperature=0.6,
-    )
-    return resp.choices[0].message.content.strip()
+TEMPERATURE = 0.6
+EXPECTED_COMPLETION_TOKENS = 600  # a 3-4 paragraph letter; the scheduler's estimate before usage is known
+
+def build_messages(payload: dict) -> list[dict]:
+    # compaction tokenizes and ranks the whole resume; callers run this in the threadpool
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": build_user_prompt(**compact_payload(payload))},
+    ]
+
+def estimate_tokens(messages: list[dict], output: str) -> int:
+    # used when the API reports no usage (e.g. a stream cut short)
+    return sum(count_tokens(m["content"]) for m in messages) + count_tokens(output)
+
+def expected_tokens(messages: list[dict]) -> int:
+    return estimate_tokens(messages, "") + EXPECTED_COMPLETION_TOKENS
+
+async def generate_cover_letter(payload: dict, force_regenerate: bool = False, user_id: int | None = None,
+                                lane: str = "interactive") -> str:
+    """Cache hits skip the scheduler; misses wait for a slot in `lane` (see app.services.llm_scheduler)."""
+    gateway = get_gateway()
+    messages = await run_in_threadpool(build_messages, payload)
+    key = generation_key(messages, gateway.cache_model, TEMPERATURE)
+    if not force_regenerate:
+        cached = await generation_cache.get(key)
+        if cached is not None:
+            return cached
+
+    started = time.perf_counter()
+    estimate = expected_tokens(messages)
+    budget = get_token_budget()
+    reservation = await budget.reserve(user_id, estimate) if user_id is not None else None
+    tokens = lost_tokens = 0
+    try:
+        async with get_llm_scheduler().acquire(user_id or 0, lane, estimate) as grant:
+            with timed("openai_completion"):
+                resp, lost_tokens = await gateway.complete(messages, TEMPERATURE, estimate)
+            text = resp.choices[0].message.content.strip()
+            tokens = resp.usage.total_tokens if resp.usage else estimate_tokens(messages, text)
+            grant.charge(tokens + lost_tokens)  # a hedge that lost the race was billed too
+    finally:
+        await budget.settle(reservation, tokens + lost_tokens)  # refunds the whole reservation if the call failed
+    record_usage(resp.usage)
+    await generation_cache.set(key, text, tokens, time.perf_counter() - started)
+    return text
+
+async def stream_cover_letter(payload: dict, force_regenerate: bool = False,
+                              user_id: int | None = None, lane: str = "interactive") -> AsyncIterator[str]:
+    """Yield text deltas as the model produces them.
+
+    Closing the generator early closes the upstream HTTP response, so OpenAI
+    stops generating (and billing) tokens nobody will read. A cache hit is
+    yielded as a single delta. The scheduler slot and the token budget
+    reservation are held until the stream ends.
+    """
+    gateway = get_gateway()
+    messages = await run_in_threadpool(build_messages, payload)
+    key = generation_key(messages, gateway.cache_model, TEMPERATURE)
+    if not force_regenerate:
+        cached = await generation_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    started = time.perf_counter()
+    parts: list[str] = []
+    tokens = billed = 0
+    estimate = expected_tokens(messages)
+    budget = get_token_budget()
+    reservation = await budget.reserve(user_id, estimate) if user_id is not None else None
+    try:
+        async with get_llm_scheduler().acquire(user_id or 0, lane, estimate) as grant:
+            stream = gateway.stream(messages, TEMPERATURE)
+            try:
+                async for chunk in stream:
+                    if chunk.usage:
+                        record_usage(chunk.usage)
+                        tokens = chunk.usage.total_tokens
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        parts.append(chunk.choices[0].delta.content)
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.aclose()
+                # a cancelled stream is still billed for what was generated
+                billed = tokens or (estimate_tokens(messages, "".join(parts)) if parts else 0)
+                grant.charge(billed)
+    finally:
+        await budget.settle(reservation, billed)
+    # only reached when the stream ran to completion
+    await generation_cache.set(key, "".join(parts).strip(), tokens, time.perf_counter() - started)
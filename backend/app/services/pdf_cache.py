@@ -0,0 +1,70 @@
+"""Rendered PDFs cached by content hash, so repeat downloads skip WeasyPrint."""
+import hashlib
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import CacheBackend, make_cache
+from app.core.config import settings
+from app.services.pdf_export import TEMPLATE_VERSION, render_pdf_bytes
+from app.services.pdf_renderer import RenderPool
+
+log = logging.getLogger(__name__)
+
+_pdf_cache: CacheBackend | None = None
+_render_pool: RenderPool | None = None
+
+def get_pdf_cache() -> CacheBackend:
+    global _pdf_cache
+    if _pdf_cache is None:
+        _pdf_cache = make_cache(settings.PDF_CACHE_BACKEND, "pdf", settings.PDF_CACHE_MAX_ENTRIES)
+    return _pdf_cache
+
+def get_render_pool() -> RenderPool | None:
+    # PDF_POOL_WORKERS=0 keeps the old in-process rendering (threadpool)
+    global _render_pool
+    if _render_pool is None and settings.PDF_POOL_WORKERS > 0:
+        _render_pool = RenderPool(
+            workers=settings.PDF_POOL_WORKERS,
+            max_queue=settings.PDF_POOL_MAX_QUEUE,
+            timeout_s=settings.PDF_RENDER_TIMEOUT_S,
+            max_rss_mb=settings.PDF_WORKER_MAX_RSS_MB,
+            max_tasks_per_child=settings.PDF_WORKER_MAX_TASKS,
+        )
+    return _render_pool
+
+def shutdown_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
+
+async def render_pdf(title: str, body_text: str) -> bytes:
+    render_pool = get_render_pool()
+    if render_pool is not None:
+        return await render_pool.render(title, body_text)
+    return await run_in_threadpool(render_pdf_bytes, title, body_text)
+
+def pdf_cache_key(title: str, body_text: str) -> str:
+    h = hashlib.sha256()
+    for part in (TEMPLATE_VERSION, title, body_text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+async def get_or_render_pdf(title: str, body_text: str) -> bytes:
+    key = pdf_cache_key(title, body_text)
+    pdf_bytes = await get_pdf_cache().get(key)
+    if pdf_bytes is None:
+        pdf_bytes = await render_pdf(title, body_text)
+        await get_pdf_cache().set(key, pdf_bytes, settings.PDF_CACHE_TTL_S)
+    return pdf_bytes
+
+async def prerender_pdf(title: str, body_text: str):
+    try:
+        await get_or_render_pdf(title, body_text)
+    except Exception:
+        log.warning("PDF pre-render failed", exc_info=True)
+
+async def invalidate_pdf(title: str, body_text: str):
+    await get_pdf_cache().delete(pdf_cache_key(title, body_text))
@@ -1,6 +1,10 @@
-from weasyprint import HTML
 from datetime import datetime
 
+TEMPLATE_VERSION = "1"  # bump whenever the HTML/CSS below changes; it is part of the PDF cache key
+
+def cover_letter_title(full_name: str) -> str:
+    return f"{full_name} — Cover Letter"
+
 def text_to_simple_html(title: str, body_text: str) -> str:
     safe = (body_text
             .replace("&", "&amp;")
@@ -25,5 +29,7 @@ def text_to_simple_html(title: str, body_text: str) -> str:
     """
 
 def render_pdf_bytes(title: str, body_text: str) -> bytes:
+    from weasyprint import HTML  # heavy (Pango, fonts); render workers import it once at start-up
+
     html = text_to_simple_html(title, body_text)
     return HTML(string=html).write_pdf()
@@ -0,0 +1,149 @@
+"""Pool of pre-warmed worker processes for WeasyPrint rendering.
+
+Rendering is CPU-bound and holds the GIL, so threads cannot spread it over
+cores. Each worker imports WeasyPrint and renders a throwaway document at
+start-up, so font and CSS setup is paid before the first real request.
+Workers whose resident memory after a render crosses the limit (or that
+hit a timeout) are retired by swapping in a fresh executor.
+
+Renders wait for a free worker before they are handed to the executor, so
+the timeout measures the render itself, never time spent queued behind
+other downloads, and a recycle never drops queued work. A timed-out render
+can only be stopped by terminating the pool's processes, which breaks the
+other renders running at that moment. Those, and any that find the pool
+broken for another reason, are retried once on the fresh executor before
+giving up with RenderUnavailable.
+"""
+import asyncio
+import logging
+import multiprocessing
+import resource
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+log = logging.getLogger(__name__)
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+class RenderUnavailable(Exception):
+    """The worker pool broke again on the retry."""
+
+
+def _warm_worker():
+    from app.services.pdf_export import render_pdf_bytes
+
+    render_pdf_bytes("Warm-up", "Warm-up render.\n" * 10)
+
+
+def _rss_kb() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() // 1024
+    except OSError:
+        # no procfs (macOS): the lifetime peak is the best available, so a worker
+        # that once peaked above the limit is retired after its next render
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024  # bytes on macOS
+
+
+def _render_job(title: str, body_text: str) -> tuple[bytes, int]:
+    from app.services.pdf_export import render_pdf_bytes
+
+    pdf = render_pdf_bytes(title, body_text)
+    return pdf, _rss_kb()
+
+
+def _noop() -> None:
+    return None
+
+
+class RenderPool:
+    def __init__(self, workers: int, max_queue: int, timeout_s: float,
+                 max_rss_mb: int, max_tasks_per_child: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout_s = timeout_s
+        self.max_rss_kb = max_rss_mb * 1024
+        self.max_tasks_per_child = max_tasks_per_child
+        self.pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: asyncio.Semaphore | None = None  # created on the event loop that renders
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),  # never fork the event loop process
+            initializer=_warm_worker,
+            max_tasks_per_child=self.max_tasks_per_child,
+        )
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = self._new_executor()
+        return self._executor
+
+    async def warm(self):
+        """Start every worker now instead of on the first downloads."""
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        await asyncio.gather(*(loop.run_in_executor(executor, _noop) for _ in range(self.workers)))
+
+    def _recycle(self, executor: ProcessPoolExecutor, kill: bool = False):
+        if executor is not self._executor:
+            return  # already replaced by a concurrent job
+        self._executor = self._new_executor()
+        if kill:
+            # a stuck render never returns; terminating is the only way to reclaim it
+            for proc in list(getattr(executor, "_processes", {}).values()):
+                proc.terminate()
+        executor.shutdown(wait=False, cancel_futures=False)
+
+    async def render(self, title: str, body_text: str) -> bytes:
+        if self.pending >= self.max_queue:
+            raise RenderQueueFull()
+        self.pending += 1
+        try:
+            try:
+                return await self._render_once(title, body_text)
+            except BrokenProcessPool:
+                log.warning("PDF render pool broke mid-render; retrying on a fresh pool")
+            try:
+                return await self._render_once(title, body_text)
+            except BrokenProcessPool:
+                raise RenderUnavailable()
+        finally:
+            self.pending -= 1
+
+    async def _render_once(self, title: str, body_text: str) -> bytes:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+        async with self._slots:  # queue here, not in the executor, so the timeout covers only the render
+            executor = self.executor
+            try:
+                fut = asyncio.get_running_loop().run_in_executor(executor, _render_job, title, body_text)
+                pdf, rss_kb = await asyncio.wait_for(fut, self.timeout_s)
+            except asyncio.TimeoutError:
+                log.warning("PDF render exceeded %.1fs; recycling render pool", self.timeout_s)
+                self._recycle(executor, kill=True)
+                raise RenderTimeout()
+            except BrokenProcessPool:
+                self._recycle(executor)
+                raise
+
+        if rss_kb > self.max_rss_kb:
+            log.info("PDF worker holds %d MiB after a render; recycling render pool", rss_kb // 1024)
+            self._recycle(executor)
+        return pdf
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
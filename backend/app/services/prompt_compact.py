@@ -0,0 +1,272 @@
+"""Shrink the job description and resume to a token budget before prompting.
+
+- Job description boilerplate that never helps a cover letter (EEO
+  statements, benefits and perks lists, application instructions) is
+  dropped. Repeated sentences are de-duplicated in both texts; the resume
+  is not filtered, since "PTO policy" or "benefits" there are the
+  candidate's own work.
+- Job descriptions are split on their headings and kept in priority order
+  (responsibilities/requirements first, company blurb last).
+- Resume chunks are ranked by TF-IDF cosine similarity to the job
+  description and the best ones are kept, in their original order.
+
+Everything runs locally; token counts come from tiktoken when it is
+installed and a chars/4 estimate otherwise. The first tiktoken call may
+download the encoding, so the startup warm-up loads it with get_encoder(),
+and prompts are built off the event loop.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+
+from app.core.config import settings
+
+BOILERPLATE_PATTERNS = [
+    r"equal (employment )?opportunity",
+    r"without regard to (race|color|religion|sex|age|national origin)",
+    r"reasonable accommodations?",
+    r"e-verify",
+    r"affirmative action",
+    r"protected veteran",
+    r"401\(?k\)?",
+    r"(medical|health),? dental,? (and )?vision",
+    r"paid time off|\bpto\b|paid parental leave",
+    r"(our )?(benefits|perks) (include|package)",
+    r"commuter benefits|wellness stipend|free (snacks|lunch)",
+    r"to apply,? (please )?(send|submit|click)",
+    r"we (do not|don't) accept (unsolicited )?(resumes|agency)",
+]
+_BOILERPLATE = re.compile("|".join(BOILERPLATE_PATTERNS), re.IGNORECASE)
+
+# Job description headings, in the order their sections are kept
+JD_SECTION_PRIORITY = [
+    ("requirements", r"requirements|qualifications|what you('ll)? (need|bring)|must haves?|skills|who you are"),
+    ("responsibilities", r"responsibilities|what you('ll)? do|the role|about the role|your impact|duties"),
+    ("preferred", r"preferred( qualifications| skills| experience)?|nice to haves?|bonus( points)?|(a |big )?plus"),
+    ("other", r""),
+    ("company", r"about (us|the company|the team)|who we are|our mission|company overview"),
+    ("benefits", r"benefits|perks|compensation|what we offer|salary|pay range"),
+]
+# qualifiers allowed in front of a bare section name ("Key Responsibilities", "Required Skills")
+_SECTION_QUALIFIER = r"(?:(?:key|core|main|basic|minimum|required|essential|technical|your|job|role)\s+)?"
+
+RESUME_HEADINGS = re.compile(
+    r"\b(SUMMARY|PROFILE|OBJECTIVE|EXPERIENCE|WORK EXPERIENCE|PROFESSIONAL EXPERIENCE|EMPLOYMENT|"
+    r"EDUCATION|SKILLS|TECHNICAL SKILLS|PROJECTS|CERTIFICATIONS|PUBLICATIONS|AWARDS|VOLUNTEER|INTERESTS)\b"
+)
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+|\s[•·▪‣◦●]\s?|^\s*[-*]\s+", re.MULTILINE)
+_WORD = re.compile(r"[a-z][a-z0-9+#.\-]{1,}")
+_STOPWORDS = frozenset(
+    "the and for with you your our are will from that this have has into who what all any can "
+    "use using used work working team teams about able also more such their they them other "
+    "well including include includes across within while must should would could etc".split()
+)
+
+RESUME_CHUNK_CHARS = 600  # fallback chunk size when a resume has no recognizable headings
+
+
+@lru_cache(maxsize=1)
+def get_encoder():
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    enc = get_encoder()
+    if enc is None:
+        return math.ceil(len(text) / 4)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s.strip() for s in _SENTENCE_SPLIT.split(text) if s and s.strip()]
+
+
+def strip_boilerplate(text: str, seen: set[str] | None = None, joiner: str = "\n",
+                      boilerplate: re.Pattern | None = _BOILERPLATE) -> str:
+    """Drop boilerplate sentences and repeats (case/spacing-insensitive).
+
+    Pass the same `seen` set across calls to de-duplicate across sections,
+    and boilerplate=None to drop repeats only.
+    """
+    seen = set() if seen is None else seen
+    kept = []
+    for sentence in split_sentences(text):
+        key = " ".join(sentence.lower().split())
+        if key in seen or (boilerplate is not None and boilerplate.search(sentence)):
+            continue
+        seen.add(key)
+        kept.append(sentence)
+    return joiner.join(kept)
+
+
+def _section_kind(name: str, exact: bool) -> str | None:
+    for kind, pattern in JD_SECTION_PRIORITY:
+        if not pattern:
+            continue
+        if exact and re.fullmatch(_SECTION_QUALIFIER + f"(?:{pattern})", name):
+            return kind
+        if not exact and re.search(pattern, name):
+            return kind
+    return None
+
+
+def _heading_kind(line: str) -> str | None:
+    """Section kind if the line is a heading.
+
+    A line marked up as one (trailing colon, "#", all caps, **bold**) only
+    has to mention a section name; a plain line has to be nothing but the
+    name, so "Python plus Django" or "Strong people skills" stay body text.
+    """
+    raw = line.strip()
+    stripped = " ".join(raw.strip("#*: ").lower().split())
+    if not stripped or len(stripped) > 60 or raw.startswith(("-", "•")):
+        return None
+    marked = (
+        raw.endswith(":") or raw.startswith("#") or raw.isupper()
+        or (raw.startswith("**") and raw.rstrip(":").endswith("**"))
+    )
+    return _section_kind(stripped, exact=True) or (_section_kind(stripped, exact=False) if marked else None)
+
+
+def split_jd_sections(job_description: str) -> list[tuple[str, str]]:
+    """[(kind, text)] in document order; text before any heading is "other"."""
+    sections: list[tuple[str, list[str]]] = [("other", [])]
+    for line in job_description.splitlines():
+        kind = _heading_kind(line)
+        if kind:
+            sections.append((kind, [line.strip()]))
+        else:
+            sections[-1][1].append(line)
+    return [(kind, "\n".join(lines).strip()) for kind, lines in sections if "\n".join(lines).strip()]
+
+
+def split_resume_chunks(resume_text: str) -> list[str]:
+    starts = [m.start() for m in RESUME_HEADINGS.finditer(resume_text)]
+    if len(starts) >= 2:
+        bounds = [0] + starts + [len(resume_text)]
+        chunks = [resume_text[a:b].strip() for a, b in zip(bounds, bounds[1:])]
+    else:
+        chunks = []
+    # very long sections (e.g. one big EXPERIENCE block) are ranked at sentence-window granularity
+    out = []
+    for chunk in chunks or [resume_text]:
+        if len(chunk) <= RESUME_CHUNK_CHARS * 2:
+            out.append(chunk)
+            continue
+        window = ""
+        for sentence in split_sentences(chunk):
+            if window and len(window) + len(sentence) > RESUME_CHUNK_CHARS:
+                out.append(window)
+                window = ""
+            window = f"{window} {sentence}".strip()
+        if window:
+            out.append(window)
+    return [c for c in out if c]
+
+
+def _terms(text: str) -> list[str]:
+    return [w.strip(".-") for w in _WORD.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def rank_by_relevance(chunks: list[str], query: str) -> list[float]:
+    """TF-IDF cosine similarity of each chunk to the query (chunks form the corpus)."""
+    docs = [Counter(_terms(c)) for c in chunks]
+    query_tf = Counter(_terms(query))
+    n = len(docs) + 1
+    df = Counter()
+    for terms in docs + [query_tf]:
+        df.update(terms.keys())
+    idf = {t: math.log(n / df[t]) + 1.0 for t in df}
+
+    def vec(tf: Counter) -> dict[str, float]:
+        return {t: (1 + math.log(c)) * idf[t] for t, c in tf.items()}
+
+    q = vec(query_tf)
+    q_norm = math.sqrt(sum(v * v for v in q.values())) or 1.0
+    scores = []
+    for tf in docs:
+        d = vec(tf)
+        d_norm = math.sqrt(sum(v * v for v in d.values())) or 1.0
+        scores.append(sum(w * q.get(t, 0.0) for t, w in d.items()) / (d_norm * q_norm))
+    return scores
+
+
+def truncate_to_budget(text: str, budget: int) -> str:
+    """Longest prefix of whole sentences that fits in the budget."""
+    kept, used = [], 0
+    for sentence in split_sentences(text):
+        cost = count_tokens(sentence)
+        if used + cost > budget:
+            break
+        kept.append(sentence)
+        used += cost
+    return "\n".join(kept)
+
+
+def compact_job_description(job_description: str, budget: int) -> str:
+    seen: set[str] = set()
+    sections = [(kind, strip_boilerplate(text, seen)) for kind, text in split_jd_sections(job_description)]
+    # a heading whose whole body was boilerplate is dropped with it
+    sections = [(kind, text) for kind, text in sections if text and (kind == "other" or "\n" in text)]
+    priority = {kind: i for i, (kind, _) in enumerate(JD_SECTION_PRIORITY)}
+
+    kept: dict[int, str] = {}
+    remaining = budget
+    for i in sorted(range(len(sections)), key=lambda i: (priority[sections[i][0]], i)):
+        text = sections[i][1]
+        cost = count_tokens(text)
+        if cost > remaining:
+            # fill what is left with the start of this section, then stop
+            partial = truncate_to_budget(text, remaining)
+            if partial:
+                kept[i] = partial
+            break
+        kept[i] = text
+        remaining -= cost
+    return "\n\n".join(kept[i] for i in sorted(kept))
+
+
+def compact_resume(resume_text: str, job_description: str, budget: int) -> str:
+    # the job-description patterns would drop resume lines like "Ran the 401(k) migration"
+    chunks = split_resume_chunks(strip_boilerplate(resume_text, joiner=" ", boilerplate=None))
+    if count_tokens(" ".join(chunks)) <= budget:
+        return " ".join(chunks)
+
+    scores = rank_by_relevance(chunks, job_description)
+    scores[0] = float("inf")  # the header (name, contact, summary) always stays
+    kept, remaining = set(), budget
+    for i in sorted(range(len(chunks)), key=lambda i: -scores[i]):
+        cost = count_tokens(chunks[i])
+        if cost <= remaining:
+            kept.add(i)
+            remaining -= cost
+    return " ".join(chunks[i] for i in sorted(kept))
+
+
+def compact_payload(payload: dict) -> dict:
+    """Return a copy of a build_user_prompt payload fitted to PROMPT_TOKEN_BUDGET."""
+    budget = settings.PROMPT_TOKEN_BUDGET
+    if budget <= 0:
+        return payload
+    jd, resume = payload["job_description"], payload["resume_text"]
+    if count_tokens(jd) + count_tokens(resume) <= budget:
+        return payload
+
+    jd_budget = int(budget * settings.PROMPT_JD_SHARE)
+    compact_jd = compact_job_description(jd, jd_budget)
+    # whatever the job description does not use goes to the resume
+    resume_budget = budget - count_tokens(compact_jd)
+    return {
+        **payload,
+        "job_description": compact_jd,
+        "resume_text": compact_resume(resume, jd, resume_budget),
+    }
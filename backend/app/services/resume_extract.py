@@ -1,26 +1,320 @@
+"""Resume text extraction.
+
+Pages (and DOCX paragraphs) are read one at a time and normalized as they
+arrive, and reading stops as soon as MAX_EXTRACTED_CHARS is reached, so a
+long portfolio PDF costs about as much as its first few pages. Every document
+gets EXTRACT_TIME_BUDGET_S; one that runs past it raises ExtractionTimeout
+rather than returning part of its text, which could then be cached under
+the file's digest for good.
+
+PDFs are parsed by EXTRACT_PROCESSES single-process workers, so the budget
+also bounds opening the file and any single page, which a thread could only
+check between pages. An extraction first waits for a free worker, and its
+budget starts then, not when the upload arrived. Short PDFs are read by one
+task; large ones are split into page ranges over whatever other workers are
+idle. A worker still busy at the deadline is terminated and replaced on its
+own, so no other upload loses its work. At most EXTRACT_QUEUE_MAX PDFs wait
+for a worker; beyond that uploads get ExtractionBusy (503).
+
+Sources may be bytes or any seekable binary stream (the upload routes pass
+the spooled upload itself, see app.services.upload). A PDF that passes the
+type sniff but cannot be parsed raises UnreadableResume.
+"""
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
-from pypdf import PdfReader
-import docx
+from typing import TYPE_CHECKING, BinaryIO, Iterable
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+log = logging.getLogger(__name__)
 
 MAX_EXTRACTED_CHARS = 20000  # cost control + prompt size control
 
+_executor: ThreadPoolExecutor | None = None
+# idle PDF workers; None marks a slot whose process is started on first use
+_workers: "queue.Queue[ProcessPoolExecutor | None] | None" = None
+_workers_lock = threading.Lock()
+_pdf_pending = 0  # PDF extractions holding or waiting for a worker
+
+_NUL_TO_SPACE = str.maketrans({"\x00": " "})
+
+class UnreadableResume(Exception):
+    """The file passed the type sniff but the parser cannot read it."""
+
+class ExtractionTimeout(Exception):
+    """The document ran past EXTRACT_TIME_BUDGET_S."""
+
+class ExtractionBusy(Exception):
+    """Too many PDFs already waiting for a worker; shed the upload."""
+
+@contextmanager
+def _pdf_errors():
+    # pypdf raises these lazily, from opening the file to reading any page
+    from pypdf.errors import PyPdfError
+
+    try:
+        yield
+    except PyPdfError as e:
+        raise UnreadableResume(f"invalid PDF: {e}") from None
+
+def _as_stream(source: bytes | BinaryIO) -> BinaryIO:
+    return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+def _as_bytes(source: bytes | BinaryIO) -> bytes:
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    source.seek(0)
+    return source.read()
+
 def normalize_text(t: str) -> str:
-    t = t.replace("\x00", " ")
-    t = " ".join(t.split())
-    return t.strip()
-
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    reader = PdfReader(BytesIO(file_bytes))
-    chunks = []
-    for page in reader.pages:
-        txt = page.extract_text() or ""
-        chunks.append(txt)
-    text = normalize_text("\n".join(chunks))
-    return text[:MAX_EXTRACTED_CHARS]
-
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    f = BytesIO(file_bytes)
-    document = docx.Document(f)
-    chunks = [p.text for p in document.paragraphs if p.text]
-    text = normalize_text("\n".join(chunks))
-    return text[:MAX_EXTRACTED_CHARS]
+    # split() with no argument already drops leading/trailing whitespace
+    return " ".join(t.translate(_NUL_TO_SPACE).split())
+
+def collect_text(chunks: Iterable[str], limit: int, deadline: float | None = None) -> str:
+    """Normalize chunks one by one, stopping at `limit` chars.
+
+    Raises ExtractionTimeout if a chunk arrives after the deadline.
+    """
+    parts, size = [], 0
+    for chunk in chunks:
+        if deadline is not None and time.monotonic() > deadline:
+            raise ExtractionTimeout()
+        piece = normalize_text(chunk)
+        if piece:
+            parts.append(piece)
+            size += len(piece) + 1
+        if size > limit:
+            break
+    return " ".join(parts)[:limit]
+
+def _page_texts(reader: "PdfReader", start: int, stop: int):
+    for i in range(start, stop):
+        yield reader.pages[i].extract_text() or ""
+
+def _extract_page_range(file_bytes: bytes, start: int, stop: int, limit: int) -> str:
+    # runs in a worker process; each range is capped on its own
+    from pypdf import PdfReader
+
+    with _pdf_errors():
+        reader = PdfReader(BytesIO(file_bytes))
+        return collect_text(_page_texts(reader, start, stop), limit)
+
+def _open_pdf(file_bytes: bytes, parallel_min_pages: int, limit: int) -> tuple[int, str | None]:
+    """(page_count, text) from a worker process; text is None for documents left to the ranges.
+
+    Parsing the document is as unbounded as reading a page, so it happens
+    here too, under the caller's deadline. Short documents are read in
+    the same task.
+    """
+    from pypdf import PdfReader
+
+    with _pdf_errors():
+        reader = PdfReader(BytesIO(file_bytes))
+        page_count = len(reader.pages)
+        if page_count >= parallel_min_pages:
+            return page_count, None
+        return page_count, collect_text(_page_texts(reader, 0, page_count), limit)
+
+def get_executor() -> ThreadPoolExecutor:
+    # Parsing is CPU-bound; keep it off the event loop and cap how many run at once
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.EXTRACT_MAX_WORKERS,
+            thread_name_prefix="resume-extract",
+        )
+    return _executor
+
+def _warm_worker():
+    import pypdf  # noqa: F401
+
+def _noop() -> None:
+    return None
+
+def _worker_slots() -> "queue.Queue[ProcessPoolExecutor | None]":
+    global _workers
+    with _workers_lock:  # extractions run on several executor threads
+        if _workers is None:
+            _workers = queue.Queue()
+            for _ in range(settings.EXTRACT_PROCESSES):
+                _workers.put(None)
+        return _workers
+
+def _take_worker(block: bool = True) -> ProcessPoolExecutor | None:
+    try:
+        worker = _worker_slots().get(block=block)
+    except queue.Empty:
+        return None
+    if worker is None:
+        # one process per executor, so a stuck task can be terminated without touching the others
+        worker = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),  # never fork the event loop process
+            initializer=_warm_worker,
+        )
+        try:
+            worker.submit(_noop).result()  # start-up is not charged to the document's budget
+        except BaseException:
+            worker.shutdown(wait=False, cancel_futures=True)
+            _worker_slots().put(None)
+            raise
+    return worker
+
+def _return_worker(worker: ProcessPoolExecutor, kill: bool = False):
+    if kill:
+        # a page stuck past the deadline never returns; terminating is the only way to reclaim it
+        for proc in list((getattr(worker, "_processes", None) or {}).values()):
+            proc.terminate()
+        worker.shutdown(wait=False, cancel_futures=True)
+        worker = None  # the slot starts a fresh process on next use
+    _worker_slots().put(worker)
+
+def shutdown_page_pool():
+    global _workers
+    with _workers_lock:
+        workers, _workers = _workers, None
+    while workers is not None and not workers.empty():
+        worker = workers.get_nowait()
+        if worker is not None:
+            worker.shutdown(wait=False, cancel_futures=True)
+
+class _PdfJob:
+    """The workers one PDF extraction holds, and the tasks running on them."""
+
+    def __init__(self):
+        self.idle = [_take_worker()]  # blocks until a worker is free
+        self.busy: dict[Future, ProcessPoolExecutor] = {}
+        self.crashed: list[ProcessPoolExecutor] = []
+        # the budget starts once a worker is ours; time queued behind other uploads is not charged
+        self.deadline = time.monotonic() + settings.EXTRACT_TIME_BUDGET_S
+
+    def borrow_idle(self):
+        """Add any other workers that are free right now, without waiting for one."""
+        while len(self.idle) + len(self.busy) < settings.EXTRACT_PROCESSES:
+            worker = _take_worker(block=False)
+            if worker is None:
+                return
+            self.idle.append(worker)
+
+    def submit(self, fn, *args) -> Future:
+        worker = self.idle.pop()
+        fut = worker.submit(fn, *args)
+        self.busy[fut] = worker
+        return fut
+
+    def wait_any(self) -> set[Future]:
+        finished, _ = wait(self.busy, timeout=max(0.0, self.deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+        if not finished:
+            raise ExtractionTimeout()
+        return finished
+
+    def result(self, fut: Future):
+        worker = self.busy.pop(fut)
+        try:
+            value = fut.result()
+        except BrokenProcessPool:
+            self.crashed.append(worker)  # e.g. killed for running out of memory on this document
+            raise UnreadableResume("PDF worker crashed") from None
+        self.idle.append(worker)
+        return value
+
+    def close(self):
+        # ranges still running (text budget met, or an error elsewhere) may finish inside the budget
+        if self.busy:
+            wait(self.busy, timeout=max(0.0, self.deadline - time.monotonic()))
+        for fut, worker in self.busy.items():
+            if not fut.done():
+                log.warning("PDF extraction ran past the %.1fs budget; restarting its worker",
+                            settings.EXTRACT_TIME_BUDGET_S)
+            _return_worker(worker, kill=not fut.done())
+        for worker in self.crashed:
+            _return_worker(worker, kill=True)
+        for worker in self.idle:
+            _return_worker(worker)
+
+def _extract_pdf_parallel(job: _PdfJob, file_bytes: bytes, page_count: int) -> str:
+    """Read page ranges on the job's workers, one range per worker at a time.
+
+    Ranges are consumed in page order; once the text read so far covers the
+    budget nothing further is submitted.
+    """
+    step = settings.EXTRACT_PAGES_PER_TASK
+    ranges = [(i, min(i + step, page_count)) for i in range(0, page_count, step)]
+    done_text: dict[int, str] = {}
+    range_of: dict[Future, int] = {}
+    next_range = next_needed = 0
+    parts, size = [], 0
+
+    while size <= MAX_EXTRACTED_CHARS and next_needed < len(ranges):
+        while next_range < len(ranges) and job.idle:
+            start, stop = ranges[next_range]
+            range_of[job.submit(_extract_page_range, file_bytes, start, stop, MAX_EXTRACTED_CHARS)] = next_range
+            next_range += 1
+        for fut in job.wait_any():
+            done_text[range_of.pop(fut)] = job.result(fut)
+        while next_needed in done_text:
+            piece = done_text.pop(next_needed)
+            if piece:
+                parts.append(piece)
+                size += len(piece) + 1
+            next_needed += 1
+    return " ".join(parts)[:MAX_EXTRACTED_CHARS]
+
+def _extract_pdf_pooled(file_bytes: bytes) -> str:
+    job = _PdfJob()
+    try:
+        first = job.submit(_open_pdf, file_bytes, settings.EXTRACT_PARALLEL_MIN_PAGES, MAX_EXTRACTED_CHARS)
+        job.wait_any()
+        page_count, text = job.result(first)
+        if text is not None:
+            return text
+        job.borrow_idle()
+        return _extract_pdf_parallel(job, file_bytes, page_count)
+    finally:
+        job.close()
+
+def extract_text_from_pdf(source: bytes | BinaryIO) -> str:
+    if settings.EXTRACT_PROCESSES <= 0:
+        from pypdf import PdfReader  # imported on first upload (or by the startup warm-up)
+
+        # in-thread reading checks the deadline only between pages
+        deadline = time.monotonic() + settings.EXTRACT_TIME_BUDGET_S
+        with _pdf_errors():
+            reader = PdfReader(_as_stream(source))
+            return collect_text(_page_texts(reader, 0, len(reader.pages)), MAX_EXTRACTED_CHARS, deadline)
+    # worker processes need their own copy of the document
+    return _extract_pdf_pooled(_as_bytes(source))
+
+def extract_text_from_docx(source: bytes | BinaryIO) -> str:
+    import docx
+
+    deadline = time.monotonic() + settings.EXTRACT_TIME_BUDGET_S
+    document = docx.Document(_as_stream(source))
+    chunks = (p.text for p in document.paragraphs if p.text)
+    return collect_text(chunks, MAX_EXTRACTED_CHARS, deadline)
+
+async def extract_resume_text(source: bytes | BinaryIO, kind: str) -> str:
+    global _pdf_pending
+    pooled = kind == "pdf" and settings.EXTRACT_PROCESSES > 0
+    if pooled and _pdf_pending >= settings.EXTRACT_PROCESSES + settings.EXTRACT_QUEUE_MAX:
+        raise ExtractionBusy()
+    fn = extract_text_from_pdf if kind == "pdf" else extract_text_from_docx
+    loop = asyncio.get_running_loop()
+    if not pooled:
+        return await loop.run_in_executor(get_executor(), fn, source)
+    _pdf_pending += 1
+    try:
+        return await loop.run_in_executor(get_executor(), fn, source)
+    finally:
+        _pdf_pending -= 1
@@ -0,0 +1,69 @@
+from typing import Iterable
+from sqlalchemy import delete, select, union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.coverletter import CoverLetter
+from app.models.generation_job import GenerationJob
+from app.models.resume import Resume
+from app.models.resume_blob import ResumeBlob
+
+ACTIVE_JOB_STATUSES = ("queued", "running")  # jobs that will still read their blob
+
+async def lookup_resume_text(db: AsyncSession, digest: str) -> tuple[int, str] | None:
+    row = (await db.execute(
+        select(ResumeBlob.id, ResumeBlob.text).where(ResumeBlob.sha256 == digest)
+    )).first()
+    return (row.id, row.text) if row else None
+
+async def store_resume_text(db: AsyncSession, digest: str, text: str) -> int:
+    blob = ResumeBlob(sha256=digest, text=text)
+    db.add(blob)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # another request stored the same file first; reuse its row
+        await db.rollback()
+        return (await lookup_resume_text(db, digest))[0]
+    return blob.id
+
+async def saved_resume_text(db: AsyncSession, user_id: int, resume_id: int) -> tuple[int, str] | None:
+    row = (await db.execute(
+        select(ResumeBlob.id, ResumeBlob.text)
+        .join(Resume, Resume.resume_blob_id == ResumeBlob.id)
+        .where(Resume.id == resume_id, Resume.user_id == user_id)
+    )).first()
+    return (row.id, row.text) if row else None
+
+def user_blob_ids(db: Session, user_id: int) -> set[int]:
+    """Every blob a user's letters, saved resumes or jobs point at."""
+    rows = db.execute(union(
+        select(CoverLetter.resume_blob_id).where(CoverLetter.user_id == user_id),
+        select(Resume.resume_blob_id).where(Resume.user_id == user_id),
+        select(GenerationJob.resume_blob_id).where(GenerationJob.user_id == user_id),
+    )).scalars()
+    return {blob_id for blob_id in rows if blob_id is not None}
+
+def delete_orphan_blobs(db: Session, blob_ids: Iterable[int | None]) -> int:
+    """Delete those of blob_ids nothing references any more, and commit.
+
+    Blobs are shared by content across letters, saved resumes and users, so
+    one is only removed once no letter, saved resume or unfinished job uses
+    it. Finished jobs that pointed at it go with it; their payload belongs
+    to the same deleted work.
+    """
+    candidates = {blob_id for blob_id in blob_ids if blob_id is not None}
+    if not candidates:
+        return 0
+    referenced = union(
+        select(CoverLetter.resume_blob_id).where(CoverLetter.resume_blob_id.in_(candidates)),
+        select(Resume.resume_blob_id).where(Resume.resume_blob_id.in_(candidates)),
+        select(GenerationJob.resume_blob_id).where(GenerationJob.resume_blob_id.in_(candidates),
+                                                   GenerationJob.status.in_(ACTIVE_JOB_STATUSES)),
+    )
+    orphans = candidates - set(db.execute(referenced).scalars())
+    if orphans:
+        db.execute(delete(GenerationJob).where(GenerationJob.resume_blob_id.in_(orphans)))
+        db.execute(delete(ResumeBlob).where(ResumeBlob.id.in_(orphans)))
+    db.commit()
+    return len(orphans)
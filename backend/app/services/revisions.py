@@ -0,0 +1,133 @@
+"""Versioned edits of a cover letter's text.
+
+Clients save by sending splice ops against the version they last saw:
+each op replaces `delete` characters at `pos` with `insert`, applied in
+order to the text as left by the previous op. Offsets count UTF-16 code
+units, as JavaScript string indices do, so a character outside the BMP
+(most emoji) is two units wide. A save only succeeds if
+the letter is still at `base_version` (optimistic concurrency); otherwise
+VersionConflict carries the current version so the client can rebase.
+
+The current text stays materialized in cover_letters.edited_final so
+reads, PDFs and search never replay history. Each version is also kept
+in cover_letter_revisions: as the ops that produced it, or as a full
+snapshot every SNAPSHOT_EVERY versions, so any old version is rebuilt
+from at most SNAPSHOT_EVERY - 1 deltas.
+"""
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.coverletter import CoverLetter
+from app.models.coverletter_revision import CoverLetterRevision
+
+SNAPSHOT_EVERY = 20
+MAX_TEXT_CHARS = 30000  # same cap as a full-text save
+
+
+class PatchError(ValueError):
+    pass
+
+
+class VersionConflict(Exception):
+    def __init__(self, current_version: int):
+        super().__init__(f"Letter is at version {current_version}")
+        self.current_version = current_version
+
+
+def apply_ops(text: str, ops: list[dict]) -> str:
+    units = text.encode("utf-16-le")  # two bytes per code unit
+    for op in ops:
+        pos, delete, insert = op["pos"], op.get("delete", 0), op.get("insert", "")
+        if pos < 0 or delete < 0 or 2 * (pos + delete) > len(units):
+            raise PatchError(f"Op at {pos} (+{delete}) is outside the text ({len(units) // 2} UTF-16 units)")
+        # surrogatepass: JSON may carry half of a pair, completed by a neighbouring op
+        units = units[:2 * pos] + insert.encode("utf-16-le", "surrogatepass") + units[2 * (pos + delete):]
+    try:
+        text = units.decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise PatchError("Ops leave half of a surrogate pair in the text")
+    if len(text) > MAX_TEXT_CHARS:
+        raise PatchError(f"Edited text exceeds {MAX_TEXT_CHARS} characters")
+    return text
+
+
+def _record(db: Session, cover_id: int, base_version: int, previous: str, new_version: int,
+            text: str, ops: list[dict] | None):
+    if base_version == 0:
+        # first save ever: keep the starting text so version 0 can be rebuilt too
+        db.add(CoverLetterRevision(cover_letter_id=cover_id, version=0, kind="snapshot", text=previous))
+    if ops is None or new_version % SNAPSHOT_EVERY == 0:
+        db.add(CoverLetterRevision(cover_letter_id=cover_id, version=new_version, kind="snapshot", text=text))
+    else:
+        db.add(CoverLetterRevision(cover_letter_id=cover_id, version=new_version, kind="delta", ops=ops))
+
+
+def save_edit(db: Session, user_id: int, cover_id: int, base_version: int | None,
+              ops: list[dict] | None = None, text: str | None = None) -> tuple[int, str, str, str] | None:
+    """Apply ops (or replace the whole text) and commit a new version.
+
+    base_version=None skips the concurrency check (legacy full-text saves).
+    Returns (version, previous_text, new_text, input_full_name), or None if
+    the letter does not exist for this user.
+    """
+    row = db.execute(
+        select(CoverLetter.edited_final, CoverLetter.ai_draft, CoverLetter.edit_version, CoverLetter.input_full_name)
+        .where(CoverLetter.id == cover_id, CoverLetter.user_id == user_id)
+    ).first()
+    if row is None:
+        return None
+    current = row.edit_version
+    if base_version is not None and base_version != current:
+        raise VersionConflict(current)
+
+    previous = row.edited_final or row.ai_draft
+    new_text = text if ops is None else apply_ops(previous, ops)
+    new_version = current + 1
+
+    # the version check is repeated in the UPDATE so two racing saves cannot both win
+    updated = db.execute(
+        update(CoverLetter)
+        .where(CoverLetter.id == cover_id, CoverLetter.edit_version == current)
+        .values(edited_final=new_text, edit_version=new_version)
+    ).rowcount
+    if not updated:
+        db.rollback()
+        latest = db.execute(select(CoverLetter.edit_version).where(CoverLetter.id == cover_id)).scalar()
+        raise VersionConflict(latest)
+
+    _record(db, cover_id, current, previous, new_version, new_text, ops)
+    db.commit()
+    return new_version, previous, new_text, row.input_full_name
+
+
+def text_at_version(db: Session, user_id: int, cover_id: int, version: int) -> str | None:
+    owned = db.execute(
+        select(CoverLetter.edit_version, CoverLetter.edited_final, CoverLetter.ai_draft)
+        .where(CoverLetter.id == cover_id, CoverLetter.user_id == user_id)
+    ).first()
+    if owned is None or version < 0 or version > owned.edit_version:
+        return None
+    if version == owned.edit_version:
+        return owned.edited_final or owned.ai_draft
+
+    snapshot = db.execute(
+        select(CoverLetterRevision.version, CoverLetterRevision.text)
+        .where(CoverLetterRevision.cover_letter_id == cover_id,
+               CoverLetterRevision.kind == "snapshot",
+               CoverLetterRevision.version <= version)
+        .order_by(CoverLetterRevision.version.desc())
+        .limit(1)
+    ).first()
+    if snapshot is None:
+        return None  # edited before versioning existed
+    deltas = db.execute(
+        select(CoverLetterRevision.ops)
+        .where(CoverLetterRevision.cover_letter_id == cover_id,
+               CoverLetterRevision.version > snapshot.version,
+               CoverLetterRevision.version <= version)
+        .order_by(CoverLetterRevision.version)
+    ).scalars()
+    text = snapshot.text
+    for ops in deltas:
+        text = apply_ops(text, ops)
+    return text
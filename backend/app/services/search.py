@@ -0,0 +1,91 @@
+"""Ranked full-text search over a user's cover letters.
+
+Postgres matches the GIN-indexed search_vector() against
+websearch_to_tsquery, ranks with ts_rank and builds highlights with
+ts_headline for the returned rows only. SQLite uses the cover_letters_fts
+FTS5 table (kept in sync by triggers), ranked by bm25 with snippet().
+
+Snippets are HTML-escaped and matches are wrapped in <mark>.
+"""
+import html
+import re
+
+from sqlalchemy import column, func, literal_column, select, table
+from sqlalchemy.orm import Session
+
+from app.models.coverletter import SEARCH_CONFIG, CoverLetter, search_vector
+
+# private-use sentinels mark matches until the snippet is escaped
+MATCH_START, MATCH_END = "\ue000", "\ue001"
+SNIPPET_WORDS = 24
+
+_fts = table("cover_letters_fts", column("rowid"))
+_FTS_TERM = re.compile(r"\w+")
+
+def highlight(snippet: str | None) -> str:
+    escaped = html.escape(snippet or "")
+    return escaped.replace(MATCH_START, "<mark>").replace(MATCH_END, "</mark>")
+
+def _summary_columns():
+    return (
+        CoverLetter.id,
+        CoverLetter.company_name,
+        CoverLetter.job_title,
+        CoverLetter.tone,
+        CoverLetter.status,
+        CoverLetter.created_at,
+    )
+
+def _search_postgres(db: Session, user_id: int, q: str, limit: int):
+    config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+    query = func.websearch_to_tsquery(config, q)
+    vector = search_vector()
+    rank = func.ts_rank(vector, query).label("rank")
+    hits = (
+        select(CoverLetter.id, rank)
+        .where(CoverLetter.user_id == user_id, vector.op("@@")(query))
+        .order_by(rank.desc(), CoverLetter.id.desc())
+        .limit(limit)
+        .subquery()
+    )
+    # ts_headline re-parses the text, so it only runs on the page of hits
+    options = f'StartSel="{MATCH_START}", StopSel="{MATCH_END}", MaxWords={SNIPPET_WORDS}, MinWords=8, MaxFragments=2'
+    body = func.coalesce(CoverLetter.edited_final, CoverLetter.ai_draft)
+    return db.execute(
+        select(*_summary_columns(), func.ts_headline(config, body, query, options).label("snippet"))
+        .join(hits, hits.c.id == CoverLetter.id)
+        .order_by(hits.c.rank.desc(), CoverLetter.id.desc())
+    ).all()
+
+def fts_match(user_id: int, q: str) -> str | None:
+    """FTS5 query: every word must match (quoted, so user input is never FTS syntax)."""
+    terms = _FTS_TERM.findall(q)
+    if not terms:
+        return None
+    words = " AND ".join(f'"{t}"' for t in terms)
+    return f"user_id : u{user_id} AND ({words})"
+
+def _search_sqlite(db: Session, user_id: int, q: str, limit: int):
+    match = fts_match(user_id, q)
+    if match is None:
+        return []
+    fts = literal_column("cover_letters_fts")
+    snippet = func.snippet(fts, -1, MATCH_START, MATCH_END, "…", SNIPPET_WORDS)
+    # column weights: company, title, letter, job description, owner
+    rank = func.bm25(fts, 10.0, 10.0, 4.0, 1.0, 0.0)
+    return db.execute(
+        select(*_summary_columns(), snippet.label("snippet"))
+        .join(_fts, _fts.c.rowid == CoverLetter.id)
+        # the FTS user_id column narrows the match; the join column is what guarantees ownership
+        .where(fts.op("MATCH")(match), CoverLetter.user_id == user_id)
+        .order_by(rank)
+        .limit(limit)
+    ).all()
+
+def search_coverletters(db: Session, user_id: int, q: str, limit: int) -> list[dict]:
+    """Best matches first, as CoverLetterSummary-shaped dicts."""
+    if db.bind.dialect.name == "postgresql":
+        rows = _search_postgres(db, user_id, q, limit)
+    else:
+        rows = _search_sqlite(db, user_id, q, limit)
+    return [{**row._mapping, "snippet": highlight(row.snippet)} for row in rows]
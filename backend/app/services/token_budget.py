@@ -0,0 +1,122 @@
+"""Per-user daily budget of LLM tokens.
+
+Request limits cap how often a user can generate, not how much each call
+costs. This keeps a counter per user and UTC day of the tokens OpenAI
+actually billed (cache hits are free) and refuses new generations once it
+passes LLM_DAILY_TOKEN_BUDGET.
+
+Each LLM call reserves its estimated tokens with one INCRBY before it
+starts and is refused (the reservation rolled back) if the counter was
+already at the budget; when it ends the difference to the billed tokens
+is settled. Concurrent calls therefore see each other's reservations and
+can overshoot the budget by at most one call. check() is a read-only
+early refusal for routes, before any upload or queueing work.
+
+Counters live in Redis when REDIS_URL is set, so every worker shares
+them; otherwise each process keeps its own (warn_if_unshared() logs this
+at startup) and a user gets the budget once per worker.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+from app.core.cache import FakeRedis, get_redis
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+KEY_TTL_S = 2 * 24 * 3600  # outlives the day it counts, then Redis drops it
+
+
+class TokenBudgetExceeded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__("Daily token budget used up")
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class Reservation:
+    key: str  # the day it was taken from, even if the call ends after midnight
+    tokens: int
+
+
+def _day_window(now: datetime) -> tuple[str, int]:
+    """(day stamp, seconds until the next UTC midnight)."""
+    tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return now.strftime("%Y%m%d"), max(1, int((tomorrow - now).total_seconds()))
+
+
+class TokenBudget:
+    def __init__(self, daily_tokens: int):
+        self.daily_tokens = daily_tokens
+        self._local = None
+
+    @property
+    def client(self):
+        if settings.REDIS_URL:
+            return get_redis()
+        if self._local is None:
+            self._local = FakeRedis()
+        return self._local
+
+    def _key(self, user_id: int, day: str) -> str:
+        return f"llm_tokens:{user_id}:{day}"
+
+    @property
+    def shared(self) -> bool:
+        return bool(settings.REDIS_URL) and settings.REDIS_URL != "fake://"
+
+    async def check(self, user_id: int):
+        """Raise TokenBudgetExceeded if the user has nothing left today (reserves nothing)."""
+        if self.daily_tokens <= 0:
+            return
+        day, reset_in = _day_window(datetime.now(timezone.utc))
+        try:
+            raw = await self.client.get(self._key(user_id, day))
+        except Exception:
+            log.warning("token budget read failed; allowing request", exc_info=True)
+            return
+        if raw and int(raw) >= self.daily_tokens:
+            raise TokenBudgetExceeded(reset_in)
+
+    async def reserve(self, user_id: int, tokens: int) -> Reservation | None:
+        """Take `tokens` from today's budget up front; raise TokenBudgetExceeded if none was left."""
+        if self.daily_tokens <= 0 or tokens <= 0:
+            return None
+        day, reset_in = _day_window(datetime.now(timezone.utc))
+        key = self._key(user_id, day)
+        try:
+            total = await self.client.incrby(key, tokens)
+            if total == tokens:
+                await self.client.expire(key, KEY_TTL_S)  # first charge of the day
+            if total - tokens >= self.daily_tokens:
+                await self.client.incrby(key, -tokens)
+                raise TokenBudgetExceeded(reset_in)
+        except TokenBudgetExceeded:
+            raise
+        except Exception:
+            log.warning("token budget write failed; allowing request", exc_info=True)
+            return None
+        return Reservation(key, tokens)
+
+    async def settle(self, reservation: Reservation | None, used: int):
+        """Replace a reservation with the tokens the call was actually billed."""
+        if reservation is None or used == reservation.tokens:
+            return
+        try:
+            await self.client.incrby(reservation.key, used - reservation.tokens)
+        except Exception:
+            log.warning("token budget write failed", exc_info=True)
+
+
+@lru_cache
+def get_token_budget() -> TokenBudget:
+    return TokenBudget(settings.LLM_DAILY_TOKEN_BUDGET)
+
+
+def warn_if_unshared():
+    budget = get_token_budget()
+    if budget.daily_tokens > 0 and not budget.shared:
+        log.warning("LLM_DAILY_TOKEN_BUDGET is counted per process without REDIS_URL; "
+                    "each worker grants every user the full budget")
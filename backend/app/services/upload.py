@@ -0,0 +1,49 @@
+"""Helpers for resume uploads that work on the spooled file, never a full copy.
+
+Starlette spools each uploaded file into a SpooledTemporaryFile (in memory
+up to 1 MiB, on disk after that). Everything here reads that file in
+place: the type is sniffed from the first bytes and the digest is computed
+in chunks. Parsers get the spool itself, which reads from whichever of its
+buffer or temp file holds the data.
+"""
+import hashlib
+import zipfile
+from typing import BinaryIO
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+SNIFF_BYTES = 1024  # the PDF header may follow a little junk; readers accept it within the first 1 KiB
+
+
+def upload_size(f: BinaryIO) -> int:
+    pos = f.tell()
+    f.seek(0, 2)
+    size = f.tell()
+    f.seek(pos)
+    return size
+
+
+def sniff_kind(f: BinaryIO) -> str | None:
+    """"pdf", "docx" or None, from the content rather than the declared type."""
+    f.seek(0)
+    head = f.read(SNIFF_BYTES)
+    f.seek(0)
+    if PDF_MAGIC in head:
+        return "pdf"
+    if head.startswith(ZIP_MAGIC):
+        # any Office file (and any zip) starts like this; a Word document has its main part
+        try:
+            with zipfile.ZipFile(f) as z:
+                is_docx = "word/document.xml" in z.namelist()
+        except zipfile.BadZipFile:
+            is_docx = False
+        f.seek(0)
+        return "docx" if is_docx else None
+    return None
+
+
+def file_digest(f: BinaryIO) -> str:
+    f.seek(0)
+    digest = hashlib.file_digest(f, "sha256").hexdigest()
+    f.seek(0)
+    return digest
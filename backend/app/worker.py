@@ -0,0 +1,32 @@
+"""Standalone generation worker: `python -m app.worker`.
+
+Lets queue capacity scale separately from the web tier. The API
+processes run no queue workers unless JOB_WORKERS is set, so a
+deployment that accepts /coverletters/jobs needs at least one of these.
+"""
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.core.config import settings
+from app.services.jobs import JobWorkers
+
+DEFAULT_CONCURRENCY = 2
+
+async def main(concurrency: int):
+    workers = JobWorkers(concurrency)
+    workers.start()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+    await workers.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=settings.JOB_WORKERS or DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.concurrency))
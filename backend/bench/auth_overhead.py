@@ -0,0 +1,79 @@
+"""Authentication benchmark: per-request DB lookup vs. claims + TTL cache.
+
+Seeds a user in a throwaway SQLite database and runs the authentication
+step of a request --requests times both ways, counting the SQL statements
+each one issues. "before" mirrors the old get_current_user (decode the JWT,
+then SELECT the user row); "after" is the current dependency.
+
+SQLite makes the saved round trip look cheap; against a networked Postgres
+the difference per request is the full query latency plus a pool checkout.
+
+    python -m bench.auth_overhead --requests 5000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-auth-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.security import access_expires, create_token, decode_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models import User  # noqa: E402
+from app.routes.auth import get_current_user, user_claims  # noqa: E402
+
+
+def main(requests: int) -> dict:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Bench", password_hash="x", token_version=0)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        token = create_token(str(user.id), "access", access_expires(), user_claims(user))
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    def before():
+        payload = decode_token(token)
+        with SessionLocal() as db:
+            return db.query(User).filter(User.id == int(payload["sub"])).first()
+
+    creds = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def after():
+        return get_current_user(creds)
+
+    results = {}
+    for name, fn in (("before", before), ("after", after)):
+        statements = 0
+        t0 = time.perf_counter()
+        for _ in range(requests):
+            fn()
+        wall = time.perf_counter() - t0
+        results[name] = {
+            "auth_per_s": round(requests / wall, 1),
+            "us_per_request": round(wall / requests * 1e6, 1),
+            "sql_statements_per_request": round(statements / requests, 3),
+        }
+    return {"requests": requests, **results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(main(args.requests), indent=2))
@@ -0,0 +1,109 @@
+"""Autosave traffic benchmark: full-text PUT vs. versioned PATCH.
+
+Simulates an editing session on a generated letter (typing words, deleting
+spans, pasting a sentence) with an autosave after every --edits-per-save
+edits. For each save it measures, as JSON bytes:
+
+- PUT: the full text up, and a CoverLetterOut (with job description and
+  resume text) back
+- PATCH: the splice ops up (one per edit, as an editor's change events
+  give them), and an EditAck back
+
+It also compares revision storage: a full copy of every version against
+deltas plus a snapshot every SNAPSHOT_EVERY versions. Every version is
+replayed from the stored revisions to check it comes back exactly.
+
+    python -m bench.autosave_payload --saves 300 --edits-per-save 3
+"""
+import argparse
+import json
+import os
+import random
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.services.revisions import SNAPSHOT_EVERY, apply_ops  # noqa: E402
+
+WORDS = ("team", "systems", "customers", "reliable", "Python", "latency", "shipped", "led", "growth",
+         "roadmap", "analytics", "platform", "mentored", "scaled", "impact")
+
+
+def edit(text: str, rng: random.Random) -> dict:
+    pos = rng.randrange(len(text))
+    roll = rng.random()
+    if roll < 0.6:
+        return {"pos": pos, "delete": 0, "insert": " " + rng.choice(WORDS)}
+    if roll < 0.95:
+        return {"pos": pos, "delete": min(rng.randint(1, 30), len(text) - pos), "insert": ""}
+    return {"pos": pos, "delete": 0, "insert": " " + " ".join(rng.choices(WORDS, k=25)) + "."}
+
+
+def size(obj) -> int:
+    return len(json.dumps(obj, ensure_ascii=False).encode())
+
+
+def main(saves: int, edits_per_save: int, letter_chars: int) -> dict:
+    rng = random.Random(3)
+    text = " ".join(rng.choices(WORDS, k=letter_chars // 7))[:letter_chars]
+    job_description = " ".join(rng.choices(WORDS, k=600))
+    resume_text = " ".join(rng.choices(WORDS, k=1200))
+
+    put_up = put_down = patch_up = patch_down = 0
+    full_copies = 0
+    revisions = [{"version": 0, "kind": "snapshot", "text": text}]
+    versions = [text]
+    for version in range(1, saves + 1):
+        new, ops = text, []
+        for _ in range(edits_per_save):
+            op = edit(new, rng)
+            new = new[:op["pos"]] + op["insert"] + new[op["pos"] + op["delete"]:]
+            ops.append(op)
+        assert apply_ops(text, ops) == new
+
+        put_up += size({"edited_final": new})
+        put_down += size({
+            "id": 1, "input_full_name": "Bench User", "job_title": "Engineer", "company_name": "Acme",
+            "tone": "professional", "job_description": job_description, "extra_notes": None,
+            "resume_text": resume_text, "ai_draft": versions[0], "edited_final": new,
+            "edit_version": version, "status": "complete",
+        })
+        patch_up += size({"base_version": version - 1, "ops": ops})
+        patch_down += size({"id": 1, "version": version})
+
+        full_copies += len(new.encode())
+        if version % SNAPSHOT_EVERY == 0:
+            revisions.append({"version": version, "kind": "snapshot", "text": new})
+        else:
+            revisions.append({"version": version, "kind": "delta", "ops": ops})
+        versions.append(new)
+        text = new
+
+    # replay every version the way text_at_version does
+    for version, expected in enumerate(versions):
+        base = max(r["version"] for r in revisions if r["kind"] == "snapshot" and r["version"] <= version)
+        rebuilt = revisions[base]["text"]
+        for r in revisions[base + 1:version + 1]:
+            rebuilt = apply_ops(rebuilt, r["ops"])
+        assert rebuilt == expected, version
+
+    stored = sum(len(r["text"].encode()) if r["kind"] == "snapshot" else size(r["ops"]) for r in revisions)
+    return {
+        "saves": saves,
+        "final_chars": len(text),
+        "put": {"up_bytes": put_up, "down_bytes": put_down, "per_save": round((put_up + put_down) / saves)},
+        "patch": {"up_bytes": patch_up, "down_bytes": patch_down, "per_save": round((patch_up + patch_down) / saves)},
+        "bandwidth_ratio": round((put_up + put_down) / (patch_up + patch_down), 1),
+        "revision_storage": {"full_copies_bytes": full_copies, "delta_bytes": stored,
+                             "ratio": round(full_copies / stored, 1)},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--saves", type=int, default=300)
+    parser.add_argument("--edits-per-save", type=int, default=3)
+    parser.add_argument("--letter-chars", type=int, default=3000)
+    args = parser.parse_args()
+    print(json.dumps(main(args.saves, args.edits_per_save, args.letter_chars), indent=2))
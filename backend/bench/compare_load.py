@@ -0,0 +1,83 @@
+"""Compare two bench.loadtest reports and flag regressions.
+
+For every workload and endpoint present in both reports it prints
+throughput and p50/p95/p99, old -> new, with the relative change. These
+count as regressions:
+
+- p95 or p99 up by more than --threshold
+- throughput down by more than --threshold
+- the workload's error rate up by more than --max-error-rate-increase
+
+The exit status is 1 if anything regressed. It warns when the two runs
+used different settings, since their numbers are then not comparable.
+
+    python -m bench.compare_load before.json after.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+GATED_LATENCY_KEYS = ("p95_ms", "p99_ms")  # p50 is shown but too noisy to gate on
+
+
+def change(old: float, new: float) -> float | None:
+    return (new - old) / old if old else None
+
+
+def fmt(old: float, new: float) -> str:
+    delta = change(old, new)
+    return f"{old:>9} -> {new:<9} ({delta:+.0%})" if delta is not None else f"{old:>9} -> {new:<9}"
+
+
+def compare(before: dict, after: dict, threshold: float, max_error_rate_increase: float) -> tuple[list[str], list[str]]:
+    lines, regressions = [], []
+    old_settings, new_settings = before["meta"]["settings"], after["meta"]["settings"]
+    differing = sorted(k for k in old_settings.keys() | new_settings.keys()
+                       if old_settings.get(k) != new_settings.get(k))
+    if differing:
+        lines.append(f"warning: runs used different settings ({', '.join(differing)}); numbers are not comparable")
+    lines.append(f"{before['meta']['commit']} -> {after['meta']['commit']}")
+
+    for workload, old in before["workloads"].items():
+        new = after["workloads"].get(workload)
+        if new is None:
+            continue
+        lines.append(f"\n{workload}: {fmt(old['throughput_rps'], new['throughput_rps'])} req/s, "
+                     f"errors {old['error_rate']:.2%} -> {new['error_rate']:.2%}")
+        if new["error_rate"] - old["error_rate"] > max_error_rate_increase:
+            regressions.append(f"{workload}: error rate {old['error_rate']:.2%} -> {new['error_rate']:.2%}")
+
+        for endpoint, o in old["endpoints"].items():
+            n = new["endpoints"].get(endpoint)
+            if n is None or not o["count"] or not n["count"]:
+                continue
+            lines.append(f"  {endpoint}")
+            lines.append(f"    {'rps':<7}{fmt(o['throughput_rps'], n['throughput_rps'])}")
+            delta = change(o["throughput_rps"], n["throughput_rps"])
+            if delta is not None and delta < -threshold:
+                regressions.append(f"{workload} {endpoint}: throughput {delta:+.0%}")
+            for key in LATENCY_KEYS:
+                lines.append(f"    {key:<7}{fmt(o[key], n[key])}")
+                delta = change(o[key], n[key])
+                if key in GATED_LATENCY_KEYS and delta is not None and delta > threshold:
+                    regressions.append(f"{workload} {endpoint}: {key} {delta:+.0%}")
+    return lines, regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative change that counts as a regression")
+    parser.add_argument("--max-error-rate-increase", type=float, default=0.01)
+    args = parser.parse_args()
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    lines, regressions = compare(before, after, args.threshold, args.max_error_rate_increase)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRegressions:\n" + "\n".join(f"  {r}" for r in regressions))
+    sys.exit(1 if regressions else 0)
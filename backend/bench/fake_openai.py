@@ -0,0 +1,110 @@
+"""Minimal OpenAI-compatible chat completions stub for local benchmarks.
+
+Run with:  uvicorn bench.fake_openai:app --port 9100
+and start the API with OPENAI_BASE_URL=http://127.0.0.1:9100/v1
+
+FAKE_OPENAI_LATENCY_S controls how long each completion takes (time to
+first token when streaming); FAKE_OPENAI_TOKENS_PER_S paces streamed chunks.
+
+Fault injection, per request:
+- FAKE_OPENAI_ERROR_RATE: fraction answered with a 500
+- FAKE_OPENAI_429_RATE: fraction answered with a 429
+- FAKE_OPENAI_SLOW_RATE / FAKE_OPENAI_SLOW_S: fraction that take SLOW_S
+  instead of LATENCY_S (a latency tail to hedge against)
+"""
+import asyncio
+import os
+import json
+import random
+import time
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_S = float(os.getenv("FAKE_OPENAI_LATENCY_S", "2.0"))
+TOKENS_PER_S = float(os.getenv("FAKE_OPENAI_TOKENS_PER_S", "80"))
+ERROR_RATE = float(os.getenv("FAKE_OPENAI_ERROR_RATE", "0"))
+RATE_LIMIT_RATE = float(os.getenv("FAKE_OPENAI_429_RATE", "0"))
+SLOW_RATE = float(os.getenv("FAKE_OPENAI_SLOW_RATE", "0"))
+SLOW_S = float(os.getenv("FAKE_OPENAI_SLOW_S", "10.0"))
+
+LETTER = (
+    "Dear Hiring Manager,\n\n"
+    "I am excited to apply for this role. My background lines up closely with "
+    "the responsibilities described in the posting.\n\n"
+    "Thank you for your consideration.\n\nSincerely,\nCandidate"
+)
+
+app = FastAPI(title="fake-openai")
+
+
+def injected_error() -> JSONResponse | None:
+    roll = random.random()
+    if roll < ERROR_RATE:
+        return JSONResponse(status_code=500, content={"error": {"message": "injected failure", "type": "server_error"}})
+    if roll < ERROR_RATE + RATE_LIMIT_RATE:
+        return JSONResponse(status_code=429, content={"error": {"message": "injected rate limit", "type": "rate_limit"}})
+    return None
+
+
+def latency() -> float:
+    return SLOW_S if random.random() < SLOW_RATE else LATENCY_S
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    error = injected_error()
+    if error is not None:
+        return error
+    if body.get("stream"):
+        return StreamingResponse(stream_chunks(body), media_type="text/event-stream")
+    await asyncio.sleep(latency())
+    return {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "fake"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": LETTER},
+            "finish_reason": "stop",
+        }],
+        "usage": usage(body),
+    }
+
+
+def usage(body: dict) -> dict:
+    prompt_chars = sum(len(m.get("content") or "") for m in body.get("messages", []))
+    prompt_tokens = prompt_chars // 4
+    completion_tokens = len(LETTER) // 4
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+async def stream_chunks(body: dict):
+    await asyncio.sleep(latency())
+    model = body.get("model", "fake")
+    for word in LETTER.split(" "):
+        chunk = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+        await asyncio.sleep(1 / TOKENS_PER_S)
+    if (body.get("stream_options") or {}).get("include_usage"):
+        chunk = {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [],
+            "usage": usage(body),
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+    yield "data: [DONE]\n\n"
@@ -0,0 +1,113 @@
+"""Load benchmark: concurrent /coverletters/generate vs. cheap endpoints.
+
+Fires N generate requests at once (against the fake OpenAI server) while
+probing GET /auth/me, and reports how much the probe latency degrades.
+With a blocking generate path the probes queue behind every generation;
+with the async path they should stay close to the idle baseline.
+
+Usage (API started with RATE_LIMIT_ENABLED=false and OPENAI_BASE_URL
+pointing at bench.fake_openai):
+
+    python -m bench.generate_load --base-url http://127.0.0.1:8000 --concurrency 8
+"""
+import argparse
+import asyncio
+import io
+import json
+import time
+import uuid
+
+import docx
+import httpx
+
+from bench.stats import summarize
+
+
+def make_resume_docx() -> bytes:
+    document = docx.Document()
+    document.add_paragraph("Jane Doe — Backend Engineer")
+    for i in range(20):
+        document.add_paragraph(
+            f"Built and operated service {i} in Python and PostgreSQL, "
+            "owning latency, reliability and on-call for a team of five."
+        )
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+async def register(client: httpx.AsyncClient) -> str:
+    resp = await client.post("/auth/register", json={
+        "email": f"bench-{uuid.uuid4().hex[:12]}@example.com",
+        "full_name": "Bench User",
+        "password": "bench-password-123",
+    })
+    resp.raise_for_status()
+    return resp.headers["X-Access-Token"]
+
+
+async def probe(client: httpx.AsyncClient, headers: dict, stop: asyncio.Event, out: list[float]):
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        resp = await client.get("/auth/me", headers=headers)
+        resp.raise_for_status()
+        out.append(time.perf_counter() - t0)
+        await asyncio.sleep(0.05)
+
+
+async def generate_once(client: httpx.AsyncClient, headers: dict, resume: bytes) -> float:
+    t0 = time.perf_counter()
+    resp = await client.post(
+        "/coverletters/generate",
+        headers=headers,
+        data={
+            "input_full_name": "Jane Doe",
+            "job_title": "Backend Engineer",
+            "company_name": "Acme",
+            "tone": "professional",
+            "job_description": "We are looking for a backend engineer with Python experience. " * 5,
+        },
+        files={"resume": ("resume.docx", resume,
+                          "application/vnd.openxmlformats-officedocument.wordprocessingml.document")},
+    )
+    resp.raise_for_status()
+    return time.perf_counter() - t0
+
+
+async def main(base_url: str, concurrency: int, idle_probes: int) -> dict:
+    resume = make_resume_docx()
+    limits = httpx.Limits(max_connections=concurrency + 4)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        headers = {"Authorization": f"Bearer {await register(client)}"}
+
+        idle: list[float] = []
+        for _ in range(idle_probes):
+            t0 = time.perf_counter()
+            (await client.get("/auth/me", headers=headers)).raise_for_status()
+            idle.append(time.perf_counter() - t0)
+
+        loaded: list[float] = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, headers, stop, loaded))
+        t0 = time.perf_counter()
+        gen = await asyncio.gather(*(generate_once(client, headers, resume) for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+        stop.set()
+        await prober
+
+    return {
+        "concurrency": concurrency,
+        "generate_wall_s": round(wall, 2),
+        "generate": summarize(gen),
+        "me_idle": summarize(idle),
+        "me_under_load": summarize(loaded),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--idle-probes", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.base_url, args.concurrency, args.idle_probes)), indent=2))
@@ -0,0 +1,117 @@
+"""Listing benchmark: full-row list vs. keyset-paginated summaries.
+
+Seeds one user with --letters cover letters in a throwaway SQLite database,
+then compares the old list_coverletters behaviour (every row serialized as
+CoverLetterOut) with one page of CoverLetterSummary rows.
+
+It also follows next_cursor through every page. The letters are seeded in
+one transaction, so they share a created_at and only the id breaks ties.
+The exit status is 1 unless each letter is listed exactly once.
+
+    python -m bench.list_payload --letters 1000 --page-size 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-list-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models import CoverLetter, ResumeBlob, User  # noqa: E402
+from app.schemas.coverletter import CoverLetterOut, CoverLetterSummary  # noqa: E402
+from app.services.listing import list_summaries  # noqa: E402
+from bench.stats import summarize  # noqa: E402
+
+JOB_DESCRIPTION = "We are hiring a backend engineer to own Python services. " * 300  # ~17k chars
+RESUME = "Experienced engineer with Python, PostgreSQL and AWS. " * 350
+LETTER = "Dear Hiring Manager, I am excited to apply for this role. " * 40
+
+
+def seed(letters: int) -> int:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Bench", password_hash="x")
+        blob = ResumeBlob(sha256="0" * 64, text=RESUME)
+        db.add_all([user, blob])
+        db.flush()
+        db.add_all([
+            CoverLetter(
+                user_id=user.id, resume_blob_id=blob.id,
+                input_full_name="Bench", job_title=f"Engineer {i}", company_name=f"Company {i}",
+                tone="professional", job_description=JOB_DESCRIPTION, ai_draft=LETTER,
+            )
+            for i in range(letters)
+        ])
+        db.commit()
+        return user.id
+
+
+def time_it(fn, repeats: int) -> tuple[list[float], int]:
+    latencies, size = [], 0
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        size = len(fn())
+        latencies.append(time.perf_counter() - t0)
+    return latencies, size
+
+
+def main(letters: int, page_size: int, repeats: int) -> dict:
+    user_id = seed(letters)
+
+    def full_list() -> bytes:
+        with SessionLocal() as db:
+            rows = (
+                db.query(CoverLetter)
+                .filter(CoverLetter.user_id == user_id)
+                .order_by(CoverLetter.created_at.desc())
+                .all()
+            )
+            return json.dumps([CoverLetterOut.model_validate(r).model_dump(mode="json") for r in rows]).encode()
+
+    def summary_page() -> bytes:
+        with SessionLocal() as db:
+            rows, next_cursor = list_summaries(db, user_id, page_size)
+            items = [CoverLetterSummary.model_validate(r).model_dump(mode="json") for r in rows]
+            return json.dumps({"items": items, "next_cursor": next_cursor}).encode()
+
+    def all_pages() -> tuple[list[int], list[float]]:
+        ids, latencies, cursor = [], [], None
+        with SessionLocal() as db:
+            while len(ids) <= letters:  # stops a cursor that never advances
+                t0 = time.perf_counter()
+                rows, cursor = list_summaries(db, user_id, page_size, cursor)
+                latencies.append(time.perf_counter() - t0)
+                ids += [r.id for r in rows]
+                if cursor is None:
+                    break
+        return ids, latencies
+
+    full_lat, full_size = time_it(full_list, repeats)
+    page_lat, page_size_bytes = time_it(summary_page, repeats)
+    walked, walk_lat = all_pages()
+    return {
+        "letters": letters,
+        "full_list": {"bytes": full_size, **summarize(full_lat)},
+        "summary_page": {"bytes": page_size_bytes, "page_size": page_size, **summarize(page_lat)},
+        "all_pages": {"pages": len(walk_lat), "rows": len(walked), "unique_rows": len(set(walked)),
+                      **summarize(walk_lat)},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--letters", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=10)
+    args = parser.parse_args()
+    results = main(args.letters, args.page_size, args.repeats)
+    print(json.dumps(results, indent=2))
+    walked = results["all_pages"]
+    sys.exit(0 if walked["rows"] == walked["unique_rows"] == args.letters else 1)
@@ -0,0 +1,84 @@
+"""LLM scheduler fairness benchmark: one heavy user vs. several light ones.
+
+A heavy user queues --heavy calls at once, then --light-users users each
+send --light calls a moment later. All of them go through an
+LLMScheduler with --concurrency slots, and each call holds its slot for
+--call-s. The run is repeated twice:
+
+- fifo: every call filed under one user, i.e. first come, first served
+- fair: per-user weighted fair queuing, as the app does it
+
+For each run it reports the queue wait per user class. A third run adds
+interactive calls behind a batch backlog to show the priority lanes.
+
+    python -m bench.llm_fairness --heavy 50 --light-users 5 --light 2
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.services.llm_scheduler import LLMScheduler  # noqa: E402
+from bench.stats import summarize  # noqa: E402
+
+TOKENS = 2000  # a typical prompt + letter
+
+
+async def call(scheduler: LLMScheduler, user_id: int, lane: str, call_s: float, waits: list[float]):
+    t0 = time.perf_counter()
+    async with scheduler.acquire(user_id, lane, TOKENS) as grant:
+        waits.append(time.perf_counter() - t0)
+        await asyncio.sleep(call_s)
+        grant.charge(TOKENS)
+
+
+def scheduler(concurrency: int, backlog: int) -> LLMScheduler:
+    return LLMScheduler(max_concurrency=concurrency, tokens_per_minute=0, max_queue=backlog, max_wait_s=1e9)
+
+
+async def contention(fair: bool, args) -> dict:
+    sched = scheduler(args.concurrency, args.heavy + args.light_users * args.light)
+    heavy, light = [], []
+    tasks = [asyncio.create_task(call(sched, 1, "interactive", args.call_s, heavy)) for _ in range(args.heavy)]
+    await asyncio.sleep(0.01)
+    for u in range(args.light_users):
+        user_id = 100 + u if fair else 1
+        tasks += [asyncio.create_task(call(sched, user_id, "interactive", args.call_s, light))
+                  for _ in range(args.light)]
+    await asyncio.gather(*tasks)
+    return {"heavy_wait": summarize(heavy), "light_wait": summarize(light)}
+
+
+async def lanes(args) -> dict:
+    sched = scheduler(args.concurrency, args.heavy + args.light_users * args.light)
+    batch, interactive = [], []
+    tasks = [asyncio.create_task(call(sched, 1, "batch", args.call_s, batch)) for _ in range(args.heavy)]
+    await asyncio.sleep(0.01)
+    tasks += [asyncio.create_task(call(sched, 100 + u, "interactive", args.call_s, interactive))
+              for u in range(args.light_users)]
+    await asyncio.gather(*tasks)
+    return {"batch_wait": summarize(batch), "interactive_wait": summarize(interactive)}
+
+
+async def main(args) -> dict:
+    return {
+        "fifo": await contention(False, args),
+        "fair": await contention(True, args),
+        "interactive_behind_batch": await lanes(args),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--heavy", type=int, default=50)
+    parser.add_argument("--light-users", type=int, default=5)
+    parser.add_argument("--light", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--call-s", type=float, default=0.05)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
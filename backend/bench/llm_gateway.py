@@ -0,0 +1,121 @@
+"""LLM gateway benchmark against two fault-injecting fake OpenAI servers.
+
+Starts two bench.fake_openai servers:
+
+- "flaky": fast, with a slow tail and injected 500s
+- "steady": slower, no faults
+
+It then sends --calls completions at --concurrency through two setups:
+
+- "single": the flaky backend alone, no hedging, no retries (the old client)
+- "gateway": both backends with routing, retries and hedging
+
+For each setup it reports the latency summary, the failures and the final
+per-backend tracker state.
+
+    python -m bench.llm_gateway --calls 300 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import httpx  # noqa: E402
+from openai import AsyncOpenAI  # noqa: E402
+
+from app.services.llm_gateway import Backend, LatencyTracker, LLMGateway, RetryBudget  # noqa: E402
+from bench.stats import summarize  # noqa: E402
+
+SERVERS = {
+    "flaky": (9101, {"FAKE_OPENAI_LATENCY_S": "0.3", "FAKE_OPENAI_SLOW_RATE": "0.08",
+                     "FAKE_OPENAI_SLOW_S": "4.0", "FAKE_OPENAI_ERROR_RATE": "0.05"}),
+    "steady": (9102, {"FAKE_OPENAI_LATENCY_S": "0.6"}),
+}
+MESSAGES = [{"role": "user", "content": "Write a short cover letter."}]
+
+
+def start_servers() -> list[subprocess.Popen]:
+    procs = []
+    for port, env in SERVERS.values():
+        procs.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "bench.fake_openai:app", "--port", str(port), "--log-level", "warning"],
+            env={**os.environ, **env},
+        ))
+    for port, _ in SERVERS.values():
+        for _ in range(100):
+            try:
+                httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.5)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+    return procs
+
+
+def backend(name: str, http_client: httpx.AsyncClient) -> Backend:
+    port, _ = SERVERS[name]
+    client = AsyncOpenAI(api_key="bench", base_url=f"http://127.0.0.1:{port}/v1",
+                         http_client=http_client, max_retries=0)
+    return Backend(name=name, model="fake", client=client, tracker=LatencyTracker(300, 30))
+
+
+async def run(gateway: LLMGateway, calls: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies, failures = [], 0
+
+    async def one():
+        nonlocal failures
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await gateway.complete(MESSAGES, 0.6)
+            except Exception:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return {
+        **summarize(latencies),
+        "failures": failures,
+        "backends": {b.name: b.tracker.snapshot() for b in gateway.backends},
+    }
+
+
+async def main(calls: int, concurrency: int) -> dict:
+    async with httpx.AsyncClient(limits=httpx.Limits(max_connections=100)) as http_client:
+        single = LLMGateway(
+            backends=[backend("flaky", http_client)], timeout_s=30, max_attempts=1,
+            hedge=False, hedge_min_delay_s=0, hedge_default_delay_s=0,
+            budget=RetryBudget(0.0, 300, min_per_window=0),
+        )
+        gateway = LLMGateway(
+            backends=[backend("flaky", http_client), backend("steady", http_client)], timeout_s=30,
+            max_attempts=3, hedge=True, hedge_min_delay_s=0.2, hedge_default_delay_s=1.0,
+            budget=RetryBudget(0.2, 300),
+        )
+        return {
+            "calls": calls,
+            "concurrency": concurrency,
+            "single": await run(single, calls, concurrency),
+            "gateway": await run(gateway, calls, concurrency),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    procs = start_servers()
+    try:
+        print(json.dumps(asyncio.run(main(args.calls, args.concurrency)), indent=2))
+    finally:
+        for proc in procs:
+            proc.terminate()
@@ -0,0 +1,284 @@
+"""End-to-end load test: the real API, a throwaway database, a fake OpenAI.
+
+Starts bench.fake_openai (--llm-latency-s, --llm-tokens-per-s) and the API
+under uvicorn (--workers), with rate limits and the daily token budget
+off. The database is a fresh SQLite file, or --database-url (e.g. a local
+Postgres) with tables created up front. It registers --users users, gives
+each a few generated letters, then runs each workload for --duration
+seconds with --concurrency closed-loop clients:
+
+- login_storm: POST /auth/login
+- generate_burst: POST /coverletters/generate, each with a new job description
+- browse_mix: list, open, download PDF and /auth/me, weighted like real use
+- mixed: all of the above
+
+Requests during the first --warmup-s seconds of each workload are not
+counted. Per endpoint the report has the request count, throughput,
+status codes and p50/p95/p99 (bench.stats.summarize). It also records the
+commit and every setting, so two runs are comparable with
+bench.compare_load:
+
+    python -m bench.loadtest --duration 30 --concurrency 32 --out before.json
+    python -m bench.loadtest --duration 30 --concurrency 32 --out after.json
+    python -m bench.compare_load before.json after.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+
+import httpx
+
+from bench.generate_load import make_resume_docx
+from bench.stats import summarize
+
+WORKLOADS = {
+    # op -> weight
+    "login_storm": {"login": 1},
+    "generate_burst": {"generate": 1},
+    "browse_mix": {"list": 60, "open": 25, "pdf": 10, "me": 5},
+    "mixed": {"list": 40, "open": 20, "pdf": 8, "me": 10, "login": 12, "generate": 10},
+}
+PASSWORD = "bench-password-123"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+LETTERS_PER_USER = 3
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout_s: float = 60.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout_s}s")
+
+
+def create_tables(env: dict):
+    # a separate interpreter, so this process never imports (or configures) the app
+    code = "from app.db.base import Base; import app.models; from app.db.session import engine; " \
+           "Base.metadata.create_all(engine)"
+    subprocess.run([sys.executable, "-c", code], env=env, check=True, stdout=sys.stderr)
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Client:
+    """One simulated user: credentials, a token and the ids of their letters."""
+
+    def __init__(self, http: httpx.AsyncClient, email: str, resume: bytes):
+        self.http = http
+        self.email = email
+        self.resume = resume
+        self.headers: dict = {}
+        self.letter_ids: list[int] = []
+
+    async def register(self):
+        resp = await self.http.post("/auth/register", json={"email": self.email, "full_name": "Bench User",
+                                                             "password": PASSWORD})
+        resp.raise_for_status()
+        self.headers = {"Authorization": f"Bearer {resp.headers['X-Access-Token']}"}
+
+    async def login(self) -> httpx.Response:
+        resp = await self.http.post("/auth/login", json={"email": self.email, "password": PASSWORD})
+        if resp.status_code == 200:
+            self.headers = {"Authorization": f"Bearer {resp.headers['X-Access-Token']}"}
+        return resp
+
+    async def generate(self) -> httpx.Response:
+        resp = await self.http.post(
+            "/coverletters/generate",
+            headers=self.headers,
+            data={
+                "input_full_name": "Jane Doe",
+                "job_title": "Backend Engineer",
+                "company_name": random.choice(["Acme", "Globex", "Initech", "Hooli"]),
+                "tone": "professional",
+                # a new posting each time, so the generation cache cannot answer
+                "job_description": f"Req {uuid.uuid4().hex[:8]}: backend engineer, Python and PostgreSQL. " * 5,
+            },
+            files={"resume": ("resume.docx", self.resume, DOCX)},
+        )
+        if resp.status_code == 200:
+            self.letter_ids.append(resp.json()["id"])
+        return resp
+
+    async def call(self, op: str) -> httpx.Response:
+        if op == "login":
+            return await self.login()
+        if op == "generate":
+            return await self.generate()
+        if op == "list":
+            return await self.http.get("/coverletters", headers=self.headers, params={"limit": 20})
+        if op == "me":
+            return await self.http.get("/auth/me", headers=self.headers)
+        letter = random.choice(self.letter_ids)
+        if op == "open":
+            return await self.http.get(f"/coverletters/{letter}", headers=self.headers)
+        return await self.http.get(f"/coverletters/{letter}/pdf", headers=self.headers)
+
+
+ENDPOINTS = {
+    "login": "POST /auth/login",
+    "generate": "POST /coverletters/generate",
+    "list": "GET /coverletters",
+    "open": "GET /coverletters/{id}",
+    "pdf": "GET /coverletters/{id}/pdf",
+    "me": "GET /auth/me",
+}
+
+
+async def run_workload(clients: list[Client], weights: dict, duration_s: float, warmup_s: float,
+                       concurrency: int) -> dict:
+    ops, cum_weights = list(weights), []
+    for w in weights.values():
+        cum_weights.append((cum_weights[-1] if cum_weights else 0) + w)
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    started = time.perf_counter()
+    measure_from, stop_at = started + warmup_s, started + warmup_s + duration_s
+
+    async def worker(i: int):
+        client = clients[i % len(clients)]
+        while time.perf_counter() < stop_at:
+            op = random.choices(ops, cum_weights=cum_weights)[0]
+            t0 = time.perf_counter()
+            try:
+                status = str((await client.call(op)).status_code)
+            except httpx.HTTPError as exc:
+                status = type(exc).__name__
+            if t0 >= measure_from:
+                statuses[op][status] += 1
+                if status.startswith("2") or status == "304":
+                    latencies[op].append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    endpoints = {}
+    for op in weights:
+        ok = latencies[op]
+        endpoints[ENDPOINTS[op]] = {
+            **summarize(ok),
+            "throughput_rps": round(len(ok) / duration_s, 2),
+            "statuses": dict(statuses[op]),
+        }
+    total_ok = sum(len(v) for v in latencies.values())
+    total = sum(sum(s.values()) for s in statuses.values())
+    return {
+        "throughput_rps": round(total_ok / duration_s, 2),
+        "error_rate": round(1 - total_ok / total, 4) if total else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+async def drive(base_url: str, args) -> dict:
+    resume = make_resume_docx()
+    limits = httpx.Limits(max_connections=args.concurrency + 8)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as http:
+        clients = [Client(http, f"load-{uuid.uuid4().hex[:10]}@example.com", resume) for _ in range(args.users)]
+        await asyncio.gather(*(c.register() for c in clients))
+        # every user gets some letters to list, open and download
+        seeded = await asyncio.gather(*(c.generate() for c in clients for _ in range(LETTERS_PER_USER)))
+        for resp in seeded:
+            resp.raise_for_status()
+
+        results = {}
+        for name in args.workloads:
+            results[name] = await run_workload(clients, WORKLOADS[name], args.duration, args.warmup_s,
+                                               args.concurrency)
+        return results
+
+
+def main(args) -> dict:
+    random.seed(args.seed)
+    db_dir = tempfile.mkdtemp(prefix="bench-load-")
+    llm_port, api_port = free_port(), free_port()
+    llm_env = {**os.environ, "FAKE_OPENAI_LATENCY_S": str(args.llm_latency_s),
+               "FAKE_OPENAI_TOKENS_PER_S": str(args.llm_tokens_per_s)}
+    api_env = {
+        "DATABASE_URL": args.database_url or f"sqlite:///{db_dir}/load.db",
+        "JWT_SECRET": "bench",
+        "OPENAI_API_KEY": "bench",
+        "BCRYPT_ROUNDS": "10",
+        **os.environ,  # anything set explicitly wins
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "RATE_LIMIT_ENABLED": "false",
+        "LLM_DAILY_TOKEN_BUDGET": "0",
+    }
+    create_tables(api_env)
+
+    # servers write to stderr only, so stdout stays a clean JSON report
+    procs = [
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "bench.fake_openai:app", "--port", str(llm_port),
+                          "--log-level", "warning"], env=llm_env, stdout=sys.stderr),
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(api_port),
+                          "--workers", str(args.workers), "--log-level", "warning"], env=api_env, stdout=sys.stderr),
+    ]
+    try:
+        wait_until_up(f"http://127.0.0.1:{llm_port}/docs")
+        wait_until_up(f"http://127.0.0.1:{api_port}/healthz")
+        workloads = asyncio.run(drive(f"http://127.0.0.1:{api_port}", args))
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait(timeout=15)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "database": api_env["DATABASE_URL"].split("://", 1)[0],
+            "settings": {k: v for k, v in vars(args).items() if k != "out"},
+        },
+        "workloads": workloads,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per workload")
+    parser.add_argument("--warmup-s", type=float, default=5.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--database-url", default=None, help="default: a fresh SQLite file")
+    parser.add_argument("--llm-latency-s", type=float, default=1.0)
+    parser.add_argument("--llm-tokens-per-s", type=float, default=80.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default=None, help="also write the JSON report here")
+    args = parser.parse_args()
+    report = main(args)
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    print(text)
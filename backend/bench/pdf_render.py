@@ -0,0 +1,69 @@
+"""PDF rendering benchmark: inline (threadpool) vs. the warm process pool.
+
+Renders the same letter --renders times at --concurrency and reports
+p50/p99 latency and renders/sec for each path. The PDF cache is not
+involved; every call is a real WeasyPrint render.
+
+    python -m bench.pdf_render --renders 200 --concurrency 8 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.pdf_export import render_pdf_bytes
+from app.services.pdf_renderer import RenderPool
+from bench.stats import summarize
+
+BODY = "\n\n".join(
+    f"Paragraph {i}: I am excited to apply for this role and bring years of "
+    "relevant experience building reliable backend systems." for i in range(6)
+)
+
+
+async def run(render, renders: int, concurrency: int) -> dict:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int):
+        async with sem:
+            t0 = time.perf_counter()
+            await render(f"Candidate {i} — Cover Letter", BODY)
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(renders)))
+    wall = time.perf_counter() - t0
+    out = summarize(latencies)
+    out["renders_per_s"] = round(renders / wall, 2)
+    return out
+
+
+async def main(renders: int, concurrency: int, workers: int) -> dict:
+    async def inline(title, body):
+        return await run_in_threadpool(render_pdf_bytes, title, body)
+
+    pool = RenderPool(workers=workers, max_queue=renders, timeout_s=60,
+                      max_rss_mb=1024, max_tasks_per_child=10_000)
+    await pool.warm()
+    try:
+        return {
+            "renders": renders,
+            "concurrency": concurrency,
+            "workers": workers,
+            "inline": await run(inline, renders, concurrency),
+            "pool": await run(pool.render, renders, concurrency),
+        }
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.renders, args.concurrency, args.workers)), indent=2))
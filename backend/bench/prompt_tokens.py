@@ -0,0 +1,81 @@
+"""Prompt compaction benchmark: prompt tokens before and after compact_payload.
+
+Builds the full user prompt for a few synthetic (job description, resume)
+pairs of growing size and reports token counts with and without
+compaction, plus the time compaction takes.
+
+    python -m bench.prompt_tokens --budget 3500
+"""
+import argparse
+import json
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from app.core.config import settings  # noqa: E402
+from app.services.openai_client import build_user_prompt  # noqa: E402
+from app.services.prompt_compact import compact_payload, count_tokens  # noqa: E402
+
+ABOUT = "About us\nWe build developer tools used by thousands of teams. Our mission is to make software delivery boring.\n"
+RESPONSIBILITIES = "Responsibilities:\n" + "".join(
+    f"- Design, build and operate backend service {i} in Python with PostgreSQL and Redis.\n" for i in range(8)
+)
+REQUIREMENTS = "Requirements:\n" + "".join(
+    f"- {n}+ years of experience with {tech}.\n"
+    for n, tech in [(5, "Python"), (3, "PostgreSQL"), (2, "Kubernetes"), (3, "AWS"), (2, "event-driven systems")]
+)
+BENEFITS = "Benefits\n- Competitive salary and equity\n- 401(k) match\n- Medical, dental, and vision insurance\n- Unlimited paid time off\n"
+EEO = (
+    "We are an equal opportunity employer. All qualified applicants will receive consideration without regard to "
+    "race, color, religion, sex, sexual orientation, gender identity, national origin, disability, or protected "
+    "veteran status. We provide reasonable accommodations to applicants with disabilities.\n"
+)
+
+def job_description(repeats: int) -> str:
+    # job boards often paste the same blocks several times
+    return (ABOUT + RESPONSIBILITIES + REQUIREMENTS + BENEFITS + EEO) * repeats
+
+def resume(roles: int) -> str:
+    parts = ["JANE DOE jane@example.com SUMMARY Backend engineer focused on reliable Python services. EXPERIENCE"]
+    for i in range(roles):
+        parts.append(
+            f"Company {i} — Senior Engineer. Built Python APIs on AWS backed by PostgreSQL. "
+            f"Migrated service {i} to Kubernetes and cut p99 latency by {10 + i}%. "
+            "Mentored engineers and ran incident reviews."
+        )
+    parts.append("EDUCATION BSc Computer Science. SKILLS Python, Go, PostgreSQL, Redis, Kubernetes, AWS, Terraform.")
+    parts.append("INTERESTS " + " ".join(f"Volunteered at community event {i}." for i in range(roles * 2)))
+    return " ".join(parts)
+
+SAMPLES = {"small": (1, 3), "medium": (2, 12), "large": (4, 40)}
+
+def main(budget: int) -> dict:
+    settings.PROMPT_TOKEN_BUDGET = budget
+    results = {}
+    for name, (jd_repeats, roles) in SAMPLES.items():
+        payload = {
+            "input_full_name": "Jane Doe", "job_title": "Backend Engineer", "company_name": "Acme",
+            "tone": "professional", "extra_notes": None,
+            "job_description": job_description(jd_repeats), "resume_text": resume(roles),
+        }
+        t0 = time.perf_counter()
+        compacted = compact_payload(payload)
+        elapsed = time.perf_counter() - t0
+        before = count_tokens(build_user_prompt(**payload))
+        after = count_tokens(build_user_prompt(**compacted))
+        results[name] = {
+            "prompt_tokens_before": before,
+            "prompt_tokens_after": after,
+            "reduction_pct": round(100 * (1 - after / before), 1),
+            "compact_ms": round(elapsed * 1000, 2),
+        }
+    return {"budget": budget, "samples": results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=int, default=settings.PROMPT_TOKEN_BUDGET)
+    args = parser.parse_args()
+    print(json.dumps(main(args.budget), indent=2))
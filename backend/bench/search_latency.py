@@ -0,0 +1,123 @@
+"""Search latency benchmark at --rows cover letters.
+
+Seeds a throwaway database (SQLite with FTS5 by default; pass
+DATABASE_URL=postgresql://... to use the GIN index) with --rows letters
+spread over --users users, one of them owning --heavy letters. Then for
+a few queries it times /coverletters/search's query path against a LIKE
+scan over the same columns, which is what finding a letter costs without
+an index.
+
+    python -m bench.search_latency --rows 100000 --heavy 5000 --repeat 20
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp(prefix="bench-search-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+from sqlalchemy import func, insert, or_, select  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.models import CoverLetter, User  # noqa: E402
+from app.services.search import search_coverletters  # noqa: E402
+from bench.stats import summarize  # noqa: E402
+
+COMPANIES = ["Acme Robotics", "Globex", "Initech", "Umbrella Health", "Stark Industries", "Hooli", "Pied Piper",
+             "Wayne Logistics", "Cyberdyne", "Soylent Foods"]
+TITLES = ["Backend Engineer", "Data Scientist", "Product Manager", "Site Reliability Engineer",
+          "Frontend Developer", "Machine Learning Engineer", "Engineering Manager"]
+SKILLS = ["Python", "PostgreSQL", "Kubernetes", "React", "TypeScript", "Go", "Kafka", "Terraform", "Spark",
+          "PyTorch", "GraphQL", "Rust", "Airflow", "Redis"]
+QUERIES = ["kubernetes", "acme robotics", "postgresql kafka", "machine learning", "zebra"]
+BATCH = 5000
+
+
+def letter(user_id: int, rng: random.Random) -> dict:
+    skills = rng.sample(SKILLS, 4)
+    company, title = rng.choice(COMPANIES), rng.choice(TITLES)
+    return {
+        "user_id": user_id,
+        "input_full_name": "Bench User",
+        "job_title": title,
+        "company_name": company,
+        "tone": "professional",
+        "job_description": f"{company} is hiring a {title}. You will work with {', '.join(skills)} "
+                           "on systems that serve millions of users.",
+        "ai_draft": f"Dear Hiring Manager,\n\nI am excited to apply for the {title} role at {company}. "
+                    f"I have shipped production systems with {skills[0]} and {skills[1]}, and led projects "
+                    f"using {skills[2]}.\n\nSincerely,\nBench User",
+        "status": "complete",
+    }
+
+
+def seed(rows: int, users: int, heavy: int) -> int:
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"email": f"bench-{i}@example.com", "full_name": "Bench", "password_hash": "x", "token_version": 0}
+            for i in range(users)
+        ])
+        user_ids = [u for (u,) in db.execute(select(User.id).order_by(User.id))]
+        heavy_user = user_ids[0]
+        owners = [heavy_user] * heavy + [rng.choice(user_ids[1:]) for _ in range(rows - heavy)]
+        for start in range(0, rows, BATCH):
+            db.execute(insert(CoverLetter), [letter(u, rng) for u in owners[start:start + BATCH]])
+            db.commit()
+    return heavy_user
+
+
+def like_scan(db, user_id: int, q: str, limit: int):
+    body = func.coalesce(CoverLetter.edited_final, CoverLetter.ai_draft)
+    conds = [
+        or_(*(col.ilike(f"%{word}%") for col in
+              (CoverLetter.company_name, CoverLetter.job_title, CoverLetter.job_description, body)))
+        for word in q.split()
+    ]
+    return db.execute(
+        select(CoverLetter.id).where(CoverLetter.user_id == user_id, *conds)
+        .order_by(CoverLetter.created_at.desc()).limit(limit)
+    ).all()
+
+
+def timed(fn, repeat: int) -> tuple[dict, int]:
+    latencies, hits = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        hits = len(fn())
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies), hits
+
+
+def main(rows: int, users: int, heavy: int, repeat: int, limit: int) -> dict:
+    t0 = time.perf_counter()
+    heavy_user = seed(rows, users, heavy)
+    results = {"rows": rows, "users": users, "heavy_user_rows": heavy, "dialect": engine.dialect.name,
+               "seed_s": round(time.perf_counter() - t0, 1), "queries": {}}
+    with SessionLocal() as db:
+        for q in QUERIES:
+            search_stats, search_hits = timed(lambda: search_coverletters(db, heavy_user, q, limit), repeat)
+            scan_stats, scan_hits = timed(lambda: like_scan(db, heavy_user, q, limit), repeat)
+            results["queries"][q] = {
+                "search": {**search_stats, "hits": search_hits},
+                "like_scan": {**scan_stats, "hits": scan_hits},
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--heavy", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(main(args.rows, args.users, args.heavy, args.repeat, args.limit), indent=2))
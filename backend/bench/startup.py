@@ -0,0 +1,130 @@
+"""Cold-start benchmark and regression check.
+
+For --runs fresh interpreters it measures:
+
+- import: `python -X importtime -c "import app.main"`. It reports the
+  cumulative time, the slowest modules, and which heavy libraries got
+  imported eagerly (they should load on first use or in the background
+  warm-up instead).
+- first request: the time from starting uvicorn to the first 200 from
+  /healthz, and then to "warm": true.
+
+The medians are checked against --max-import-s and --max-first-request-s,
+and any of HEAVY_MODULES imported by app.main counts as a failure. The
+exit status is 1 on any failure, so this can run in CI.
+
+    python -m bench.startup --runs 5 --max-import-s 1.5 --max-first-request-s 3
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HEAVY_MODULES = ("weasyprint", "pypdf", "docx", "openai")
+
+_db_dir = tempfile.mkdtemp(prefix="bench-startup-")
+ENV = {
+    "DATABASE_URL": f"sqlite:///{_db_dir}/bench.db",
+    "JWT_SECRET": "bench",
+    "OPENAI_API_KEY": "bench",
+    "JOB_WORKERS": "0",  # the queue needs tables this throwaway database does not have
+    **os.environ,
+}
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """module -> (self_us, cumulative_us) from -X importtime output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def measure_import() -> dict:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                          env=ENV, capture_output=True, text=True, check=True)
+    modules = parse_importtime(proc.stderr)
+    slowest = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)[:10]
+    return {
+        "import_s": modules["app.main"][1] / 1e6,
+        "eager_heavy": sorted(m for m in HEAVY_MODULES if m in modules),
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_request(timeout_s: float = 60.0) -> dict:
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=ENV, stdout=sys.stderr,  # keep stdout for the JSON report
+    )
+    first_ok = warm = None
+    try:
+        while time.perf_counter() - started < timeout_s and warm is None:
+            try:
+                resp = httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=1.0)
+            except httpx.TransportError:
+                time.sleep(0.02)
+                continue
+            if resp.status_code == 200:
+                first_ok = first_ok or time.perf_counter() - started
+                if resp.json().get("warm"):
+                    warm = time.perf_counter() - started
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+    return {"first_request_s": first_ok, "warm_s": warm}
+
+
+def main(runs: int, max_import_s: float, max_first_request_s: float) -> tuple[dict, list[str]]:
+    imports = [measure_import() for _ in range(runs)]
+    requests = [measure_first_request() for _ in range(runs)]
+    if any(r["first_request_s"] is None for r in requests):
+        return {"requests": requests}, ["server never answered /healthz"]
+
+    warm = [r["warm_s"] for r in requests if r["warm_s"] is not None]
+    results = {
+        "runs": runs,
+        "import_s": round(statistics.median(r["import_s"] for r in imports), 3),
+        "first_request_s": round(statistics.median(r["first_request_s"] for r in requests), 3),
+        "warm_s": round(statistics.median(warm), 3) if warm else None,
+        "eager_heavy": imports[-1]["eager_heavy"],
+        "slowest_self_ms": imports[-1]["slowest_self_ms"],
+    }
+    failures = []
+    if results["import_s"] > max_import_s:
+        failures.append(f"import app.main took {results['import_s']}s (limit {max_import_s}s)")
+    if results["first_request_s"] > max_first_request_s:
+        failures.append(f"first request after {results['first_request_s']}s (limit {max_first_request_s}s)")
+    if results["eager_heavy"]:
+        failures.append(f"imported at startup: {', '.join(results['eager_heavy'])}")
+    return results, failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-s", type=float, default=1.5)
+    parser.add_argument("--max-first-request-s", type=float, default=3.0)
+    args = parser.parse_args()
+    results, failures = main(args.runs, args.max_import_s, args.max_first_request_s)
+    print(json.dumps({**results, "failures": failures}, indent=2))
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,122 @@
+"""Upload memory benchmark: peak allocation per resume upload.
+
+Posts resumes to POST /resumes through the ASGI app in-process (temp
+SQLite, no network) and records, per upload, the peak Python heap growth
+(tracemalloc) and the process peak RSS. Cases:
+
+- accepted uploads just under the 5MB limit (a padded DOCX) and an 80-page PDF
+- an oversized upload with Content-Length, rejected before the body is read
+- an oversized chunked upload (no Content-Length), cut off at MAX_REQUEST_BYTES
+
+Body bytes are built before tracing starts, so the numbers are what the
+server allocates on top of the request it was handed.
+
+    python -m bench.upload_rss --repeat 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import tempfile
+import tracemalloc
+import uuid
+import zipfile
+from io import BytesIO
+
+_db_dir = tempfile.mkdtemp(prefix="bench-upload-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_dir}/bench.db")
+os.environ.setdefault("JWT_SECRET", "bench")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import access_expires, create_token  # noqa: E402
+from app.db.base import Base  # noqa: E402
+from app.db.session import SessionLocal, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import User  # noqa: E402
+from app.routes.auth import user_claims  # noqa: E402
+from bench.extract_corpus import build_docx, build_pdf  # noqa: E402
+
+MiB = 1024 * 1024
+
+
+def padded_docx(size: int) -> bytes:
+    """A real resume DOCX grown to `size` bytes with an incompressible stored part."""
+    buf = BytesIO(build_docx(5))
+    pad = size - len(buf.getvalue()) - 200  # leave room for the zip entry headers
+    with zipfile.ZipFile(buf, "a", compression=zipfile.ZIP_STORED) as z:
+        z.writestr("word/media/padding.bin", os.urandom(max(pad, 0)))
+    return buf.getvalue()
+
+
+def multipart(filename: str, content: bytes) -> tuple[bytes, str]:
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="resume"; filename="{filename}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def chunks(body: bytes, size: int = 64 * 1024):
+    async def gen():
+        for i in range(0, len(body), size):
+            yield body[i:i + size]
+    return gen()
+
+
+async def measure(client: httpx.AsyncClient, token: str, filename: str, content: bytes,
+                  chunked: bool, repeat: int) -> dict:
+    body, content_type = multipart(filename, content)
+    peaks, statuses = [], set()
+    for _ in range(repeat):
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": content_type}
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        resp = await client.post("/resumes", content=chunks(body) if chunked else body, headers=headers)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        statuses.add(resp.status_code)
+    return {
+        "file_mb": round(len(content) / MiB, 2),
+        "chunked": chunked,
+        "status": sorted(statuses),
+        "peak_heap_mb": round(max(peaks) / MiB, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+async def main(repeat: int) -> dict:
+    Base.metadata.create_all(engine)
+    with SessionLocal() as db:
+        user = User(email="bench@example.com", full_name="Bench", password_hash="x", token_version=0)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        token = create_token(str(user.id), "access", access_expires(), user_claims(user))
+
+    cases = [
+        ("resume.docx", padded_docx(5 * MiB - 64 * 1024), False),
+        ("portfolio.pdf", build_pdf(80), False),
+        ("huge.docx", padded_docx(50 * MiB), False),
+        ("huge-chunked.docx", padded_docx(50 * MiB), True),
+    ]
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {}
+        for filename, content, chunked in cases:
+            results[filename] = await measure(client, token, filename, content, chunked, repeat)
+    return {"max_request_mb": round(settings.MAX_REQUEST_BYTES / MiB, 2), "uploads": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.repeat)), indent=2))
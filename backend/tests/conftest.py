@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+# settings are read on first use, so the environment only has to be in place before the first request
+_tmp = tempfile.mkdtemp(prefix="coverletter-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_tmp}/test.db",
+    "JWT_SECRET": "test-secret",
+    "OPENAI_API_KEY": "test-key",
+    "RATE_LIMIT_ENABLED": "false",
+    "JOB_WORKERS": "0",
+    "STARTUP_WARMUP": "false",
+    "PDF_POOL_WORKERS": "0",
+    "BCRYPT_ROUNDS": "4",
+})
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+from app.db.base import Base
+from app.db.session import SessionLocal
+from app.models.coverletter import CoverLetter
+import app.models  # noqa: F401
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    here = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(here, "alembic.ini")), "head")
+
+
+@pytest.fixture(autouse=True)
+def clean_tables():
+    yield
+    from app.routes.auth import get_user_versions
+
+    with SessionLocal() as db:
+        for table in reversed(Base.metadata.sorted_tables):
+            db.execute(table.delete())
+        db.commit()
+    get_user_versions.cache_clear()
+
+
+@pytest.fixture
+def client():
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+def register(client: TestClient, email: str = "ada@example.com", password: str = "correct horse") -> dict:
+    """Signs a user up and returns the Authorization header for them."""
+    resp = client.post("/auth/register", json={"email": email, "full_name": "Ada", "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.headers['X-Access-Token']}"}
+
+
+def current_user_id(client: TestClient, auth: dict) -> int:
+    return client.get("/auth/me", headers=auth).json()["id"]
+
+
+def add_letter(user_id: int, company: str = "Acme", draft: str = "Dear team,", **fields) -> int:
+    """Stores a finished letter directly, without going through generation."""
+    with SessionLocal() as db:
+        letter = CoverLetter(
+            user_id=user_id, input_full_name="Ada", job_title="Engineer", company_name=company,
+            tone="professional", job_description="Build things.", ai_draft=draft, **fields,
+        )
+        db.add(letter)
+        db.commit()
+        return letter.id
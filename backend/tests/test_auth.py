@@ -0,0 +1,37 @@
+from tests.conftest import register
+
+
+def test_logout_revokes_issued_tokens(client):
+    auth = register(client)
+    assert client.get("/auth/me", headers=auth).status_code == 200
+
+    assert client.post("/auth/logout").status_code == 200
+    assert client.get("/auth/me", headers=auth).status_code == 401
+
+
+def test_password_change_revokes_old_tokens_and_keeps_session(client):
+    auth = register(client)
+    resp = client.post("/auth/password", headers=auth,
+                       json={"current_password": "correct horse", "new_password": "battery staple"})
+    assert resp.status_code == 200
+    fresh = {"Authorization": f"Bearer {resp.headers['X-Access-Token']}"}
+
+    assert client.get("/auth/me", headers=auth).status_code == 401
+    assert client.get("/auth/me", headers=fresh).status_code == 200
+    assert client.post("/auth/refresh").status_code == 200  # the new refresh cookie works too
+    login = client.post("/auth/login", json={"email": "ada@example.com", "password": "battery staple"})
+    assert login.status_code == 200
+
+
+def test_password_change_needs_the_current_password(client):
+    auth = register(client)
+    resp = client.post("/auth/password", headers=auth,
+                       json={"current_password": "wrong password", "new_password": "battery staple"})
+    assert resp.status_code == 401
+    assert client.get("/auth/me", headers=auth).status_code == 200
+
+
+def test_deleted_account_tokens_stop_working(client):
+    auth = register(client)
+    assert client.delete("/auth/account", headers=auth).status_code == 200
+    assert client.get("/auth/me", headers=auth).status_code == 401
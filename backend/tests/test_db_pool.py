@@ -0,0 +1,44 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+
+from app.db.session import PoolStats, _timed, track_pool
+
+
+def engine_with(stats: PoolStats, path, creator=None):
+    engine = create_engine(
+        f"sqlite:///{path}", poolclass=_timed(QueuePool, stats), pool_size=1, max_overflow=0, pool_timeout=0.05,
+        **({"creator": creator} if creator else {}),
+    )
+    track_pool(engine.pool, stats)
+    return engine
+
+
+def test_pool_exhaustion_counts_as_a_timeout(tmp_path):
+    stats = PoolStats()
+    engine = engine_with(stats, tmp_path / "pool.db")
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    with engine.connect():
+        pass
+
+    assert stats.timeout_s == 0.05
+    assert stats.timeouts == 1
+    assert stats.checkouts == 2
+    assert stats.connects == 1
+    assert stats.wait_seconds_max >= 0.05
+
+
+def test_connection_errors_are_not_timeouts(tmp_path):
+    def refuse():
+        raise sqlite3.OperationalError("database is down")
+
+    stats = PoolStats()
+    engine = engine_with(stats, tmp_path / "pool.db", creator=refuse)
+    with pytest.raises(exc.OperationalError):
+        engine.connect()
+    assert stats.timeouts == 0
+    assert stats.checkouts == 0
@@ -0,0 +1,73 @@
+import io
+
+import docx
+import pytest
+
+import app.routes.coverletters as routes
+from app.db.session import SessionLocal
+from app.models.coverletter import CoverLetter
+from tests.conftest import register
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+FORM = {
+    "input_full_name": "Ada Lovelace",
+    "job_title": "Engineer",
+    "company_name": "Acme",
+    "tone": "professional",
+    "job_description": "Build reliable analytical engines for the whole team.",
+}
+
+
+def resume_docx() -> bytes:
+    document = docx.Document()
+    document.add_paragraph("Ada Lovelace. Wrote the first published algorithm for the Analytical Engine.")
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def events(body: str) -> list[str]:
+    return [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+
+
+def stream(client, auth):
+    files = {"resume": ("resume.docx", resume_docx(), DOCX)}
+    with client.stream("POST", "/coverletters/generate/stream", data=FORM, files=files, headers=auth) as resp:
+        assert resp.status_code == 200
+        return "".join(resp.iter_text())
+
+
+def stored_letter() -> CoverLetter:
+    with SessionLocal() as db:
+        return db.query(CoverLetter).one()
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    def use(*deltas, error: Exception | None = None):
+        async def fake_stream(*args, **kwargs):
+            for delta in deltas:
+                yield delta
+            if error is not None:
+                raise error
+
+        monkeypatch.setattr(routes, "stream_cover_letter", fake_stream)
+
+    return use
+
+
+def test_stream_completes(client, upstream):
+    upstream("Dear Acme, ", "hire me.")
+    body = stream(client, register(client))
+    assert events(body) == ["start", "delta", "delta", "done"]
+    letter = stored_letter()
+    assert (letter.status, letter.ai_draft) == ("complete", "Dear Acme, hire me.")
+
+
+def test_upstream_failure_after_first_chunk_sends_an_error_event(client, upstream):
+    upstream("Dear Acme, ", error=RuntimeError("upstream connection reset"))
+    body = stream(client, register(client))
+    assert events(body) == ["start", "delta", "error"]
+    assert '"detail": "Generation failed"' in body
+    letter = stored_letter()
+    assert (letter.status, letter.ai_draft) == ("failed", "Dear Acme,")
@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from app.db.session import SessionLocal
+from app.models.coverletter import CoverLetter
+from app.models.generation_job import GenerationJob
+from app.models.resume_blob import ResumeBlob
+from app.models.user import User
+from app.services.jobs import JOB_FIELDS, claim_next_job, fail_job, finish_job, utcnow
+
+
+def queue_job() -> int:
+    with SessionLocal() as db:
+        user = User(email="ada@example.com", full_name="Ada", password_hash="x")
+        blob = ResumeBlob(sha256="0" * 64, text="Resume")
+        db.add_all([user, blob])
+        db.flush()
+        job = GenerationJob(
+            user_id=user.id, resume_blob_id=blob.id, status="queued", attempts=0, run_after=utcnow(),
+            payload={**{field: "x" for field in JOB_FIELDS}, "tone": "professional", "force_regenerate": False},
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+
+
+def expire_lease(job_id: int):
+    with SessionLocal() as db:
+        job = db.get(GenerationJob, job_id)
+        job.locked_at = utcnow() - timedelta(hours=1)
+        db.commit()
+
+
+def job_row(job_id: int) -> GenerationJob:
+    with SessionLocal() as db:
+        return db.get(GenerationJob, job_id)
+
+
+def letters() -> int:
+    with SessionLocal() as db:
+        return db.query(CoverLetter).count()
+
+
+def test_worker_that_lost_its_lease_cannot_finish_the_job():
+    job_id = queue_job()
+    first = claim_next_job()
+    expire_lease(job_id)
+    second = claim_next_job()  # the job looked orphaned, so another worker took it over
+    assert second["id"] == job_id and second["attempts"] == 2
+
+    assert finish_job(first, "late draft") is False
+    assert fail_job(first, "late failure") is False
+    assert job_row(job_id).status == "running"
+    assert letters() == 0
+
+    assert finish_job(second, "draft") is True
+    assert job_row(job_id).status == "succeeded"
+    assert letters() == 1
+
+
+def test_expired_lease_is_refused_even_before_another_claim():
+    job_id = queue_job()
+    claim = claim_next_job()
+    expire_lease(job_id)
+    claim["locked_at"] = job_row(job_id).locked_at  # same claimant, but its lease ran out
+
+    assert finish_job(claim, "draft") is False
+    assert letters() == 0
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+
+from tests.conftest import add_letter, current_user_id, register
+
+
+def pages(client, auth, limit: int) -> list[list[int]]:
+    out, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/coverletters", params=params, headers=auth).json()
+        out.append([item["id"] for item in page["items"]])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return out
+
+
+def test_cursor_pagination_walks_every_letter_once_newest_first(client):
+    auth = register(client)
+    me = current_user_id(client, auth)
+    # several letters share a second, so the id has to break ties
+    same_second = [add_letter(me, company=f"Co {i}") for i in range(5)]
+    older = add_letter(me, company="Old", created_at=datetime.now(timezone.utc) - timedelta(days=1))
+    add_letter(current_user_id(client, register(client, "bob@example.com")))
+
+    newest_first = same_second[::-1] + [older]
+    assert pages(client, auth, 2) == [newest_first[0:2], newest_first[2:4], newest_first[4:6]]
+
+
+def test_last_page_has_no_cursor(client):
+    auth = register(client)
+    add_letter(current_user_id(client, auth))
+    page = client.get("/coverletters", params={"limit": 5}, headers=auth).json()
+    assert len(page["items"]) == 1
+    assert page["next_cursor"] is None
+
+
+def test_garbage_cursor_is_a_400(client):
+    auth = register(client)
+    assert client.get("/coverletters", params={"cursor": "not-a-cursor"}, headers=auth).status_code == 400
@@ -0,0 +1,45 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.metrics import LLM_TOKENS
+from app.services.llm_gateway import Backend, LatencyTracker, LLMGateway, RetryBudget
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def fake_backend(name: str, delay_s: float, tokens: int) -> Backend:
+    async def create(**kwargs):
+        await asyncio.sleep(delay_s)
+        usage = SimpleNamespace(prompt_tokens=tokens // 2, completion_tokens=tokens - tokens // 2, total_tokens=tokens)
+        return SimpleNamespace(usage=usage, backend=name)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return Backend(name=name, model="fake", client=client, tracker=LatencyTracker(300, 30))
+
+
+def gateway(*backends: Backend) -> LLMGateway:
+    return LLMGateway(list(backends), timeout_s=5, max_attempts=2, hedge=True, hedge_min_delay_s=0.05,
+                      hedge_default_delay_s=0.05, budget=RetryBudget(1.0, 300))
+
+
+@pytest.mark.anyio
+async def test_cancelled_hedge_loser_is_charged_its_estimate():
+    estimated = LLM_TOKENS.labels("estimated")._value.get()
+    gw = gateway(fake_backend("slow", 1.0, 500), fake_backend("fast", 0.0, 300))
+
+    resp, lost = await gw.complete([], 0.6, attempt_estimate=700)
+    assert resp.backend == "fast"
+    assert lost == 700
+    assert LLM_TOKENS.labels("estimated")._value.get() - estimated == 700
+
+
+@pytest.mark.anyio
+async def test_unhedged_call_reports_no_lost_tokens():
+    resp, lost = await gateway(fake_backend("fast", 0.0, 300)).complete([], 0.6, attempt_estimate=700)
+    assert resp.usage.total_tokens == 300
+    assert lost == 0
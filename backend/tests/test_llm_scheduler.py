@@ -0,0 +1,52 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import llm_scheduler
+from app.services.llm_scheduler import LLMScheduler, SchedulerSaturated
+from tests.conftest import register
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.mark.anyio
+async def test_full_lane_refuses_new_calls():
+    scheduler = LLMScheduler(max_concurrency=1, tokens_per_minute=0, max_queue=1, max_wait_s=60)
+    running = asyncio.Event()
+    release = asyncio.Event()
+
+    async def call():
+        async with scheduler.acquire(1, "interactive", 100):
+            running.set()
+            await release.wait()
+
+    first = asyncio.create_task(call())
+    await running.wait()
+    queued = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    assert scheduler.snapshot()["queued"]["interactive"] == 1
+
+    with pytest.raises(SchedulerSaturated) as refused:
+        async with scheduler.acquire(2, "interactive", 100):
+            pass
+    assert refused.value.retry_after >= 1
+    scheduler.check("batch")  # other lanes have their own queue
+
+    release.set()
+    await asyncio.gather(first, queued)
+    assert scheduler.snapshot()["running"] == 0
+
+
+def test_saturated_scheduler_answers_503_with_retry_after(client, monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "_scheduler",
+                        LLMScheduler(max_concurrency=1, tokens_per_minute=0, max_queue=0, max_wait_s=60))
+    item = {"input_full_name": "Ada", "job_title": "Engineer", "company_name": "Acme", "tone": "professional",
+            "job_description": "Build reliable analytical engines for the whole team."}
+    resp = client.post("/coverletters/generate/batch", headers=register(client),
+                       data={"batch": json.dumps({"resume_id": 1, "items": [item]})})
+    assert resp.status_code == 503
+    assert int(resp.headers["Retry-After"]) >= 1
@@ -0,0 +1,31 @@
+import pytest
+from prometheus_client.core import REGISTRY
+
+from app.core.config import settings
+from app.core.metrics import StatsCollector
+
+
+@pytest.fixture
+def tokens(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-secret")
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "profile-secret")
+
+
+def test_operator_endpoints_need_the_metrics_token(client, tokens):
+    for path in ("/metrics", "/stats/llm", "/stats/db", "/stats/cache"):
+        assert client.get(path).status_code == 404
+        assert client.get(path, headers={"Authorization": "Bearer profile-secret"}).status_code == 404
+        assert client.get(path, headers={"Authorization": "Bearer metrics-secret"}).status_code == 200
+
+
+def test_operator_endpoints_are_hidden_without_a_token(client):
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
+
+
+def test_stats_collector_describes_what_it_collects():
+    collector = StatsCollector()
+    described = {family.name for family in collector.describe()}
+    collected = {family.name for family in collector.collect()}
+    assert collected <= described
+    assert "llm_queue_depth" in described
+    assert REGISTRY.get_sample_value("db_pool_checkouts_total", {"pool": "sync"}) is not None
@@ -0,0 +1,37 @@
+import pytest
+
+from app.services.prompt_compact import _heading_kind, split_jd_sections
+
+
+@pytest.mark.parametrize("line,kind", [
+    ("Requirements", "requirements"),
+    ("Key Responsibilities", "responsibilities"),
+    ("Preferred qualifications", "preferred"),
+    ("Nice to have", "preferred"),
+    ("What you'll need:", "requirements"),
+    ("## About the role", "responsibilities"),
+    ("BENEFITS", "benefits"),
+    ("**Our perks and compensation**", "benefits"),
+    ("Minimum Qualifications:", "requirements"),
+])
+def test_headings(line, kind):
+    assert _heading_kind(line) == kind
+
+
+@pytest.mark.parametrize("line", [
+    "Python plus Django",
+    "Strong people skills",
+    "Kubernetes a plus",
+    "Great benefits here",
+    "- Skills in SQL",
+])
+def test_short_body_lines_are_not_headings(line):
+    assert _heading_kind(line) is None
+
+
+def test_short_lines_stay_in_their_section():
+    jd = "Requirements:\nPython plus Django\nStrong people skills\nResponsibilities:\nShip features"
+    assert split_jd_sections(jd) == [
+        ("requirements", "Requirements:\nPython plus Django\nStrong people skills"),
+        ("responsibilities", "Responsibilities:\nShip features"),
+    ]
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.services import resume_extract
+from app.services.resume_extract import ExtractionBusy, ExtractionTimeout, extract_resume_text
+
+
+def make_pdf(pages: int, line: str = "Led a team of engineers delivering payment services.") -> bytes:
+    """A minimal text PDF, 40 lines per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = "BT /F1 11 Tf 50 750 Td " + " ".join(f"({line} p{page} l{i}) Tj 0 -14 Td" for i in range(40)) + " ET"
+        objects.append(f"<< /Length {len(text)} >>\nstream\n{text}\nendstream")
+        objects.append("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {pages} >>"
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    def configure(count: int, queue_max: int = 8, budget_s: float = 30.0):
+        monkeypatch.setattr(settings, "EXTRACT_PROCESSES", count)
+        monkeypatch.setattr(settings, "EXTRACT_QUEUE_MAX", queue_max)
+        monkeypatch.setattr(settings, "EXTRACT_TIME_BUDGET_S", budget_s)
+
+    yield configure
+    resume_extract.shutdown_page_pool()
+
+
+async def extract_many(pdf: bytes, count: int) -> list:
+    return await asyncio.gather(*(extract_resume_text(pdf, "pdf") for _ in range(count)), return_exceptions=True)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("pages", [2, 14])  # single task, and split across processes by page range
+async def test_concurrent_extractions_match_the_in_thread_result(processes, pages):
+    pdf = make_pdf(pages)
+    processes(0)
+    expected = await extract_resume_text(pdf, "pdf")
+    assert "p0 l0" in expected
+
+    processes(2)
+    assert await extract_many(pdf, 6) == [expected] * 6
+
+
+@pytest.mark.anyio
+async def test_extractions_beyond_the_queue_are_refused(processes):
+    processes(1, queue_max=1)
+    results = await extract_many(make_pdf(2), 4)
+    assert [type(r) for r in results].count(ExtractionBusy) == 2
+    assert all(isinstance(r, str) for r in results[:2])
+    assert resume_extract._pdf_pending == 0
+
+
+@pytest.mark.anyio
+async def test_slow_document_times_out_without_failing_its_neighbours(processes):
+    processes(2)
+    quick = make_pdf(1)
+    results = await asyncio.gather(extract_resume_text(quick, "pdf"), extract_resume_text(quick, "pdf"))
+    assert all(results)
+
+    processes(2, budget_s=0.001)
+    with pytest.raises(ExtractionTimeout):
+        await extract_resume_text(make_pdf(30, "word " * 60), "pdf")
+    processes(2)
+    assert await extract_resume_text(quick, "pdf") == results[0]
@@ -0,0 +1,37 @@
+import pytest
+
+from app.services.revisions import PatchError, apply_ops
+from tests.conftest import add_letter, current_user_id, register
+
+
+def patch(client, auth, cover_id: int, base_version: int, *ops: dict):
+    return client.patch(f"/coverletters/{cover_id}/edited", headers=auth,
+                        json={"base_version": base_version, "ops": list(ops)})
+
+
+def test_stale_base_version_is_rejected_with_409(client):
+    auth = register(client)
+    cover_id = add_letter(current_user_id(client, auth), draft="Dear team,")
+    assert patch(client, auth, cover_id, 0, {"pos": 10, "insert": " hi"}).json()["version"] == 1
+
+    stale = patch(client, auth, cover_id, 0, {"pos": 0, "delete": 4, "insert": "Hello"})
+    assert stale.status_code == 409
+    assert stale.json()["detail"]["current_version"] == 1
+    assert client.get(f"/coverletters/{cover_id}/revisions/1", headers=auth).json()["text"] == "Dear team, hi"
+
+
+def test_offsets_are_utf16_code_units(client):
+    auth = register(client)
+    # the rocket is one code point but two UTF-16 units, so "team" starts at 8 in the browser
+    cover_id = add_letter(current_user_id(client, auth), draft="Dear 🚀 team")
+    assert patch(client, auth, cover_id, 0, {"pos": 8, "delete": 4, "insert": "crew"}).status_code == 200
+
+    assert client.get(f"/coverletters/{cover_id}/revisions/1", headers=auth).json()["text"] == "Dear 🚀 crew"
+    assert client.get(f"/coverletters/{cover_id}/revisions/0", headers=auth).json()["text"] == "Dear 🚀 team"
+
+
+def test_ops_may_not_split_a_surrogate_pair():
+    with pytest.raises(PatchError):
+        apply_ops("a🚀b", [{"pos": 2, "delete": 0, "insert": "x"}])
+    # halves inserted by separate ops are fine once the pair is whole again
+    assert apply_ops("ab", [{"pos": 1, "insert": "\ud83d"}, {"pos": 2, "insert": "\ude80"}]) == "a🚀b"
@@ -0,0 +1,35 @@
+from sqlalchemy import text
+
+from app.db.session import SessionLocal
+from tests.conftest import add_letter, current_user_id, register
+
+
+def test_search_ranks_and_highlights(client):
+    auth = register(client)
+    me = current_user_id(client, auth)
+    acme = add_letter(me, "Acme", "I would love to build rockets at Acme.")
+    add_letter(me, "Globex", "Rockets are mentioned here once.")
+
+    resp = client.get("/coverletters/search", params={"q": "acme"}, headers=auth)
+    assert resp.status_code == 200
+    items = resp.json()["items"]
+    assert [item["id"] for item in items] == [acme]
+    assert "<mark>Acme</mark>" in items[0]["snippet"]
+
+
+def test_search_only_returns_the_callers_letters(client):
+    alice = register(client, "alice@example.com")
+    bob = register(client, "bob@example.com")
+    mine = add_letter(current_user_id(client, alice), "Acme", "Alice at Acme.")
+    theirs = add_letter(current_user_id(client, bob), "Acme", "Bob at Acme.")
+
+    items = client.get("/coverletters/search", params={"q": "acme"}, headers=alice).json()["items"]
+    assert [item["id"] for item in items] == [mine]
+
+    # even if the index's owner column were wrong, another user's letter must not come back
+    with SessionLocal() as db:
+        db.execute(text("UPDATE cover_letters_fts SET user_id = :owner WHERE rowid = :id"),
+                   {"owner": f"u{current_user_id(client, alice)}", "id": theirs})
+        db.commit()
+    items = client.get("/coverletters/search", params={"q": "acme"}, headers=alice).json()["items"]
+    assert [item["id"] for item in items] == [mine]
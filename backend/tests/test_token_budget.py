@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services.token_budget import TokenBudget, TokenBudgetExceeded, get_token_budget
+from tests.conftest import register
+
+GENERATE_FORM = {
+    "input_full_name": "Ada Lovelace",
+    "job_title": "Engineer",
+    "company_name": "Acme",
+    "tone": "professional",
+    "job_description": "Build reliable analytical engines for the whole team.",
+}
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def fresh_budget():
+    get_token_budget.cache_clear()
+    yield
+    get_token_budget.cache_clear()
+
+
+@pytest.mark.anyio
+async def test_concurrent_reservations_stop_at_the_budget():
+    budget = TokenBudget(1000)
+
+    async def attempt():
+        try:
+            return await budget.reserve(1, 300)
+        except TokenBudgetExceeded:
+            return None
+
+    granted = [r for r in await asyncio.gather(*(attempt() for _ in range(10))) if r]
+    # 0, 300, 600 and 900 were under the budget when reserved; overshoot is at most one call
+    assert len(granted) == 4
+    assert int(await budget.client.get(granted[0].key)) == 1200
+
+
+@pytest.mark.anyio
+async def test_settle_replaces_the_estimate_with_billed_tokens():
+    budget = TokenBudget(1000)
+    reservation = await budget.reserve(1, 600)
+    await budget.settle(reservation, 250)
+    assert int(await budget.client.get(reservation.key)) == 250
+
+    failed = await budget.reserve(1, 600)
+    await budget.settle(failed, 0)  # a call that failed before any usage costs nothing
+    assert int(await budget.client.get(reservation.key)) == 250
+
+
+def test_generate_answers_429_once_the_budget_is_spent(client):
+    auth = register(client)
+    me = client.get("/auth/me", headers=auth).json()["id"]
+    budget = get_token_budget()
+    client.portal.call(budget.reserve, me, budget.daily_tokens)
+
+    resp = client.post("/coverletters/generate", data=GENERATE_FORM, headers=auth)
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) > 0